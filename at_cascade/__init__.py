@@ -45,25 +45,39 @@ constant_table_list = [
    at_cascade/continue_cascade.py
    at_cascade/copy_root_db.py
    at_cascade/create_all_node_db.py
+   at_cascade/create_cov_reference_table.py
    at_cascade/create_job_table.py
    at_cascade/create_shift_db.py
    at_cascade/empty_avgint_table.py
    at_cascade/fit_or_root_class.py
+   at_cascade/get_all_node_info.py
    at_cascade/get_cov_info.py
    at_cascade/get_cov_reference.py
+   at_cascade/get_cov_reference_dict.py
    at_cascade/get_database_dir.py
    at_cascade/get_fit_children.py
    at_cascade/get_fit_integrand.py
+   at_cascade/get_node_tree.py
    at_cascade/get_parent_node.py
+   at_cascade/get_shift_databases.py
+   at_cascade/get_smooth_grid_index.py
    at_cascade/get_var_id.py
    at_cascade/job_descendent.py
+   at_cascade/job_history_class.py
+   at_cascade/job_journal_class.py
+   at_cascade/job_priority.py
    at_cascade/move_table.py
    at_cascade/no_ode_fit.py
    at_cascade/omega_constraint.py
+   at_cascade/plan_parallel.py
+   at_cascade/predict_parent_grid.py
    at_cascade/run_one_job.py
    at_cascade/run_parallel.py
+   at_cascade/set_sqlite_profile.py
+   at_cascade/static_job_cost.py
    at_cascade/table_exists.py
    at_cascade/table_name2id.py
+   at_cascade/var_index_class.py
 }
 .. END_SORT_THIS_LINE_MINUS_2
 
@@ -86,23 +100,37 @@ from .clear_shared          import clear_shared
 from .continue_cascade      import continue_cascade
 from .copy_root_db          import copy_root_db
 from .create_all_node_db    import create_all_node_db
+from .create_cov_reference_table import create_cov_reference_table
 from .create_job_table      import create_job_table
 from .create_shift_db       import create_shift_db
 from .empty_avgint_table    import empty_avgint_table
 from .fit_or_root_class     import fit_or_root_class
+from .get_all_node_info     import get_all_node_info
 from .get_cov_info          import get_cov_info
 from .get_cov_reference     import get_cov_reference
+from .get_cov_reference_dict import get_cov_reference_dict
 from .get_database_dir      import get_database_dir
 from .get_fit_children      import get_fit_children
 from .get_fit_integrand     import get_fit_integrand
+from .get_node_tree         import get_node_tree
 from .get_parent_node       import get_parent_node
+from .get_shift_databases   import get_shift_databases
+from .get_smooth_grid_index import get_smooth_grid_index
 from .get_var_id            import get_var_id
 from .job_descendent        import job_descendent
+from .job_history_class     import job_history_class
+from .job_journal_class     import job_journal_class
+from .job_priority          import job_priority
 from .move_table            import move_table
 from .no_ode_fit            import no_ode_fit
 from .omega_constraint      import omega_constraint
+from .plan_parallel         import plan_parallel
+from .predict_parent_grid   import predict_parent_grid
 from .run_one_job           import run_one_job
 from .run_parallel          import run_parallel
+from .set_sqlite_profile    import set_sqlite_profile
+from .static_job_cost       import static_job_cost
 from .table_exists          import table_exists
 from .table_name2id         import table_name2id
+from .var_index_class       import var_index_class
 # END_SORT_THIS_LINE_MINUS_1
@@ -20,7 +20,7 @@ Syntax
 
 Purpose
 *******
-Change the name of a table in the database.
+Add one or more messages at the end of the log table.
 
 connection
 **********
@@ -29,31 +29,62 @@ is a dismod_at open connection to the database.
 message
 *******
 is a ``str`` containing the message that is added at
-the end of the log table
+the end of the log table,
+or a ``list`` of ``str`` containing messages that are added in order.
+All the messages in a list are added using one insert command
+(and in one transaction; see below).
 
 Log Table
 *********
-As row is added at the end of the log table with the
-following columns values:
+As row is added at the end of the log table, for each message,
+with the following columns values:
 
-1. *log_id* : is the integer length of the log table before the message
+1. *log_id* : is one plus the maximum log_id before the message
+   (zero if the log table is empty).
+   This is the length of the log table before the message
+   because the log_id values are 0, 1, ... .
 2. *message_type* : is the text ``at_cascade``
 3. *table_name* : is null
 4. *row_id* : is null
 5. *unix_time* : is the integer unit time
 6. *message* : is the text message
 
+Transaction
+***********
+If *connection* is in a transaction when this routine is called,
+the new rows are part of that transaction and are not committed by this
+routine.
+This can be used to group several changes to a database into one
+transaction (and one sync to disk) by executing ``BEGIN`` before the changes
+and calling *connection*\ ``.commit()`` after them.
+Otherwise the new rows are committed before this routine returns.
+
+Speed
+*****
+The next log_id is determined using the primary key index,
+so the time to add a message does not depend on the size of the log table.
+
 {xrst_end   add_log_entry}
 '''
 import time
-import dismod_at
 # ----------------------------------------------------------------------------
 # BEGIN DEF
 # at_cascade.add_log_entry
 def add_log_entry(connection, message) :
-   assert type(message) == str
+   assert type(message) in [ str, list ]
    # END DEF
    #
+   # message_list
+   if type(message) == str :
+      message_list = [ message ]
+   else :
+      message_list = message
+   for entry in message_list :
+      assert type(entry) == str
+   #
+   # in_transaction
+   in_transaction = connection.in_transaction
+   #
    # cmd
    cmd  = 'create table if not exists log('
    cmd += 'log_id       integer primary key,'
@@ -62,10 +93,15 @@ def add_log_entry(connection, message) :
    cmd += 'row_id       integer,'
    cmd += 'unix_time    integer,'
    cmd += 'message      text)'
-   dismod_at.sql_command(connection, cmd)
+   connection.execute(cmd)
    #
-   # log_table
-   log_table = dismod_at.get_table_dict(connection, 'log')
+   # log_id
+   cmd    = 'SELECT max(log_id) FROM log'
+   log_id = connection.execute(cmd).fetchone()[0]
+   if log_id is None :
+      log_id = 0
+   else :
+      log_id += 1
    #
    # seconds
    seconds   = int( time.time() )
@@ -73,13 +109,18 @@ def add_log_entry(connection, message) :
    # message_type
    message_type = 'at_cascade'
    #
+   # row_list
+   row_list = list()
+   for (index, entry) in enumerate(message_list) :
+      row_list.append(
+         ( log_id + index, message_type, None, None, seconds, entry )
+      )
+   #
    # cmd
-   cmd = 'insert into log'
-   cmd += ' (log_id,message_type,table_name,row_id,unix_time,message) values('
-   cmd += str( len(log_table) ) + ','     # log_id
-   cmd += f'"{message_type}",'            # message_type
-   cmd += 'null,'                         # table_name
-   cmd += 'null,'                         # row_id
-   cmd += str(seconds) + ','              # unix_time
-   cmd += f'"{message}")'                 # message
-   dismod_at.sql_command(connection, cmd)
+   cmd  = 'insert into log'
+   cmd += ' (log_id,message_type,table_name,row_id,unix_time,message)'
+   cmd += ' values (?, ?, ?, ?, ?, ?)'
+   connection.executemany(cmd, row_list)
+   #
+   if not in_transaction :
+      connection.commit()
@@ -99,6 +99,20 @@ each rate that has non-null parent smoothing,
 and each age time pair in the smoothing,
 there is a row in the new avgint table.
 
+Constant Grid Points
+====================
+A grid point is constant if its const_value is not null,
+or the lower and upper limits in its value prior are equal.
+The priors that :ref:`create_shift_db-name` creates for a constant grid point
+do not use the corresponding prediction.
+A constant grid point is not included in the new avgint table unless it is
+the next age or next time point for a grid point that is not constant
+(these predictions are used for the mean of the dage and dtime priors),
+or it is for a covariate multiplier that is frozen for this fit
+(the prediction is used for the lower and upper limits).
+This reduces the size of the predict sample table,
+which has a row for each sample and each row in the avgint table.
+
 {xrst_end avgint_parent_grid}
 '''
 # ----------------------------------------------------------------------------
@@ -138,11 +152,11 @@ def possible_child_job_list(
    for row in option_all_table :
       option_all_dict[ row['option_name'] ] = row['option_value']
    #
+   # node_tree
+   node_tree = at_cascade.get_node_tree(node_table)
+   #
    # fit_node_children
-   fit_node_children = list()
-   for (node_id, row) in enumerate(node_table) :
-      if row['parent'] == fit_node_id :
-         fit_node_children.append(node_id)
+   fit_node_children = node_tree.children(fit_node_id)
    #
    # refit_split
    if 'refit_split' in option_all_dict :
@@ -157,7 +171,7 @@ def possible_child_job_list(
    root_node_name = option_all_dict['root_node_name']
    #
    # root_node_id
-   root_node_id = at_cascade.table_name2id(node_table, 'node', root_node_name)
+   root_node_id = node_tree.name2id(root_node_name)
    #
    # root_split_reference_id
    if 'root_split_reference_name' in option_all_dict :
@@ -221,6 +235,71 @@ def possible_child_job_list(
    #
    return child_job_list
 # ----------------------------------------------------------------------------
+# used_grid_id_list = get_used_grid_id_list(fit_tables, grid_id_list, freeze)
+#
+# grid_id_list:
+# is the list of smooth_grid_id values for one smoothing.
+#
+# freeze:
+# is true if this is the smoothing for a covariate multiplier that is frozen
+# for this fit; i.e., its fit value is used for both the lower and upper limit
+# at the grid points that do not have a const_value.
+#
+# used_grid_id_list:
+# is the sub-list of grid_id_list for which the prediction is used by
+# create_shift_db; i.e., the grid points that are not constant plus the
+# next age and next time point for these grid points.
+def get_used_grid_id_list(fit_tables, grid_id_list, freeze) :
+   #
+   # grid_id_dict, age_list, time_list
+   grid_id_dict = dict()
+   age_set      = set()
+   time_set     = set()
+   for grid_id in grid_id_list :
+      grid_row = fit_tables['smooth_grid'][grid_id]
+      age_id   = grid_row['age_id']
+      time_id  = grid_row['time_id']
+      grid_id_dict[ (age_id, time_id) ] = grid_id
+      age_set.add(age_id)
+      time_set.add(time_id)
+   age_list  = sorted(
+      age_set, key = lambda age_id : fit_tables['age'][age_id]['age']
+   )
+   time_list = sorted(
+      time_set, key = lambda time_id : fit_tables['time'][time_id]['time']
+   )
+   #
+   # used_grid_id
+   used_grid_id = set()
+   for (i, age_id) in enumerate(age_list) :
+      for (j, time_id) in enumerate(time_list) :
+         grid_id  = grid_id_dict[ (age_id, time_id) ]
+         grid_row = fit_tables['smooth_grid'][grid_id]
+         #
+         # constant
+         constant = grid_row['const_value'] is not None
+         if freeze and not constant :
+            used_grid_id.add( grid_id )
+            constant = True
+         if not constant :
+            prior_row = fit_tables['prior'][ grid_row['value_prior_id'] ]
+            lower     = prior_row['lower']
+            upper     = prior_row['upper']
+            constant  = lower is not None and lower == upper
+         #
+         if not constant :
+            used_grid_id.add( grid_id )
+            if i + 1 < len(age_list) :
+               used_grid_id.add( grid_id_dict[ (age_list[i+1], time_id) ] )
+            if j + 1 < len(time_list) :
+               used_grid_id.add( grid_id_dict[ (age_id, time_list[j+1]) ] )
+   #
+   # used_grid_id_list
+   used_grid_id_list = [
+      grid_id for grid_id in grid_id_list if grid_id in used_grid_id
+   ]
+   return used_grid_id_list
+# ----------------------------------------------------------------------------
 # BEGIN syntax
 # at_cascade.avgint_parent_grid
 def avgint_parent_grid(
@@ -236,23 +315,21 @@ def avgint_parent_grid(
    assert type(fit_job_id) == int or fit_job_id == None
    # END syntax
    #
-   # option_all_table
-   connection = dismod_at.create_connection(
-      all_node_database, new = False, readonly = True
-   )
-   option_all_table       = dismod_at.get_table_dict(connection, 'option_all')
-   node_split_table       = dismod_at.get_table_dict(connection, 'node_split')
-   split_reference_table  = dismod_at.get_table_dict(
-      connection, 'split_reference'
-   )
-   connection.close()
+   # option_all_table, node_split_table, split_reference_table
+   all_node_info          = at_cascade.get_all_node_info(all_node_database)
+   option_all_table       = all_node_info['option_all']
+   node_split_table       = all_node_info['node_split']
+   split_reference_table  = all_node_info['split_reference']
    #
    # root_node_database
-   root_node_database = None
-   for row in option_all_table :
-      if row['option_name'] == 'root_node_database' :
-         root_node_database = row['option_value']
-   assert root_node_database != None
+   option_all_dict    = all_node_info['option_all_dict']
+   assert 'root_node_database' in option_all_dict
+   root_node_database = option_all_dict['root_node_database']
+   #
+   # sqlite_profile
+   sqlite_profile = 'default'
+   if 'sqlite_profile' in option_all_dict :
+      sqlite_profile = option_all_dict['sqlite_profile']
    #
    # fit_tables
    fit_or_root = at_cascade.fit_or_root_class(
@@ -266,6 +343,7 @@ def avgint_parent_grid(
       'mulcov',
       'node',
       'option',
+      'prior',
       'rate',
       'smooth_grid',
       'time',
@@ -273,6 +351,11 @@ def avgint_parent_grid(
       fit_tables[name] = fit_or_root.get_table(name)
    fit_or_root.close()
    #
+   # smooth_grid_index
+   smooth_grid_index = at_cascade.get_smooth_grid_index(
+      fit_tables['smooth_grid']
+   )
+   #
    # split_covariate_id, fit_split_reference_id, fit_split_reference
    split_covariate_id     = None
    fit_split_reference_id = None
@@ -308,6 +391,13 @@ def avgint_parent_grid(
       fit_tables['node'], 'node', parent_node_name
    )
    #
+   # mulcov_freeze_set
+   mulcov_freeze_set = set()
+   for row in all_node_info['mulcov_freeze'] :
+      if row['fit_node_id'] == parent_node_id :
+         if row['split_reference_id'] == fit_split_reference_id :
+            mulcov_freeze_set.add( row['mulcov_id'] )
+   #
    # child_job_list
    child_job_list = possible_child_job_list(
       option_all_table       = option_all_table,
@@ -318,37 +408,19 @@ def avgint_parent_grid(
       covariate_table        = fit_tables['covariate'],
    )
    #
-   # cov_reference_dict
-   cov_reference_dict = dict()
+   # shift_job_list
    if job_table == None :
-      #
-      # cov_reference_list
-      cov_reference_list = at_cascade.get_cov_reference(
-         all_node_database  = all_node_database,
-         fit_node_database  = fit_node_database,
-         shift_node_id      = parent_node_id,
-         split_reference_id = fit_split_reference_id,
-      )
-      # cov_reference[ (parent_node_id, fit_split_reference_id) ]
-      key                     = (parent_node_id, fit_split_reference_id)
-      cov_reference_dict[key] = cov_reference_list
+      shift_job_list = [ (parent_node_id, fit_split_reference_id) ]
    else :
-      #
-      # (shift_node_id, shift_split_reference_id)
-      for child_job in child_job_list :
-         (shift_node_id, shift_split_reference_id) = child_job
-         #
-         # cov_reference_list
-         cov_reference_list = at_cascade.get_cov_reference(
-            all_node_database  = all_node_database,
-            fit_node_database  = fit_node_database,
-            shift_node_id      = shift_node_id,
-            split_reference_id = shift_split_reference_id,
-         )
-         #
-         # cov_reference[ (shift_node_id, shift_split_reference_id) ]
-         key                     = child_job
-         cov_reference_dict[key] = cov_reference_list
+      shift_job_list = child_job_list
+   #
+   # cov_reference_dict
+   # cov_reference_dict[ (shift_node_id, shift_split_reference_id) ]
+   cov_reference_dict = at_cascade.get_cov_reference_dict(
+      all_node_database  = all_node_database,
+      fit_node_database  = fit_node_database,
+      shift_job_list     = shift_job_list,
+   )
    #
    # tbl_name
    tbl_name = 'avgint'
@@ -413,40 +485,46 @@ def avgint_parent_grid(
             fit_tables['integrand'], 'integrand', integrand_name
          )
          #
+         # used_grid_id_list
+         freeze            = mulcov_id in mulcov_freeze_set
+         used_grid_id_list = get_used_grid_id_list(
+            fit_tables, smooth_grid_index[group_smooth_id], freeze
+         )
+         #
          # grid_row
-         for grid_row in fit_tables['smooth_grid'] :
-            if grid_row['smooth_id'] == group_smooth_id :
-               #
-               # age_id
-               age_id    = grid_row['age_id']
-               age_lower = fit_tables['age'][age_id]['age']
-               age_upper = age_lower
-               #
-               # time_id
-               time_id    = grid_row['time_id']
-               time_lower = fit_tables['time'][time_id]['time']
-               time_upper = time_lower
-               #
-               # row
-               node_id            = None
-               subgroup_id        = 0
-               weight_id          = None
-               split_reference_id = None
-               row = [
-                  integrand_id,
-                  node_id,
-                  subgroup_id,
-                  weight_id,
-                  age_lower,
-                  age_upper,
-                  time_lower,
-                  time_upper,
-               ]
-               row += n_covariate * [ None ]
-               row += [ age_id, time_id, split_reference_id ]
-               #
-               # add to row_list
-               row_list.append( row )
+         for grid_id in used_grid_id_list :
+            grid_row = fit_tables['smooth_grid'][grid_id]
+            #
+            # age_id
+            age_id    = grid_row['age_id']
+            age_lower = fit_tables['age'][age_id]['age']
+            age_upper = age_lower
+            #
+            # time_id
+            time_id    = grid_row['time_id']
+            time_lower = fit_tables['time'][time_id]['time']
+            time_upper = time_lower
+            #
+            # row
+            node_id            = None
+            subgroup_id        = 0
+            weight_id          = None
+            split_reference_id = None
+            row = [
+               integrand_id,
+               node_id,
+               subgroup_id,
+               weight_id,
+               age_lower,
+               age_upper,
+               time_lower,
+               time_upper,
+            ]
+            row += n_covariate * [ None ]
+            row += [ age_id, time_id, split_reference_id ]
+            #
+            # add to row_list
+            row_list.append( row )
    #
    # rate_name
    for rate_name in name_rate2integrand :
@@ -466,56 +544,63 @@ def avgint_parent_grid(
             fit_tables['integrand'], 'integrand', integrand_name
          )
          #
+         # used_grid_id_list
+         freeze            = False
+         used_grid_id_list = get_used_grid_id_list(
+            fit_tables, smooth_grid_index[parent_smooth_id], freeze
+         )
+         #
          # grid_row
-         for grid_row in fit_tables['smooth_grid'] :
-            if grid_row['smooth_id'] == parent_smooth_id :
+         for grid_id in used_grid_id_list :
+            grid_row = fit_tables['smooth_grid'][grid_id]
+            #
+            # age_id
+            age_id    = grid_row['age_id']
+            age_lower = fit_tables['age'][age_id]['age']
+            age_upper = age_lower
+            #
+            # prior for pini must use age index zero
+            if rate_name == 'pini' :
+               assert age_id == minimum_age_id
+            #
+            # time_id
+            time_id    = grid_row['time_id']
+            time_lower = fit_tables['time'][time_id]['time']
+            time_upper = time_lower
+            #
+            # key
+            for key in cov_reference_dict :
                #
-               # age_id
-               age_id    = grid_row['age_id']
-               age_lower = fit_tables['age'][age_id]['age']
-               age_upper = age_lower
+               # node_id
+               node_id = key[0]
                #
-               # prior for pini must use age index zero
-               if rate_name == 'pini' :
-                  assert age_id == minimum_age_id
+               # split_reference_id
+               split_reference_id = key[1]
                #
-               # time_id
-               time_id    = grid_row['time_id']
-               time_lower = fit_tables['time'][time_id]['time']
-               time_upper = time_lower
+               # row
+               subgroup_id = 0
+               weight_id   = None
+               row = [
+                  integrand_id,
+                  node_id,
+                  subgroup_id,
+                  weight_id,
+                  age_lower,
+                  age_upper,
+                  time_lower,
+                  time_upper,
+               ]
+               row += cov_reference_dict[key]
+               row += [ age_id, time_id, split_reference_id ]
                #
-               # key
-               for key in cov_reference_dict :
-                  #
-                  # node_id
-                  node_id = key[0]
-                  #
-                  # split_reference_id
-                  split_reference_id = key[1]
-                  #
-                  # row
-                  subgroup_id = 0
-                  weight_id   = None
-                  row = [
-                     integrand_id,
-                     node_id,
-                     subgroup_id,
-                     weight_id,
-                     age_lower,
-                     age_upper,
-                     time_lower,
-                     time_upper,
-                  ]
-                  row += cov_reference_dict[key]
-                  row += [ age_id, time_id, split_reference_id ]
-                  #
-                  # add to row_list
-                  row_list.append( row )
+               # add to row_list
+               row_list.append( row )
    #
    # put new avgint table in fit_node_database
    connection    = dismod_at.create_connection(
       fit_node_database, new = False, readonly = False
    )
+   at_cascade.set_sqlite_profile(connection, sqlite_profile)
    command       = 'DROP TABLE IF EXISTS ' + tbl_name
    dismod_at.sql_command(connection, command)
    dismod_at.create_table(connection, tbl_name, col_name, col_type, row_list)
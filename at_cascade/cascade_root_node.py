@@ -60,6 +60,18 @@ For each job, the first type of fit is attempted.
 If it fails, and there is a second type of fit, it is attempted.
 If it also fails, the corresponding job fails.
 
+resume
+******
+If this is ``True`` , the cascade is continued using the
+:ref:`run_parallel@Job Journal` from a previous run of this cascade;
+see :ref:`run_parallel@resume` .
+If the root job is done in the journal,
+*root_fit_database* is not changed and the root job is not run again.
+Otherwise, the cascade starts from the beginning.
+The *all_node_database* and *fit_goal_set* should be the same as for the
+previous run.
+If this is ``False`` , the cascade starts from the beginning.
+
 Output dismod.db
 ****************
 Upon return for cascade_root_node,
@@ -113,13 +125,15 @@ def cascade_root_node(
    all_node_database       ,
    fit_goal_set            ,
    no_ode_fit              = False,
-   fit_type_list           = [ 'both', 'fixed' ]
+   fit_type_list           = [ 'both', 'fixed' ],
+   resume                  = False,
 # )
 ) :
    assert type(all_node_database)  == str
    assert type(fit_goal_set)       == set
    assert type(no_ode_fit)         == bool
    assert type(fit_type_list)      == list
+   assert type(resume)             == bool
    # END syntax
    #
    # split_reference_table, option_all_table
@@ -152,11 +166,29 @@ def cascade_root_node(
       msg += f'{all_node_database} root_node_name = {root_node_name}'
       assert False, msg
    #
+   # root_done
+   # is the root job done in the job journal
+   root_done = False
+   if resume :
+      root_job_name = root_node_name
+      if 'root_split_reference_name' in option_all_dict :
+         split_reference_name = option_all_dict['root_split_reference_name']
+         root_job_name        = f'{root_job_name}.{split_reference_name}'
+      job_journal_database = f'{result_dir}/job_journal.db'
+      if os.path.exists(job_journal_database) :
+         job_journal    = at_cascade.job_journal_class(job_journal_database)
+         journal_status = job_journal.get_status()
+         job_journal.close()
+         if root_job_name in journal_status :
+            root_done = journal_status[root_job_name] == 'done'
+   #
    # root_fit_database
    root_fit_database = f'{result_dir}/{root_node_name}/dismod.db'
    if not os.path.exists( f'{result_dir}/{root_node_name}' ) :
       os.makedirs( f'{result_dir}/{root_node_name}' )
-   if not no_ode_fit :
+   if root_done :
+      pass
+   elif not no_ode_fit :
       at_cascade.copy_root_db(root_node_database, root_fit_database)
    else :
       at_cascade.no_ode_fit(
@@ -217,4 +249,5 @@ def cascade_root_node(
       skip_start_job    = skip_start_job,
       max_number_cpu    = max_number_cpu,
       fit_type_list     = fit_type_list,
+      resume            = resume,
    )
@@ -164,13 +164,22 @@ def check_log(
    # message_dict
    message_dict = dict()
    #
+   # job_id_list
+   # the start job and its descendants are contiguous in pre-order
+   start_preorder_id = job_table[start_job_id]['preorder_id']
+   end_preorder_id   = job_table[start_job_id]['end_preorder_id']
+   job_id_list       = list()
+   for preorder_id in range(start_preorder_id, end_preorder_id) :
+      job_id_list.append( job_table[preorder_id]['preorder_job_id'] )
+   job_id_list = sorted( job_id_list )
+   #
    # job_id
-   for job_id in range( len(job_table) ) :
+   for job_id in job_id_list :
       #
       # include_this_job
       job_depth = at_cascade.job_descendent(job_table, start_job_id, job_id)
       if max_job_depth == None :
-         include_this_job = job_depth != None
+         include_this_job = True
       else :
          include_this_job = job_depth <= max_job_depth
       if include_this_job :
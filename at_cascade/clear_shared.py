@@ -28,7 +28,9 @@ to run the cascade:
 
    FileExistsError: [Errno 17] File exists: *name*
 
-where *name* ends with ``_number_cpu_inuse`` or ``_job_status``.
+where *name* ends with ``_number_cpu_inuse`` , ``_job_status`` ,
+``_job_count`` , ``_ready_queue`` , ``_job_priority`` ,
+``_job_memory`` , or ``_memory`` .
 This may happen if the previous :ref:`run_parallel-name`
 did not terminate cleanly; e.g., if the system crashed.
 
@@ -69,7 +71,10 @@ def clear_shared(all_node_database, job_name) :
    shared_memory_prefix_plus = f'{shared_memory_prefix}_{job_name}'
    #
    # shared_memory_name_list
-   shared_memory_suffix_list = [ '_number_cpu_inuse', '_job_status', ]
+   shared_memory_suffix_list = [
+      '_number_cpu_inuse', '_job_status', '_job_count', '_ready_queue',
+      '_job_priority', '_job_memory', '_memory',
+   ]
    #
    # shared_memory_suffix
    for shared_memory_suffix in shared_memory_suffix_list :
@@ -141,22 +141,18 @@ If *omega_data* is ``None`` the
 :ref:`omega_all@omega_all Table` and
 :ref:`omega_all@omega_index Table` will be empty.
 
+cov_reference
+*************
+The :ref:`cov_reference_table-name` is computed from the data table in the
+:ref:`glossary@root_node_database` using
+:ref:`create_cov_reference_table-name` .
+
 
 {xrst_end create_all_node_db}
 '''
 import dismod_at
 import at_cascade
 # ----------------------------------------------------------------------------
-# is_descendant
-def is_descendant(node_table, ancestor_node_id, this_node_id) :
-   if this_node_id == ancestor_node_id :
-      return True
-   while this_node_id is not None :
-      this_node_id = node_table[this_node_id]['parent']
-      if this_node_id == ancestor_node_id :
-         return True
-   return False
-# ----------------------------------------------------------------------------
 # BEGIN syntax
 # at_cascade.create_all_node_db
 def create_all_node_db(
@@ -344,6 +340,9 @@ def create_all_node_db(
    dismod_at.create_table(
       all_connection, tbl_name, col_name, col_type, row_list
    )
+   command  = 'CREATE INDEX omega_index_index '
+   command += 'ON omega_index(node_id, split_reference_id)'
+   dismod_at.sql_command(all_connection, command)
    #
    # option_all table
    if root_node_name != option_all['root_node_name' ] :
@@ -433,3 +432,8 @@ def create_all_node_db(
    #
    # close
    all_connection.close()
+   #
+   # cov_reference table
+   at_cascade.create_cov_reference_table(
+      all_node_database, root_node_database
+   )
@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin create_cov_reference_table}
+
+Create the Covariate Reference Table in the All Node Database
+#############################################################
+
+Syntax
+******
+{xrst_literal
+   # BEGIN DEF
+   # END DEF
+}
+
+all_node_database
+*****************
+is a python string specifying the location of the
+:ref:`all_node_db-name`
+relative to the current working directory.
+The :ref:`option_all_table-name` and :ref:`split_reference_table-name`
+must already be in this database.
+If the :ref:`cov_reference_table-name` is already in this database,
+it is replaced.
+The :ref:`cov_reference_table@cov_reference_root` table,
+which identifies the version of the root node database used to compute
+the references, is also created (or replaced).
+
+root_node_database
+******************
+is a python string specifying the location of the
+:ref:`glossary@root_node_database`
+relative to the current working directory.
+The node, covariate, and data tables in this database are used to
+compute the covariate references.
+
+Method
+******
+For each value of the splitting covariate,
+the sum and count of the non-null values of each relative covariate,
+for the data rows that are within the max difference,
+are computed for every node with one pass through the data table.
+These sums and counts are then accumulated from each node to its parent,
+one depth at a time, starting with the nodes that are farthest from the
+root of the node tree; see :ref:`get_node_tree-name` .
+This yields the sum and count for the subtree below every node.
+The reference is the sum divided by the count
+(when the count is not zero).
+
+Example
+*******
+:ref:`create_all_node_db-name` calls this routine after it has
+created the other tables in the all node database.
+
+{xrst_end create_cov_reference_table}
+'''
+import os
+import math
+import numpy
+import dismod_at
+import at_cascade
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.create_cov_reference_table
+def create_cov_reference_table(
+   all_node_database  ,
+   root_node_database ,
+# )
+) :
+   assert type(all_node_database) == str
+   assert type(root_node_database) == str
+   # END DEF
+   #
+   # root_stat
+   # status of the root node database before its tables are read
+   root_stat = os.stat(root_node_database)
+   #
+   # root_table
+   root_table = dict()
+   connection = dismod_at.create_connection(
+      root_node_database, new = False, readonly = True
+   )
+   for tbl_name in [ 'node', 'covariate', 'data' ] :
+      root_table[tbl_name] = dismod_at.get_table_dict(connection, tbl_name)
+   connection.close()
+   #
+   # all_table
+   all_table  = dict()
+   connection = dismod_at.create_connection(
+      all_node_database, new = False, readonly = True
+   )
+   for tbl_name in [ 'option_all', 'split_reference' ] :
+      all_table[tbl_name] = dismod_at.get_table_dict(connection, tbl_name)
+   connection.close()
+   #
+   # cov_info
+   cov_info = at_cascade.get_cov_info(
+      all_table['option_all'],
+      root_table['covariate'],
+      all_table['split_reference'],
+   )
+   #
+   # rel_covariate_list
+   rel_covariate_list = sorted( cov_info['rel_covariate_id_set'] )
+   #
+   # split_covariate_id, split_reference_list
+   if len( all_table['split_reference'] ) == 0 :
+      split_covariate_id   = None
+      split_reference_list = [ None ]
+   else :
+      split_covariate_id   = cov_info['split_covariate_id']
+      split_reference_list = list( range( len(all_table['split_reference']) ) )
+   #
+   # n_node, n_covariate
+   n_node      = len( root_table['node'] )
+   n_covariate = len( root_table['covariate'] )
+   #
+   # node_tree, depth_list
+   # depth_list[depth] is the nodes that have the specified depth
+   node_tree  = at_cascade.get_node_tree( root_table['node'] )
+   max_depth  = int( numpy.max(node_tree.depth_array, initial = 0) )
+   depth_list = list()
+   for depth in range(max_depth + 1) :
+      depth_list.append( numpy.flatnonzero(node_tree.depth_array == depth) )
+   #
+   # data_node
+   data_node = numpy.array(
+      [ row['node_id'] for row in root_table['data'] ], dtype = int
+   )
+   #
+   # x
+   # x[i, covariate_id] is the value of the covariate for data row i
+   # (nan if the value is null)
+   x = numpy.empty( (len(data_node), n_covariate), dtype = float )
+   for covariate_id in range(n_covariate) :
+      label = f'x_{covariate_id}'
+      x[:, covariate_id] = numpy.array(
+         [ row[label] for row in root_table['data'] ], dtype = float
+      )
+   #
+   # row_list
+   row_list = list()
+   for split_reference_id in split_reference_list :
+      #
+      # in_bnd
+      # in_bnd[i] is true if data row i is within the max difference
+      # for all the covariates.
+      in_bnd = numpy.ones( len(data_node), dtype = bool )
+      for covariate_id in range(n_covariate) :
+         covariate_row  = root_table['covariate'][covariate_id]
+         reference      = covariate_row['reference']
+         if covariate_id == split_covariate_id :
+            row       = all_table['split_reference'][split_reference_id]
+            reference = row['split_reference_value']
+         max_difference = covariate_row['max_difference']
+         if max_difference not in [ None, math.inf ] :
+            x_column  = x[:, covariate_id]
+            abs_diff  = numpy.abs( x_column - reference )
+            in_bnd   &= numpy.isnan(x_column) | (abs_diff <= max_difference)
+      #
+      # total, count
+      # total[node_id, j], count[node_id, j] is the sum and number of
+      # non-null values for covariate rel_covariate_list[j] and the data rows
+      # with node_id that are within the max difference.
+      n_rel = len(rel_covariate_list)
+      total = numpy.zeros( (n_node, n_rel), dtype = float )
+      count = numpy.zeros( (n_node, n_rel), dtype = int )
+      for (j, covariate_id) in enumerate(rel_covariate_list) :
+         x_column    = x[:, covariate_id]
+         ok          = in_bnd & numpy.logical_not( numpy.isnan(x_column) )
+         total[:, j] = numpy.bincount(
+            data_node[ok], weights = x_column[ok], minlength = n_node
+         )
+         count[:, j] = numpy.bincount(data_node[ok], minlength = n_node)
+      #
+      # total, count
+      # accumulate so they correspond to the subtree below each node
+      for depth in range(max_depth, 0, -1) :
+         node_array   = depth_list[depth]
+         parent_array = node_tree.parent_array[node_array]
+         numpy.add.at(total, parent_array, total[node_array])
+         numpy.add.at(count, parent_array, count[node_array])
+      #
+      # row_list
+      for node_id in range(n_node) :
+         for (j, covariate_id) in enumerate(rel_covariate_list) :
+            if count[node_id, j] > 0 :
+               reference = float( total[node_id, j] / count[node_id, j] )
+               row_list.append(
+                  [ node_id, split_reference_id, covariate_id, reference ]
+               )
+   #
+   # cov_reference table
+   connection = dismod_at.create_connection(
+      all_node_database, new = False, readonly = False
+   )
+   tbl_name = 'cov_reference'
+   if at_cascade.table_exists(connection, tbl_name) :
+      dismod_at.sql_command(connection, f'DROP TABLE {tbl_name}')
+   col_name = [ 'node_id', 'split_reference_id', 'covariate_id', 'reference' ]
+   col_type = [ 'integer', 'integer',            'integer',      'real'      ]
+   dismod_at.create_table(connection, tbl_name, col_name, col_type, row_list)
+   command  = 'CREATE INDEX cov_reference_index '
+   command += 'ON cov_reference(node_id, split_reference_id)'
+   dismod_at.sql_command(connection, command)
+   #
+   # cov_reference_root table
+   tbl_name = 'cov_reference_root'
+   if at_cascade.table_exists(connection, tbl_name) :
+      dismod_at.sql_command(connection, f'DROP TABLE {tbl_name}')
+   col_name = [ 'file_size', 'mtime_ns' ]
+   col_type = [ 'integer',   'integer'  ]
+   row_list = [ [ root_stat.st_size, root_stat.st_mtime_ns ] ]
+   dismod_at.create_table(connection, tbl_name, col_name, col_type, row_list)
+   connection.close()
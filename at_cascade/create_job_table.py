@@ -108,6 +108,43 @@ this job is completed. If end_child_job_id is equal to start_child_job_id,
 there are no jobs that require the results of this job.
 Note that this job is the parent of each job between the start and end,
 
+job_depth
+=========
+This is the number of generations between the first job in the table
+and this job; i.e., *job_depth* is zero for the first job, one for its
+child jobs, and so on.
+
+preorder_id
+===========
+This is the index of this job in a depth first, pre-order, traversal
+of the job tree where the child jobs are visited in job_id order.
+All the descendants of a job come directly after it in this ordering.
+
+end_preorder_id
+===============
+This is the *preorder_id* for this job plus the number of jobs
+in the sub-tree that has this job at its root (including this job).
+A job with index *job_id* is a descendant of (or equal to)
+the job with index *ancestor_id* if and only if
+
+| |tab| *job_table* [ *ancestor_id* ][ ``'preorder_id'`` ]
+  <= *job_table* [ *job_id* ][ ``'preorder_id'`` ]
+| |tab| *job_table* [ *job_id* ][ ``'preorder_id'`` ]
+  < *job_table* [ *ancestor_id* ][ ``'end_preorder_id'`` ]
+
+preorder_job_id
+===============
+This is the job_id for the job that has *preorder_id* equal to the
+index of this row in the job table; i.e., it is the inverse of the
+*preorder_id* mapping.
+It follows that the descendants of the job with index *ancestor_id* are
+
+| |tab| *job_table* [ *preorder_id* ][ ``'preorder_job_id'`` ]
+
+for *preorder_id* between
+*job_table* [ *ancestor_id* ][ ``'preorder_id'`` ] + 1 and
+*job_table* [ *ancestor_id* ][ ``'end_preorder_id'`` ] - 1.
+
 
 {xrst_end create_job_table}
 '''
@@ -303,6 +340,35 @@ def create_job_table(
       # job_id
       job_id += 1
    #
+   # job_table[job_id]['job_depth']
+   job_table[0]['job_depth'] = 0
+   for row in job_table[1 :] :
+      row['job_depth'] = job_table[ row['parent_job_id'] ]['job_depth'] + 1
+   #
+   # job_table[preorder_id]['preorder_job_id']
+   # push child jobs in reverse order so they are visited in job_id order
+   preorder_id = 0
+   stack       = [ 0 ]
+   while len(stack) > 0 :
+      job_id = stack.pop()
+      row    = job_table[job_id]
+      row['preorder_id'] = preorder_id
+      job_table[preorder_id]['preorder_job_id'] = job_id
+      preorder_id += 1
+      stack += reversed( range(
+         row['start_child_job_id'], row['end_child_job_id']
+      ) )
+   #
+   # job_table[job_id]['end_preorder_id']
+   # child jobs have larger job_id than their parent job
+   n_subtree = len(job_table) * [ 1 ]
+   for job_id in reversed( range( len(job_table) ) ) :
+      row         = job_table[job_id]
+      child_range = range( row['start_child_job_id'], row['end_child_job_id'] )
+      for child_job_id in child_range :
+         n_subtree[job_id] += n_subtree[child_job_id]
+      row['end_preorder_id'] = row['preorder_id'] + n_subtree[job_id]
+   #
    # BEGIN RETURN
    # ...
    assert type(job_table) == list
@@ -123,26 +123,183 @@ In this case both the means and standard deviations in the value priors
 are replaced using the results of the fit.
 Otherwise, only the means are replaced.
 
+Template
+********
+The shift databases are not copies of the *fit_node_database* .
+An in memory template is created once for each call to create_shift_db.
+It contains the input tables in the *fit_node_database*
+(the tables that are replaced for each shift database are empty).
+It does not contain the dismod_at output tables, the avgint table,
+or the predict tables mentioned above.
+Each shift database starts as an in memory copy of this template.
+After its tables are replaced, it is written to disk in one transaction
+using the pragmas in :ref:`option_all_table@sqlite_profile` .
+It is written to a temporary file in the same directory which is then
+renamed, so a shift database is either complete or is not changed.
+
+Threads
+*******
+If :ref:`option_all_table@shift_db_thread` is greater than one,
+the shift databases are written by a pool with that many threads.
+The number of shift databases that are waiting to be written is at most
+two times *shift_db_thread* .
+
 {xrst_end create_shift_db}
 '''
 # ----------------------------------------------------------------------------
 import os
 import math
 import copy
-import shutil
-import statistics
+import sqlite3
+import threading
+import concurrent.futures
+import numpy
 import dismod_at
 import at_cascade
 # ----------------------------------------------------------------------------
-def add_index_to_name(table, name_col) :
-   row   = table[-1]
-   name  = row[name_col]
-   ch    = name[-1]
-   while name != '' and name[-1] in '0123456789' :
-      name = name[: -1]
-   if name[-1] == '_' :
-      name = name[: -1]
-   row[name_col] = name + '_' + str( len(table) )
+# drop_table_set
+# These tables are in a fit_node_database but are not needed by the
+# shift databases: the dismod_at output tables, the avgint table
+# (see empty_avgint_table), and the predict tables used to create the priors.
+drop_table_set = {
+   'age_avg',
+   'avgint',
+   'bnd_mulcov',
+   'c_shift_avgint',
+   'c_shift_predict_fit_var',
+   'c_shift_predict_sample',
+   'data_sim',
+   'data_subset',
+   'depend_var',
+   'fit_data_subset',
+   'fit_var',
+   'hes_fixed',
+   'hes_random',
+   'mixed_info',
+   'predict',
+   'prior_sim',
+   'sample',
+   'scale_var',
+   'start_var',
+   'trace_fixed',
+   'truth_var',
+   'var',
+}
+# ----------------------------------------------------------------------------
+# template = create_template(fit_node_database, empty_table_set)
+#
+# template:
+# is an in memory sqlite database that contains all the tables in
+# fit_node_database except those in drop_table_set.
+# The tables in empty_table_set have the same columns as in
+# fit_node_database but have no rows.
+# A shift database is created by copying this template using the sqlite
+# backup API, so only the pages for these tables are written.
+# The template can be used by more than one thread (see write_shift_db).
+def create_template(fit_node_database, empty_table_set) :
+   assert type(fit_node_database) == str
+   assert type(empty_table_set) == set
+   #
+   # template
+   template = sqlite3.connect(':memory:', check_same_thread = False)
+   template.execute(
+      'ATTACH DATABASE ? AS fit', ( os.path.abspath(fit_node_database) , )
+   )
+   #
+   # schema_list
+   command     = 'SELECT type, name, tbl_name, sql FROM fit.sqlite_master'
+   schema_list = template.execute(command).fetchall()
+   #
+   # template tables
+   for (sql_type, name, tbl_name, sql) in schema_list :
+      keep = sql_type == 'table' and not name.startswith('sqlite_')
+      if keep and name not in drop_table_set :
+         template.execute(sql)
+         if name not in empty_table_set :
+            command = f'INSERT INTO main.{name} SELECT * FROM fit.{name}'
+            template.execute(command)
+   #
+   # template indices
+   for (sql_type, name, tbl_name, sql) in schema_list :
+      if sql_type == 'index' and sql is not None :
+         if tbl_name not in drop_table_set :
+            template.execute(sql)
+   #
+   template.commit()
+   template.execute('DETACH DATABASE fit')
+   return template
+# ----------------------------------------------------------------------------
+# write_shift_db(
+#  template, template_lock, shift_database, shift_table, sqlite_profile
+# )
+#
+# Create shift_database as a copy of the template, replace the tables in
+# shift_table, and create an empty avgint table.
+# The changes are made to an in memory copy of the template, which is then
+# written in one transaction using the sqlite backup API. It is written to a
+# temporary file that is renamed to shift_database, so shift_database is
+# either complete or does not change.
+# This only uses its arguments and the shift_database, so different
+# shift databases can be written at the same time by different threads.
+# The template_lock is a threading.Lock that is held while the template
+# is being copied.
+def write_shift_db(
+   template, template_lock, shift_database, shift_table, sqlite_profile
+) :
+   #
+   # memory_connection
+   memory_connection = sqlite3.connect(':memory:')
+   #
+   # copy the template
+   with template_lock :
+      template.backup(memory_connection)
+   #
+   # replace shift_table
+   for name in shift_table :
+      dismod_at.replace_table(
+         memory_connection, name, shift_table[name]
+      )
+   #
+   # empty_avgint_table
+   at_cascade.empty_avgint_table(memory_connection)
+   #
+   # shift_connection
+   # write to a temporary file and then rename it to shift_database
+   temporary_database = f'{shift_database}.{os.getpid()}.tmp'
+   new              = True
+   shift_connection = dismod_at.create_connection(temporary_database, new)
+   at_cascade.set_sqlite_profile(shift_connection, sqlite_profile)
+   memory_connection.backup(shift_connection)
+   #
+   memory_connection.close()
+   shift_connection.close()
+   os.replace(temporary_database, shift_database)
+# ----------------------------------------------------------------------------
+# prior_name_root = get_prior_name_root(prior_table)
+#
+# prior_name_root[prior_id] is prior_table[prior_id]['prior_name'] with
+# any trailing digits, and then any trailing underscore, removed.
+# This is computed once for each fit so that add_prior does not need to
+# parse the name of every prior it adds.
+def get_prior_name_root(prior_table) :
+   prior_name_root = list()
+   for row in prior_table :
+      name = row['prior_name'].rstrip('0123456789')
+      if name.endswith('_') :
+         name = name[: -1]
+      prior_name_root.append(name)
+   return prior_name_root
+# ----------------------------------------------------------------------------
+# prior_id = add_prior(prior_table, prior_row, name_root)
+#
+# Append prior_row to prior_table and set its prior_name to
+# name_root followed by an underscore and the new length of prior_table.
+# The return value prior_id is the index of the new row in prior_table.
+def add_prior(prior_table, prior_row, name_root) :
+   prior_id = len(prior_table)
+   prior_row['prior_name'] = name_root + '_' + str(prior_id + 1)
+   prior_table.append(prior_row)
+   return prior_id
 # ---------------------------------------------------------------------------
 def get_age_id_next_list(smooth_table, smooth_grid_table, age_table ) :
    #
@@ -208,6 +365,144 @@ def get_time_id_next_list(smooth_table, smooth_grid_table, time_table ) :
       time_id_next_list.append( time_id_dict )
    return time_id_next_list
 # ----------------------------------------------------------------------------
+# sample_matrix = get_sample_matrix(fit_node_database, n_avgint)
+#
+# sample_matrix:
+# is a numpy array with shape (n_sample, n_avgint) where
+# sample_matrix[sample_index, avgint_id] is the avg_integrand for the
+# c_shift_predict_sample row with this sample_index and avgint_id
+# (nan if there is no such row).
+# The table is read with one query and is not converted to a list of dict.
+def get_sample_matrix(fit_node_database, n_avgint) :
+   #
+   # sample_index, avgint_id, avg_integrand
+   connection = dismod_at.create_connection(
+      fit_node_database, new = False, readonly = True
+   )
+   command  = 'SELECT sample_index, avgint_id, avg_integrand '
+   command += 'FROM c_shift_predict_sample'
+   result   = dismod_at.sql_command(connection, command)
+   connection.close()
+   n_row         = len(result)
+   sample_index  = numpy.fromiter(
+      (row[0] for row in result), dtype = int, count = n_row
+   )
+   avgint_id     = numpy.fromiter(
+      (row[1] for row in result), dtype = int, count = n_row
+   )
+   avg_integrand = numpy.fromiter(
+      (row[2] for row in result), dtype = float, count = n_row
+   )
+   del result
+   #
+   # sample_matrix
+   n_sample = 0
+   if n_row > 0 :
+      n_sample = int( sample_index.max() ) + 1
+   sample_matrix = numpy.full( (n_sample, n_avgint), numpy.nan )
+   sample_matrix[sample_index, avgint_id] = avg_integrand
+   return sample_matrix
+# ----------------------------------------------------------------------------
+# fit_sample = sample_std_class(c_shift_avgint_table, sample_matrix)
+#
+# c_shift_avgint_table:
+# is the c_shift_avgint table in the fit_node_database.
+#
+# sample_matrix:
+# is the return value of get_sample_matrix for this fit_node_database.
+#
+# std = fit_sample.std(key, mean, eta)
+# is the standard deviation of the samples for the c_shift_avgint row
+# corresponding to key, relative to mean (instead of the sample mean); i.e.,
+# the same as statistics.stdev(samples, xbar = mean).
+# If eta is not None, the standard deviation is computed in log space;
+# i.e., using log(sample + eta) and log(mean + eta),
+# and then transformed back to the original space.
+#
+# The sample mean and the sum of squared deviations from the sample mean
+# are computed for all the avgint rows at once (once for each eta value).
+# Thus the sum of squares relative to mean is
+#     sum_sq + n * (sample_mean - mean)^2
+# and each call to std takes constant time.
+class sample_std_class :
+   #
+   def __init__(self, c_shift_avgint_table, sample_matrix) :
+      #
+      # self.key2avgint_id
+      self.key2avgint_id = dict()
+      for (avgint_id, avgint_row) in enumerate(c_shift_avgint_table) :
+         integrand_id       = avgint_row['integrand_id']
+         node_id            = avgint_row['node_id']
+         age_id             = avgint_row['c_age_id']
+         time_id            = avgint_row['c_time_id']
+         split_id           = avgint_row['c_split_reference_id']
+         key           = (integrand_id, node_id, split_id, age_id, time_id)
+         self.key2avgint_id[key] = avgint_id
+      #
+      # self.sample_matrix
+      self.sample_matrix = sample_matrix
+      #
+      # self.moment
+      # self.moment[eta] = (count, sample_mean, sum_sq) where count is the
+      # number of finite samples for each avgint_id and the other values are
+      # in the space corresponding to eta (eta = None is the original space).
+      # A sample + eta that is not positive has a log that is not finite
+      # and hence is not included in count.
+      self.moment = dict()
+   #
+   def get_moment(self, eta) :
+      if eta not in self.moment :
+         with numpy.errstate(invalid = 'ignore', divide = 'ignore') :
+            if eta is None :
+               matrix = self.sample_matrix
+            else :
+               matrix = numpy.log( self.sample_matrix + eta )
+            finite      = numpy.isfinite(matrix)
+            matrix      = numpy.where(finite, matrix, 0.0)
+            count       = numpy.sum(finite, axis = 0)
+            sample_mean = numpy.sum(matrix, axis = 0) / count
+            deviation   = numpy.where(finite, matrix - sample_mean, 0.0)
+            sum_sq      = numpy.sum(deviation * deviation, axis = 0)
+         self.moment[eta] = (count, sample_mean, sum_sq)
+      return self.moment[eta]
+   #
+   def std(self, key, mean, eta) :
+      avgint_id = self.key2avgint_id[key]
+      #
+      # n
+      n = int( numpy.sum( ~ numpy.isnan(self.sample_matrix[:, avgint_id]) ) )
+      if n < 2 :
+         msg  = 'create_shift_db: less than two samples for '
+         msg += f'c_shift_avgint avgint_id = {avgint_id}'
+         assert False, msg
+      if self.get_moment(None)[0][avgint_id] != n :
+         msg  = 'create_shift_db: a sample is not finite for '
+         msg += f'c_shift_avgint avgint_id = {avgint_id}'
+         assert False, msg
+      #
+      # count, sample_mean, sum_sq, center
+      (count, sample_mean, sum_sq) = self.get_moment(eta)
+      if count[avgint_id] != n :
+         msg  = 'create_shift_db: a sample + eta is not positive for '
+         msg += f'c_shift_avgint avgint_id = {avgint_id}, eta = {eta}'
+         assert False, msg
+      if eta is None :
+         center = mean
+      else :
+         center = math.log(mean + eta)
+      #
+      # std
+      diff = sample_mean[avgint_id] - center
+      std  = math.sqrt( (sum_sq[avgint_id] + n * diff * diff) / (n - 1) )
+      if eta is not None :
+         # inverse log transformation
+         std = (math.exp(std) - 1) * (mean + eta)
+      if not math.isfinite(std) :
+         msg  = 'create_shift_db: the sample standard deviation is '
+         msg += f'{std} for c_shift_avgint avgint_id = {avgint_id}'
+         assert False, msg
+      return std
+# ----------------------------------------------------------------------------
 # The smoothing for the new shift_table['smooth_grid'] row is the most
 # recent smoothing added to shift_table['smooth']; i.e., its smoothing_id
 # is len( shift_table['smooth'] ) - 1.
@@ -215,6 +510,7 @@ def add_shift_grid_row(
    fit_fit_var,
    fit_sample,
    fit_table,
+   fit_prior_name_root,
    shift_table,
    fit_grid_row,
    integrand_id,
@@ -270,7 +566,6 @@ def add_shift_grid_row(
          assert shift_value_prior_id is None
       else :
          assert shift_const_value is None
-         shift_value_prior_id  = len( shift_table['prior'] )
          #
          # shift_prior_row
          shift_prior_row = copy.copy( fit_prior_row )
@@ -297,35 +592,22 @@ def add_shift_grid_row(
             mean                     = max(mean, lower)
             shift_prior_row['mean']  = mean
             #
-            # if no_ode_fit then len(fit_sample) is zero
-            if len(fit_sample) > 0 :
+            # if no_ode_fit then fit_sample is None
+            if fit_sample is not None :
                #
                # std
                eta        = fit_prior_row['eta']
-               if eta is None :
-                  std  = statistics.stdev(fit_sample[key], xbar=mean)
-               else:
-                  # The statistics were computed in log space
-                  # and then transformed to original space.
-                  #
-                  # log_sample
-                  log_sample = list()
-                  for sample in fit_sample[key] :
-                     log_sample.append( math.log( sample + eta ) )
-                  #
-                  # log_std
-                  log_mean = math.log(mean + eta)
-                  log_std  = statistics.stdev(log_sample, xbar = log_mean)
-                  #
-                  # inverse log transformation
-                  std      = (math.exp(log_std) - 1) * (mean + eta)
+               std        = fit_sample.std(key, mean, eta)
                #
                # shift_prior_row['std']
                shift_prior_row['std']         = shift_prior_std_factor * std
          #
-         # shift_table['prior']
-         shift_table['prior'].append( shift_prior_row )
-         add_index_to_name( shift_table['prior'], 'prior_name' )
+         # shift_table['prior'], shift_value_prior_id
+         shift_value_prior_id = add_prior(
+            shift_table['prior'],
+            shift_prior_row,
+            fit_prior_name_root[fit_prior_id],
+         )
    # -----------------------------------------------------------------------
    # dage_prior
    # -----------------------------------------------------------------------
@@ -337,9 +619,11 @@ def add_shift_grid_row(
       shift_prior_row    = copy.copy( fit_prior_row )
       if dage_fit_var is not None :
          shift_prior_row['mean'] = dage_fit_var
-      shift_dage_prior_id  = len( shift_table['prior'] )
-      shift_table['prior'].append( shift_prior_row )
-      add_index_to_name( shift_table['prior'], 'prior_name' )
+      shift_dage_prior_id = add_prior(
+         shift_table['prior'],
+         shift_prior_row,
+         fit_prior_name_root[fit_prior_id],
+      )
    # -----------------------------------------------------------------------
    # dtime_prior
    # -----------------------------------------------------------------------
@@ -349,11 +633,13 @@ def add_shift_grid_row(
    else :
       fit_prior_row       = fit_table['prior'][fit_prior_id]
       shift_prior_row       = copy.copy( fit_prior_row )
-      shift_dtime_prior_id  = len( shift_table['prior'] )
       if dtime_fit_var is not None :
          shift_prior_row['mean'] = dtime_fit_var
-      shift_table['prior'].append( shift_prior_row )
-      add_index_to_name( shift_table['prior'], 'prior_name' )
+      shift_dtime_prior_id = add_prior(
+         shift_table['prior'],
+         shift_prior_row,
+         fit_prior_name_root[fit_prior_id],
+      )
    # -----------------------------------------------------------------------
    # shift_grid_row
    shift_grid_row = copy.copy( fit_grid_row )
@@ -384,37 +670,38 @@ def create_shift_db(
    # predict_sample
    predict_sample = not no_ode_fit
    #
-   # all_table
-   connection = dismod_at.create_connection(
-      all_node_database, new = False, readonly = True
-   )
-   all_table  = dict()
-   for name in [
-      'option_all',
-      'split_reference',
-      'mulcov_freeze',
-   ] :
-      all_table[name] =  dismod_at.get_table_dict(connection, name)
-   connection.close()
+   # all_node_info, option_all_dict
+   all_node_info   = at_cascade.get_all_node_info(all_node_database)
+   option_all_dict = all_node_info['option_all_dict']
    #
    # root_node_database
-   root_node_database = None
-   for row in all_table['option_all'] :
-      if row['option_name'] == 'root_node_database' :
-         root_node_database = row['option_value']
-   assert root_node_database != None
+   assert 'root_node_database' in option_all_dict
+   root_node_database = option_all_dict['root_node_database']
    #
    # shift_prior_std_factor
    shift_prior_std_factor = 1.0
-   for row in all_table['option_all'] :
-      if row['option_name'] == 'shift_prior_std_factor' :
-         shift_prior_std_factor = float( row['option_value'] )
+   if 'shift_prior_std_factor' in option_all_dict :
+      shift_prior_std_factor = float(
+         option_all_dict['shift_prior_std_factor']
+      )
+   #
+   # shift_db_thread
+   shift_db_thread = 1
+   if 'shift_db_thread' in option_all_dict :
+      shift_db_thread = int( option_all_dict['shift_db_thread'] )
+      if shift_db_thread < 1 :
+         msg = 'option_all table: shift_db_thread is less than one'
+         assert False, msg
+   #
+   # sqlite_profile
+   sqlite_profile = 'default'
+   if 'sqlite_profile' in option_all_dict :
+      sqlite_profile = option_all_dict['sqlite_profile']
    #
    # no_ode_ignore
    no_ode_ignore = ''
-   for row in all_table['option_all'] :
-      if row['option_name'] == 'no_ode_ignore' :
-         no_ode_ignore = row['option_value'].strip()
+   if 'no_ode_ignore' in option_all_dict :
+      no_ode_ignore = option_all_dict['no_ode_ignore'].strip()
    #
    # fit_table
    fit_or_root = at_cascade.fit_or_root_class(
@@ -440,11 +727,16 @@ def create_shift_db(
       'var',
    ] :
       fit_table[name] = fit_or_root.get_table(name)
-   if predict_sample :
-      for name in [ 'c_shift_predict_sample', 'sample' ] :
-         fit_table[name] = fit_or_root.get_table(name)
    fit_or_root.close()
    #
+   # fit_smooth_grid_index
+   fit_smooth_grid_index = at_cascade.get_smooth_grid_index(
+      fit_table['smooth_grid']
+   )
+   #
+   # fit_prior_name_root
+   fit_prior_name_root = get_prior_name_root( fit_table['prior'] )
+   #
    # age_id_next_list
    age_id_next_list = get_age_id_next_list(
       fit_table['smooth'], fit_table['smooth_grid'], fit_table['age']
@@ -465,11 +757,11 @@ def create_shift_db(
    #
    # fit_split_reference_id, split_covariate_id
    cov_info = at_cascade.get_cov_info(
-      all_table['option_all'],
+      all_node_info['option_all'],
       fit_table['covariate'],
-      all_table['split_reference']
+      all_node_info['split_reference']
    )
-   if len(all_table['split_reference']) == 0 :
+   if len(all_node_info['split_reference']) == 0 :
       fit_split_reference_id = None
       split_covaraite_id     = None
    else :
@@ -491,20 +783,14 @@ def create_shift_db(
       fit_fit_var[key] = predict_row['avg_integrand']
    #
    # fit_sample
-   fit_sample = dict()
+   fit_sample = None
    if predict_sample :
-      for predict_row in fit_table['c_shift_predict_sample'] :
-         avgint_id          = predict_row['avgint_id']
-         avgint_row         = fit_table['c_shift_avgint'][avgint_id]
-         integrand_id       = avgint_row['integrand_id']
-         node_id            = avgint_row['node_id']
-         age_id             = avgint_row['c_age_id']
-         time_id            = avgint_row['c_time_id']
-         split_id           = avgint_row['c_split_reference_id']
-         key           = (integrand_id, node_id, split_id, age_id, time_id)
-         if not key in fit_sample :
-            fit_sample[key] = list()
-         fit_sample[key].append( predict_row['avg_integrand'] )
+      sample_matrix = get_sample_matrix(
+         fit_node_database, len( fit_table['c_shift_avgint'] )
+      )
+      fit_sample = sample_std_class(
+         fit_table['c_shift_avgint'], sample_matrix
+      )
    #
    # fit_node_name
    fit_node_name = None
@@ -518,6 +804,41 @@ def create_shift_db(
    fit_node_id = at_cascade.table_name2id(
       fit_table['node'], 'node', fit_node_name
    )
+   #
+   # shift_table_list
+   # tables that are replaced in each shift database
+   shift_table_list = [
+      'covariate',
+      'mulcov',
+      'option',
+      'rate',
+      'prior',
+      'smooth',
+      'smooth_grid',
+      'nslist',
+      'nslist_pair',
+   ]
+   shift_table_list = [
+      name for name in shift_table_list
+         if name not in at_cascade.constant_table_list
+   ]
+   #
+   # template, template_lock
+   template      = create_template(fit_node_database, set(shift_table_list) )
+   template_lock = threading.Lock()
+   #
+   # executor, pending
+   # If shift_db_thread is greater than one, the shift databases are
+   # written by a thread pool while the next shift_table is being computed.
+   # The number of shift_tables waiting to be written is bounded by
+   # 2 * shift_db_thread.
+   executor = None
+   pending  = set()
+   if shift_db_thread > 1 :
+      executor = concurrent.futures.ThreadPoolExecutor(
+         max_workers = shift_db_thread
+      )
+   #
    for shift_name in shift_databases :
       # ---------------------------------------------------------------------
       # create shift_databases[shift_name]
@@ -543,7 +864,7 @@ def create_shift_db(
       shift_node_name            = None
       shift_split_reference_name = None
       if shift_name.find('/') < 0 :
-         for row in all_table['split_reference'] :
+         for row in all_node_info['split_reference'] :
             if row['split_reference_name'] == shift_name :
                if shift_node_name != None :
                   msg  = f'{shift_name} is both a split_reference_name '
@@ -562,7 +883,7 @@ def create_shift_db(
          shift_split_reference_id = fit_split_reference_id
       else :
          shift_split_reference_id = at_cascade.table_name2id(
-            all_table['split_reference'],
+            all_node_info['split_reference'],
             'split_reference',
             shift_split_reference_name
          )
@@ -574,14 +895,13 @@ def create_shift_db(
       #
       # mulcov_freeze_set
       mulcov_freeze_set = set()
-      for row in all_table['mulcov_freeze'] :
+      for row in all_node_info['mulcov_freeze'] :
          if fit_node_id == row['fit_node_id'] :
             if fit_split_reference_id == row['split_reference_id'] :
                mulcov_freeze_set.add( row['mulcov_id'] )
       #
-      # shift_database     = fit_node_database
-      shift_database = shift_databases[shift_name]
-      shutil.copyfile(fit_node_database, shift_database)
+      # shift_database
+      shift_database   = shift_databases[shift_name]
       #
       # shift_table['option']
       # Set value for parent_node_name and other_database
@@ -613,9 +933,10 @@ def create_shift_db(
       # shift_table['covariate']
       # set shift covaraite value
       if shift_split_reference_id is not None :
-         split_row  = all_table['split_reference'][shift_split_reference_id]
-         reference  = split_row['split_reference_value']
-         shift_row  = shift_table['covariate'][split_covariate_id]
+         split_table = all_node_info['split_reference']
+         split_row   = split_table[shift_split_reference_id]
+         reference   = split_row['split_reference_value']
+         shift_row   = shift_table['covariate'][split_covariate_id]
          shift_row['reference'] = reference
       #
       # --------------------------------------------------------------------
@@ -679,23 +1000,24 @@ def create_shift_db(
             # add rows for this smoothing
             node_id  = None
             split_id = None
-            for fit_grid_row in fit_table['smooth_grid'] :
-               if fit_grid_row['smooth_id'] == fit_smooth_id :
-                  add_shift_grid_row(
-                     fit_fit_var,
-                     fit_sample,
-                     fit_table,
-                     shift_table,
-                     fit_grid_row,
-                     integrand_id,
-                     node_id,
-                     split_id,
-                     shift_prior_std_factor,
-                     freeze,
-                     copy_row,
-                     age_id_next_list[fit_smooth_id],
-                     time_id_next_list[fit_smooth_id],
-                  )
+            for fit_grid_id in fit_smooth_grid_index[fit_smooth_id] :
+               fit_grid_row = fit_table['smooth_grid'][fit_grid_id]
+               add_shift_grid_row(
+                  fit_fit_var,
+                  fit_sample,
+                  fit_table,
+                  fit_prior_name_root,
+                  shift_table,
+                  fit_grid_row,
+                  integrand_id,
+                  node_id,
+                  split_id,
+                  shift_prior_std_factor,
+                  freeze,
+                  copy_row,
+                  age_id_next_list[fit_smooth_id],
+                  time_id_next_list[fit_smooth_id],
+               )
 
       # --------------------------------------------------------------------
       # shift_table['rate']
@@ -752,23 +1074,24 @@ def create_shift_db(
             #
             # shift_table['smooth_grid']
             # add rows for this smoothing
-            for fit_grid_row in fit_table['smooth_grid'] :
-               if fit_grid_row['smooth_id'] == fit_smooth_id :
-                  add_shift_grid_row(
-                     fit_fit_var,
-                     fit_sample,
-                     fit_table,
-                     shift_table,
-                     fit_grid_row,
-                     integrand_id,
-                     shift_node_id,
-                     shift_split_reference_id,
-                     shift_prior_std_factor,
-                     freeze,
-                     copy_row,
-                     age_id_next_list[fit_smooth_id],
-                     time_id_next_list[fit_smooth_id],
-                  )
+            for fit_grid_id in fit_smooth_grid_index[fit_smooth_id] :
+               fit_grid_row = fit_table['smooth_grid'][fit_grid_id]
+               add_shift_grid_row(
+                  fit_fit_var,
+                  fit_sample,
+                  fit_table,
+                  fit_prior_name_root,
+                  shift_table,
+                  fit_grid_row,
+                  integrand_id,
+                  shift_node_id,
+                  shift_split_reference_id,
+                  shift_prior_std_factor,
+                  freeze,
+                  copy_row,
+                  age_id_next_list[fit_smooth_id],
+                  time_id_next_list[fit_smooth_id],
+               )
          # ----------------------------------------------------------------
          # fit_smooth_id
          fit_smooth_id = None
@@ -795,54 +1118,53 @@ def create_shift_db(
             shift_rate_row['child_smooth_id'] = shift_smooth_id
             #
             # add rows for this smoothing to shift_table['smooth_grid']
-            for fit_grid_row in fit_table['smooth_grid'] :
-               if fit_grid_row['smooth_id'] == fit_smooth_id :
-                  #
-                  # update: shift_table['smooth_grid']
-                  shift_grid_row = copy.copy( fit_grid_row )
-                  #
-                  for ty in [
-                     'value_prior_id', 'dage_prior_id', 'dtime_prior_id'
-                         ] :
-                     prior_id  = fit_grid_row[ty]
-                     if prior_id is None :
-                        shift_grid_row[ty] = None
-                     else :
-                        prior_row = fit_table['prior'][prior_id]
-                        prior_row = copy.copy(prior_row)
-                        prior_id  = len( shift_table['prior'] )
-                        shift_table['prior'].append( prior_row )
-                        add_index_to_name(
-                           shift_table['prior'], 'prior_name'
-                        )
-                        shift_grid_row[ty] = prior_id
-                  shift_grid_row['smooth_id']      = shift_smooth_id
-                  shift_table['smooth_grid'].append( shift_grid_row )
-      #
-      # shift_connection
-      new        = False
-      shift_connection = dismod_at.create_connection(shift_database, new)
+            for fit_grid_id in fit_smooth_grid_index[fit_smooth_id] :
+               fit_grid_row = fit_table['smooth_grid'][fit_grid_id]
+               #
+               # update: shift_table['smooth_grid']
+               shift_grid_row = copy.copy( fit_grid_row )
+               #
+               for ty in [
+                  'value_prior_id', 'dage_prior_id', 'dtime_prior_id'
+                      ] :
+                  prior_id  = fit_grid_row[ty]
+                  if prior_id is None :
+                     shift_grid_row[ty] = None
+                  else :
+                     prior_row = fit_table['prior'][prior_id]
+                     prior_row = copy.copy(prior_row)
+                     shift_grid_row[ty] = add_prior(
+                        shift_table['prior'],
+                        prior_row,
+                        fit_prior_name_root[prior_id],
+                     )
+               shift_grid_row['smooth_id']      = shift_smooth_id
+               shift_table['smooth_grid'].append( shift_grid_row )
       #
-      # replace shift_table
-      for name in shift_table :
-         dismod_at.replace_table(
-            shift_connection, name, shift_table[name]
+      # write shift_database
+      if executor is None :
+         write_shift_db(
+            template, template_lock, shift_database, shift_table,
+            sqlite_profile
          )
-      #
-      # empty_avgint_table
-      at_cascade.empty_avgint_table(shift_connection)
-      #
-      # drop the following tables:
-      # c_shift_avgint, c_shift_predict_sample, c_shift_predict_fit_var
-      command  = 'DROP TABLE c_shift_avgint'
-      dismod_at.sql_command(shift_connection, command)
-      #
-      command  = 'DROP TABLE c_shift_predict_fit_var'
-      dismod_at.sql_command(shift_connection, command)
-      #
-      if predict_sample :
-         command  = 'DROP TABLE c_shift_predict_sample'
-         dismod_at.sql_command(shift_connection, command)
-      #
-      # shift_connection
-      shift_connection.close()
+      else :
+         if len(pending) >= 2 * shift_db_thread :
+            (done, pending) = concurrent.futures.wait(
+               pending, return_when = concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done :
+               future.result()
+         future = executor.submit( write_shift_db,
+            template, template_lock, shift_database, shift_table,
+            sqlite_profile
+         )
+         pending.add(future)
+   #
+   # wait for the shift databases that are being written
+   if executor is not None :
+      for future in pending :
+         future.result()
+      executor.shutdown()
+   #
+   # template
+   template.close()
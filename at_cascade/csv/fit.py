@@ -1776,27 +1776,25 @@ def fit(fit_dir, max_node_depth = None) :
    node_table  = dismod_at.get_table_dict(connection, 'node')
    connection.close()
    #
+   # node_tree
+   node_tree = at_cascade.get_node_tree(node_table)
+   #
    # root_node_id
    root_node_name = at_cascade.get_parent_node(database)
-   root_node_id   = at_cascade.table_name2id(node_table, 'node', root_node_name)
+   root_node_id   = node_tree.name2id(root_node_name)
    #
    # fit_goal_max_depth
    if max_node_depth == None :
       fit_goal_max_depth = fit_goal_set
    else :
       fit_goal_max_depth = set()
+      max_depth          = node_tree.depth(root_node_id) + max_node_depth
       for node_name in fit_goal_set :
-         node_list = list()
-         node_id   = at_cascade.table_name2id(node_table, 'node', node_name)
-         node_list.append(node_id)
-         while node_id != root_node_id and node_id != None :
-            node_id = node_table[node_id]['parent']
-            node_list.append(node_id)
-         assert node_id != None
-         if len(node_list) <= max_node_depth + 1 :
-            fit_goal_max_depth.add( node_list[0] )
-         else :
-            fit_goal_max_depth.add( node_list[ -max_node_depth - 1] )
+         node_id   = node_tree.name2id(node_name)
+         assert node_tree.is_descendant(root_node_id, node_id)
+         while node_tree.depth(node_id) > max_depth :
+            node_id = node_tree.parent(node_id)
+         fit_goal_max_depth.add( node_id )
    #
    # no_ode_fit
    no_ode_fit    = True
@@ -39,6 +39,20 @@ If *table_name* is a :ref:`constant table <module@constant_table_list>` ,
 *table* is retrieved from the root node database.
 Otherwise it is retrieved from the fit node database.
 
+Constant Table Cache
+====================
+A constant table is only read from the root node database the first time
+it is requested (by each process) for a particular version of the
+root node database.
+The file's status (device, inode, size, and modification time)
+is used to detect when the root node database has changed.
+The same *table* is returned to every caller; i.e., it must not be
+modified (use ``copy.deepcopy`` to get a table that can be modified).
+:ref:`run_parallel-name` reads the constant tables that the jobs use
+(all but the data table) before it creates the processes that run the jobs,
+so that processes created by forking share the cached tables and do not
+need to read them from the root node database.
+
 null_row
 ********
 {xrst_code py}
@@ -65,9 +79,15 @@ The ``get_table`` function will no longer be available.
 
 {xrst_end fit_or_root_class}
 '''
+import os
 import dismod_at
 import at_cascade
 #
+# constant_table_cache
+# constant_table_cache[abspath] = ( file_status, table_dict )
+# where table_dict[table_name] is the cached version of a constant table.
+constant_table_cache = dict()
+#
 class fit_or_root_class :
    #
    # __init__
@@ -82,6 +102,17 @@ class fit_or_root_class :
          root_node_database, new = False, readonly = True
       )
       self.open = True
+      #
+      # root_table_dict
+      abspath     = os.path.abspath(root_node_database)
+      stat        = os.stat(abspath)
+      file_status = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+      if abspath in constant_table_cache :
+         if constant_table_cache[abspath][0] != file_status :
+            del constant_table_cache[abspath]
+      if abspath not in constant_table_cache :
+         constant_table_cache[abspath] = (file_status, dict() )
+      self.root_table_dict = constant_table_cache[abspath][1]
    #
    # get_table
    def get_table(self, table_name) :
@@ -89,7 +120,11 @@ class fit_or_root_class :
       assert self.open
       #
       if table_name in at_cascade.constant_table_list :
-         table = dismod_at.get_table_dict(self.root_connection, table_name)
+         if table_name not in self.root_table_dict :
+            self.root_table_dict[table_name] = dismod_at.get_table_dict(
+               self.root_connection, table_name
+            )
+         table = self.root_table_dict[table_name]
       else :
          table = dismod_at.get_table_dict(self.fit_connection, table_name)
       return table
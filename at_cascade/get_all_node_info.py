@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin get_all_node_info}
+
+Get Information in the All Node Database That is Used by Every Job
+##################################################################
+
+Prototype
+*********
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+all_node_database
+*****************
+is a python string specifying the location of the
+:ref:`all_node_db-name`
+relative to the current working directory.
+
+Cache
+*****
+The all_node_database is only read the first time this routine is called
+(by each process) for a particular version of the database.
+The file's status (device, inode, size, and modification time)
+is used to detect when the database has changed
+(in which case it is read again).
+Processes that are created by forking the process that called this routine
+inherit the cached value and do not need to read the database.
+
+all_node_info
+*************
+The return value *all_node_info* is a ``dict`` with the following keys.
+The values in this dictionary are shared by all the callers;
+i.e., they must not be modified.
+If one of the tables below does not exist in the all_node_database,
+the corresponding value is an empty list.
+
+option_all
+==========
+*all_node_info* [ ``'option_all'`` ] is the
+:ref:`option_all_table-name` as a ``list`` of ``dict`` .
+
+split_reference
+===============
+*all_node_info* [ ``'split_reference'`` ] is the
+:ref:`split_reference_table-name` as a ``list`` of ``dict`` .
+
+node_split
+==========
+*all_node_info* [ ``'node_split'`` ] is the
+:ref:`node_split_table-name` as a ``list`` of ``dict`` .
+
+mulcov_freeze
+=============
+*all_node_info* [ ``'mulcov_freeze'`` ] is the
+:ref:`mulcov_freeze_table-name` as a ``list`` of ``dict`` .
+
+option_all_dict
+===============
+*all_node_info* [ ``'option_all_dict'`` ] is a ``dict`` with a key
+for each *option_name* in the option_all table and the corresponding
+value is *option_value* .
+
+node_split_set
+==============
+*all_node_info* [ ``'node_split_set'`` ] is the ``set`` of
+node_id values that appear in the node_split table.
+
+root_split_reference_id
+=======================
+*all_node_info* [ ``'root_split_reference_id'`` ] is the
+split_reference_id corresponding to
+:ref:`option_all_table@root_split_reference_name` ,
+or None if root_split_reference_name does not appear.
+
+refit_split
+===========
+*all_node_info* [ ``'refit_split'`` ] is the ``bool`` value of
+:ref:`option_all_table@refit_split` (false if it does not appear).
+
+{xrst_end get_all_node_info}
+'''
+import os
+import dismod_at
+import at_cascade
+#
+# all_node_cache
+# all_node_cache[ abspath ] = ( file_status, all_node_info )
+all_node_cache = dict()
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.get_all_node_info
+def get_all_node_info(all_node_database) :
+   assert type(all_node_database) == str
+   # END DEF
+   #
+   # abspath, file_status
+   abspath     = os.path.abspath(all_node_database)
+   stat        = os.stat(abspath)
+   file_status = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+   #
+   # all_node_info
+   if abspath in all_node_cache :
+      if all_node_cache[abspath][0] == file_status :
+         all_node_info = all_node_cache[abspath][1]
+         return all_node_info
+   #
+   # all_node_info
+   connection  = dismod_at.create_connection(
+      all_node_database, new = False, readonly = True
+   )
+   all_node_info = dict()
+   for tbl_name in [
+      'option_all',
+      'split_reference',
+      'node_split',
+      'mulcov_freeze',
+   ] :
+      if at_cascade.table_exists(connection, tbl_name) :
+         all_node_info[tbl_name] = \
+            dismod_at.get_table_dict(connection, tbl_name)
+      else :
+         all_node_info[tbl_name] = list()
+   connection.close()
+   #
+   # option_all_dict
+   option_all_dict = dict()
+   for row in all_node_info['option_all'] :
+      option_all_dict[ row['option_name'] ] = row['option_value']
+   all_node_info['option_all_dict'] = option_all_dict
+   #
+   # node_split_set
+   node_split_set = set()
+   for row in all_node_info['node_split'] :
+      node_split_set.add( row['node_id'] )
+   all_node_info['node_split_set'] = node_split_set
+   #
+   # root_split_reference_id
+   if 'root_split_reference_name' not in option_all_dict :
+      root_split_reference_id = None
+   else :
+      name = option_all_dict['root_split_reference_name']
+      root_split_reference_id = at_cascade.table_name2id(
+         all_node_info['split_reference'], 'split_reference', name
+      )
+   all_node_info['root_split_reference_id'] = root_split_reference_id
+   #
+   # refit_split
+   if 'refit_split' in option_all_dict :
+      refit_split = option_all_dict['refit_split']
+      assert refit_split in [ 'true', 'false' ]
+      refit_split = refit_split == 'true'
+   else :
+      refit_split = False
+   all_node_info['refit_split'] = refit_split
+   #
+   # all_node_cache
+   all_node_cache[abspath] = (file_status, all_node_info)
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(all_node_info) == dict
+   return all_node_info
+   # END RETURN
@@ -0,0 +1,338 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin get_cov_reference_dict}
+
+Get Covariate Reference Values For a List of Shift Jobs
+#######################################################
+
+Syntax
+******
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+all_node_database
+*****************
+This is the same as for :ref:`get_cov_reference@all_node_database`
+in get_cov_reference.
+
+fit_node_database
+*****************
+This is the same as for :ref:`get_cov_reference@fit_node_database`
+in get_cov_reference.
+
+shift_job_list
+**************
+This is a ``list`` of ``tuple`` with two elements;
+i.e., ( *shift_node_id* , *split_reference_id* ) .
+Each *shift_node_id* is the parent node, or a child of the parent node,
+for the *fit_node_database* and each *split_reference_id*
+is as in :ref:`get_cov_reference@split_reference_id` .
+
+cov_reference_dict
+******************
+The return value is a ``dict`` with a key for each element of
+*shift_job_list* and
+
+   *cov_reference_dict* [ ( *shift_node_id* , *split_reference_id* ) ]
+
+is equal to the :ref:`get_cov_reference@cov_reference_list`
+returned by get_cov_reference for the corresponding arguments.
+
+Method
+******
+
+cov_reference Table
+===================
+If the :ref:`cov_reference_table-name` is in the all_node_database,
+and the root node database has not changed since it was created
+(see :ref:`cov_reference_table@cov_reference_root` ),
+the relative covariate references are obtained from that table
+using its index on node_id and split_reference_id.
+In this case, the data table is not used.
+
+Data Table
+==========
+If the cov_reference table is not in the all_node_database,
+or the root node database has changed since it was created,
+the data table node_id and covariate columns are converted to numpy arrays
+with the rows sorted so that the data for each node's subtree is a
+contiguous set of rows.
+This conversion is cached (by each process) because the data and node
+tables are :ref:`module@constant_table_list` and hence the same for
+every fit in a cascade.
+The rows that are within the max difference are computed once
+for each *split_reference_id* in *shift_job_list* .
+The average for all of the relative covariates is then computed with
+one numpy operation for each element of *shift_job_list* .
+
+{xrst_end get_cov_reference_dict}
+'''
+import os
+import math
+import numpy
+import dismod_at
+import at_cascade
+#
+# column_cache
+# column_cache['key'] is the (data_table, node_table, n_covariate)
+# that the other values in column_cache correspond to.
+column_cache = dict()
+# ----------------------------------------------------------------------------
+# columns = get_data_columns(data_table, node_table, n_covariate)
+# columns['start'][node_id], columns['end'][node_id] are the pre-order
+# interval for the subtree with root node_id; see get_node_tree.
+# columns['data_start'][node_id], columns['data_end'][node_id] are the start
+# and end for the rows of columns['x'] in the subtree with root node_id.
+# columns['x'][i, covariate_id] is the value of the covariate for row i
+# (nan if the value is null) where the rows are sorted by pre-order index
+# of the data table node_id.
+def get_data_columns(data_table, node_table, n_covariate) :
+   #
+   # column_cache
+   if 'key' in column_cache :
+      (cache_data, cache_node, cache_n_covariate) = column_cache['key']
+      if cache_data is data_table and cache_node is node_table \
+            and cache_n_covariate == n_covariate :
+         return column_cache['columns']
+   #
+   # start, end
+   node_tree = at_cascade.get_node_tree(node_table)
+   start     = node_tree.start
+   end       = node_tree.end
+   #
+   # data_pre
+   data_node = numpy.array(
+      [ row['node_id'] for row in data_table ], dtype = int
+   )
+   data_pre  = start[data_node]
+   #
+   # order, data_pre
+   order    = numpy.argsort(data_pre, kind = 'stable')
+   data_pre = data_pre[order]
+   #
+   # x
+   x = numpy.empty( (len(data_table), n_covariate), dtype = float )
+   for covariate_id in range(n_covariate) :
+      label = f'x_{covariate_id}'
+      x[:, covariate_id] = numpy.array(
+         [ row[label] for row in data_table ], dtype = float
+      )
+   x = x[order, :]
+   #
+   # columns
+   columns = {
+      'start'      : start,
+      'end'        : end,
+      'data_start' : numpy.searchsorted(data_pre, start, side = 'left'),
+      'data_end'   : numpy.searchsorted(data_pre, end,   side = 'left'),
+      'x'          : x,
+   }
+   #
+   # column_cache
+   column_cache['key']     = (data_table, node_table, n_covariate)
+   column_cache['columns'] = columns
+   return columns
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.get_cov_reference_dict
+def get_cov_reference_dict(
+   all_node_database  ,
+   fit_node_database  ,
+   shift_job_list     ,
+# )
+) :
+   assert type(all_node_database) == str
+   assert type(fit_node_database) == str
+   assert type(shift_job_list) == list
+   # END DEF
+   #
+   # all_node_info
+   all_node_info = at_cascade.get_all_node_info(all_node_database)
+   #
+   # root_node_database
+   option_all_dict = all_node_info['option_all_dict']
+   assert 'root_node_database' in option_all_dict
+   root_node_database = option_all_dict['root_node_database']
+   #
+   # check split_reference_id
+   for (shift_node_id, split_reference_id) in shift_job_list :
+      assert type(shift_node_id) == int
+      if len( all_node_info['split_reference'] ) == 0 :
+         assert split_reference_id == None
+      else :
+         assert type(split_reference_id) == int
+   #
+   # fit_table
+   fit_or_root = at_cascade.fit_or_root_class(
+      fit_node_database, root_node_database
+   )
+   fit_table = dict()
+   for tbl_name in [ 'option', 'node', 'covariate', ] :
+      fit_table[tbl_name] = fit_or_root.get_table(tbl_name)
+   #
+   # parent_node_id
+   parent_node_name = None
+   for row in fit_table['option'] :
+      assert row['option_name'] != 'parent_node_id'
+      if row['option_name'] == 'parent_node_name' :
+         parent_node_name = row['option_value']
+   assert parent_node_name is not None
+   node_tree      = at_cascade.get_node_tree( fit_table['node'] )
+   parent_node_id = node_tree.name2id(parent_node_name)
+   #
+   # shift_node_ok
+   for (shift_node_id, split_reference_id) in shift_job_list :
+      shift_node_ok = parent_node_id == shift_node_id
+      if node_tree.parent(shift_node_id) == parent_node_id :
+         shift_node_ok = True
+      if not shift_node_ok :
+         shift_node_name = fit_table['node'][shift_node_id]['node_name']
+         msg  = f'get_cov_reference: shit node = {shift_node_name}\n'
+         msg += f'is not the parent node = {parent_node_name}\n'
+         msg += 'nor a child of the parent node'
+         assert False, msg
+   #
+   # cov_info
+   cov_info = at_cascade.get_cov_info(
+      all_node_info['option_all'],
+      fit_table['covariate'],
+      all_node_info['split_reference']
+   )
+   #
+   # rel_covariate_list
+   rel_covariate_list = sorted( cov_info['rel_covariate_id_set'] )
+   #
+   # split_covariate_id
+   split_covariate_id = None
+   if len( all_node_info['split_reference'] ) > 0 :
+      split_covariate_id = cov_info['split_covariate_id']
+   #
+   # check max_difference
+   for covariate_id in rel_covariate_list :
+      covariate_row  = fit_table['covariate'][covariate_id]
+      max_difference = covariate_row['max_difference']
+      if not max_difference in [ None, math.inf ] :
+         msg  = f'get_cov_reference: covariate_id = {covariate_id}\n'
+         msg += 'is a relative covariate and '
+         msg += f'max_difference = {max_difference} is not None or infinity'
+         assert False, msg
+   #
+   # n_covariate
+   n_covariate = len( fit_table['covariate'] )
+   #
+   # cov_reference_dict
+   # initialize using the references in the fit_node_database covariate table
+   # and the splitting covariate reference
+   cov_reference_dict = dict()
+   for (shift_node_id, split_reference_id) in shift_job_list :
+      cov_reference_list = list()
+      for covariate_id in range( n_covariate ) :
+         reference = fit_table['covariate'][covariate_id]['reference']
+         if covariate_id == split_covariate_id :
+            row       = all_node_info['split_reference'][split_reference_id]
+            reference = row['split_reference_value']
+         cov_reference_list.append( reference )
+      key                     = (shift_node_id, split_reference_id)
+      cov_reference_dict[key] = cov_reference_list
+   #
+   # connection, use_table
+   connection = dismod_at.create_connection(
+      all_node_database, new = False, readonly = True
+   )
+   use_table = at_cascade.table_exists(connection, 'cov_reference')
+   #
+   # use_table
+   # do not use the cov_reference table if the root node database has
+   # changed since the table was created
+   if use_table :
+      use_table = at_cascade.table_exists(connection, 'cov_reference_root')
+   if use_table :
+      root_stat = os.stat(root_node_database)
+      command   = 'SELECT file_size, mtime_ns FROM cov_reference_root'
+      result    = dismod_at.sql_command(connection, command)
+      use_table = result == [ (root_stat.st_size, root_stat.st_mtime_ns) ]
+   #
+   # cov_reference_dict
+   # relative covariate references in the cov_reference table
+   if use_table :
+      rel_covariate_set = set( rel_covariate_list )
+      for key in cov_reference_dict :
+         (shift_node_id, split_reference_id) = key
+         if split_reference_id is None :
+            split_reference_id = 'null'
+         command  = 'SELECT covariate_id, reference FROM cov_reference '
+         command += f'WHERE node_id = {shift_node_id} '
+         command += f'AND split_reference_id IS {split_reference_id}'
+         for (covariate_id, reference) in \
+               dismod_at.sql_command(connection, command) :
+            if covariate_id in rel_covariate_set :
+               cov_reference_dict[key][covariate_id] = reference
+   connection.close()
+   #
+   # cov_reference_dict
+   # relative covariate references computed using the data table
+   if not use_table :
+      #
+      # columns, x
+      columns = get_data_columns(
+         fit_or_root.get_table('data'), fit_table['node'], n_covariate
+      )
+      x = columns['x']
+      #
+      # in_bnd_dict
+      # in_bnd_dict[split_reference_id][i] is true if row i of x is within
+      # the max difference for all the covariates.
+      in_bnd_dict = dict()
+      for (shift_node_id, split_reference_id) in shift_job_list :
+         if split_reference_id not in in_bnd_dict :
+            in_bnd = numpy.ones( x.shape[0], dtype = bool )
+            for covariate_id in range( n_covariate ) :
+               covariate_row   = fit_table['covariate'][covariate_id]
+               reference       = covariate_row['reference']
+               if covariate_id == split_covariate_id :
+                  split_table = all_node_info['split_reference']
+                  reference   = \
+                     split_table[split_reference_id]['split_reference_value']
+               max_difference  = covariate_row['max_difference']
+               if max_difference not in [ None, math.inf ] :
+                  x_column  = x[:, covariate_id]
+                  abs_diff  = numpy.abs( x_column - reference )
+                  in_bnd   &= numpy.isnan(x_column) | \
+                     (abs_diff <= max_difference)
+            in_bnd_dict[split_reference_id] = in_bnd
+      #
+      # cov_reference_dict
+      for key in cov_reference_dict :
+         (shift_node_id, split_reference_id) = key
+         #
+         # x_subset
+         # rows for the subtree below shift_node_id that are within
+         # max difference
+         data_start = columns['data_start'][shift_node_id]
+         data_end   = columns['data_end'][shift_node_id]
+         in_bnd     = in_bnd_dict[split_reference_id][data_start : data_end]
+         x_subset   = x[data_start : data_end, rel_covariate_list][in_bnd, :]
+         #
+         # cov_reference_dict
+         # average of the values that are not null
+         not_null = numpy.logical_not( numpy.isnan(x_subset) )
+         count    = numpy.sum(not_null, axis = 0)
+         total    = numpy.sum( numpy.where(not_null, x_subset, 0.0), axis = 0)
+         for (j, covariate_id) in enumerate(rel_covariate_list) :
+            if count[j] > 0 :
+               reference = float( total[j] / count[j] )
+               cov_reference_dict[key][covariate_id] = reference
+   #
+   # fit_or_root
+   fit_or_root.close()
+   # -------------------------------------------------------------------------
+   # BEGIN RETURN
+   # ...
+   assert type(cov_reference_dict) == dict
+   return cov_reference_dict
+   # END RETURN
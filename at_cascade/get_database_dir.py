@@ -72,6 +72,7 @@ In other words, the fit database has the following path:
 {xrst_end get_database_dir}
 '''
 import dismod_at
+import at_cascade
 # ----------------------------------------------------------------------------
 # BEGIN DEF
 # at_cascade.get_database_dir
@@ -93,6 +94,17 @@ def get_database_dir(
    assert fit_split_reference_id==None or type(fit_split_reference_id)==int
    # END DEF
    #
+   # node_tree
+   node_tree = at_cascade.get_node_tree(node_table)
+   #
+   # check fit_node_id
+   if not node_tree.is_descendant(root_node_id, fit_node_id) :
+      fit_node_name  = node_table[fit_node_id]['node_name']
+      root_node_name = node_table[root_node_id]['node_name']
+      msg  = f'{fit_node_name} is not a descendent of the root node '
+      msg += root_node_name
+      assert False, msg
+   #
    # fit_split_reference_name
    if 0 < len(split_reference_table) :
       row = split_reference_table[fit_split_reference_id]
@@ -105,7 +117,7 @@ def get_database_dir(
    node_id            = fit_node_id
    split_reference_id = fit_split_reference_id
    #
-   while node_id not in [ None, root_node_id ] :
+   while node_id != root_node_id :
       #
       # split
       split = root_split_reference_id != split_reference_id \
@@ -127,13 +139,7 @@ def get_database_dir(
          database_dir = f'{node_name}/{database_dir}'
          #
          # node_id
-         node_id       = node_table[node_id]['parent']
-   if node_id is None :
-      fit_node_name  = node_table[fit_node_id]['node_name']
-      root_node_name = node_table[root_node_id]['node_name']
-      msg  = f'{fit_node_name} is not a descendent of the root node '
-      msg += root_node_name
-      assert False, msg
+         node_id       = node_tree.parent(node_id)
    #
    split =  root_split_reference_id != split_reference_id \
       and root_node_id in node_split_set
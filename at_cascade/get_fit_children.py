@@ -59,6 +59,9 @@ def get_fit_children(
    assert type( node_table ) == list
    # END DEF
    #
+   # node_tree
+   node_tree = at_cascade.get_node_tree(node_table)
+   #
    # number of nodes
    n_node       = len( node_table )
    #
@@ -70,30 +73,32 @@ def get_fit_children(
    # goal_node_id
    for node in fit_goal_set :
       if type(node) == str :
-         goal_node_id = at_cascade.table_name2id(node_table, 'node', node)
+         goal_node_id = node_tree.name2id(node)
       else :
          assert type(node) == int
          goal_node_id = node
       #
+      if not node_tree.is_descendant(root_node_id, goal_node_id) :
+         goal_name = node_table[goal_node_id]['node_name']
+         msg       = 'get_fit_children: goal node = ' + goal_name
+         msg      += '\nis not a descendant of the root node = '
+         msg      += node_table[root_node_id]['node_name']
+         sys.exit(msg)
+      #
       # node_id, parent_id
       node_id    = goal_node_id
-      parent_id  = node_table[node_id]['parent']
+      parent_id  = node_tree.parent(node_id)
       #
-      while node_id != root_node_id :
-         #
-         if parent_id == None :
-            goal_name = node_table[goal_node_id]['node_name']
-            msg       = 'get_fit_children: goal node = ' + goal_name
-            msg      += '\nis not a descendant of the root node = '
-            msg      += node_table[root_node_id]['node_name']
-            sys.exit(msg)
+      # stop when the path from here to the root node is already included
+      while node_id != root_node_id and \
+            node_id not in fit_children[parent_id] :
          #
          # fit_children
          fit_children[parent_id].add(node_id)
          #
          # next node_id, parent_id
          node_id   = parent_id
-         parent_id = node_table[node_id]['parent']
+         parent_id = node_tree.parent(node_id)
    #
    # BEGIN RETURN
    # ...
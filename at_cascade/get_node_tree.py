@@ -0,0 +1,241 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin get_node_tree}
+{xrst_spell
+   euler
+}
+
+Get an Index For the Tree Defined by a Node Table
+#################################################
+
+Syntax
+******
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+node_table
+**********
+This is a ``list`` of ``dict`` containing the dismod_at node table.
+The primary key is not included because it is the row index.
+The node names must be unique, and every node must be the
+root of a tree or a descendant of a root; i.e., there can be
+no cycles in the parent relation.
+
+Cache
+*****
+The node_tree for the most recent *node_table* is cached (by each process).
+If *node_table* is the same object (and has the same length) as in the
+previous call, the cached value is returned.
+The :ref:`fit_or_root_class-name` returns the same node table object for
+every fit in a cascade, so the index is only built once per cascade.
+The node table must not be modified while it is in use.
+
+node_tree
+*********
+The return value *node_tree* has the following attributes
+and functions (none of which should be modified) :
+
+n_node
+======
+*node_tree*\ ``.n_node`` is the ``int`` number of nodes in the node table.
+
+parent
+======
+*node_tree*\ ``.parent(`` *node_id* ``)``
+is the ``int`` parent of *node_id* , or None if *node_id* has no parent.
+
+children
+========
+*node_tree*\ ``.children(`` *node_id* ``)``
+is a ``list`` of ``int`` containing the children of *node_id*
+in increasing order.
+
+depth
+=====
+*node_tree*\ ``.depth(`` *node_id* ``)``
+is the ``int`` number of ancestors of *node_id* ;
+i.e., the depth is zero for a node that has no parent.
+
+name2id
+=======
+*node_tree*\ ``.name2id(`` *node_name* ``)``
+is the ``int`` node_id corresponding to *node_name* .
+An assert will occur if there is no such node.
+
+is_descendant
+=============
+*node_tree*\ ``.is_descendant(`` *ancestor_node_id* , *node_id* ``)``
+is true if *node_id* is equal to *ancestor_node_id* or is a descendant of
+*ancestor_node_id* .
+
+pre_order
+=========
+*node_tree*\ ``.pre_order`` is a numpy ``int`` array containing the node_id
+values in a pre-order (Euler tour) traversal of the trees;
+i.e., each node comes before its descendants and
+the descendants of each node are contiguous.
+
+start, end
+==========
+*node_tree*\ ``.start`` and *node_tree*\ ``.end``
+are numpy ``int`` arrays with length *n_node* .
+The subtree with root *node_id* (including *node_id* ) is
+
+   *node_tree*\ ``.pre_order[`` *start* [ *node_id* ] : *end* [ *node_id* ] ]
+
+parent_array
+============
+*node_tree*\ ``.parent_array`` is a numpy ``int`` array with length
+*n_node* containing the parent of each node (-1 if the node has no parent).
+
+depth_array
+===========
+*node_tree*\ ``.depth_array`` is a numpy ``int`` array with length
+*n_node* containing the depth of each node.
+
+Method
+******
+The children are stored as one array of node_id values sorted by parent
+with an index array that points to the start of each node's children.
+The pre-order traversal is computed with one pass through the nodes.
+Hence the memory and time to build the index is order *n_node* ,
+parent, depth, name2id and is_descendant take constant time,
+and children is proportional to the number of children.
+
+{xrst_end get_node_tree}
+'''
+import numpy
+# ----------------------------------------------------------------------------
+class node_tree_class :
+   #
+   def __init__(self, node_table) :
+      #
+      # n_node
+      n_node      = len(node_table)
+      self.n_node = n_node
+      #
+      # parent_array
+      parent_array = numpy.empty(n_node, dtype = int)
+      for (node_id, row) in enumerate(node_table) :
+         parent = row['parent']
+         if parent is None :
+            parent_array[node_id] = -1
+         else :
+            assert 0 <= parent and parent < n_node
+            parent_array[node_id] = parent
+      self.parent_array = parent_array
+      #
+      # child_order, child_start
+      # the children of node_id are
+      # child_order[ child_start[node_id+1] : child_start[node_id+2] ]
+      # and the nodes without a parent are
+      # child_order[ child_start[0] : child_start[1] ]
+      self.child_order = numpy.argsort(parent_array, kind = 'stable')
+      count            = numpy.bincount(parent_array + 1, minlength = n_node+1)
+      self.child_start = numpy.zeros(n_node + 2, dtype = int)
+      self.child_start[1:] = numpy.cumsum(count)
+      #
+      # pre_order, start, end, depth_array
+      pre_order   = numpy.empty(n_node, dtype = int)
+      start       = numpy.empty(n_node, dtype = int)
+      end         = numpy.empty(n_node, dtype = int)
+      depth_array = numpy.empty(n_node, dtype = int)
+      child_order = self.child_order.tolist()
+      child_start = self.child_start.tolist()
+      index       = 0
+      stack       = [ (node_id, 0, False) for node_id in
+         reversed( child_order[ child_start[0] : child_start[1] ] )
+      ]
+      while len(stack) > 0 :
+         (node_id, depth, done) = stack.pop()
+         if done :
+            end[node_id] = index
+         else :
+            pre_order[index]     = node_id
+            start[node_id]       = index
+            depth_array[node_id] = depth
+            index               += 1
+            stack.append( (node_id, depth, True) )
+            begin = child_start[node_id + 1]
+            stop  = child_start[node_id + 2]
+            for child_id in reversed( child_order[begin : stop] ) :
+               stack.append( (child_id, depth + 1, False) )
+      if index != n_node :
+         msg  = 'get_node_tree: there is a cycle in the parent relation '
+         msg += 'of the node table'
+         assert False, msg
+      self.pre_order   = pre_order
+      self.start       = start
+      self.end         = end
+      self.depth_array = depth_array
+      #
+      # name2id_dict
+      self.name2id_dict = dict()
+      for (node_id, row) in enumerate(node_table) :
+         node_name = row['node_name']
+         if node_name in self.name2id_dict :
+            msg = f'get_node_tree: node_name {node_name} appears twice'
+            assert False, msg
+         self.name2id_dict[node_name] = node_id
+   #
+   def parent(self, node_id) :
+      parent = int( self.parent_array[node_id] )
+      if parent < 0 :
+         return None
+      return parent
+   #
+   def children(self, node_id) :
+      begin = self.child_start[node_id + 1]
+      stop  = self.child_start[node_id + 2]
+      return self.child_order[begin : stop].tolist()
+   #
+   def depth(self, node_id) :
+      return int( self.depth_array[node_id] )
+   #
+   def name2id(self, node_name) :
+      if node_name not in self.name2id_dict :
+         msg  = f'get_node_tree: "{node_name}" '
+         msg += 'is not present in column "node_name" of "node" table.'
+         assert False, msg
+      return self.name2id_dict[node_name]
+   #
+   def is_descendant(self, ancestor_node_id, node_id) :
+      start = self.start
+      end   = self.end
+      index = start[node_id]
+      return bool(
+         start[ancestor_node_id] <= index and index < end[ancestor_node_id]
+      )
+#
+# node_tree_cache
+# node_tree_cache['key'] is the (node_table, len(node_table)) that
+# node_tree_cache['node_tree'] corresponds to.
+node_tree_cache = dict()
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.get_node_tree
+def get_node_tree(node_table) :
+   assert type(node_table) == list
+   # END DEF
+   #
+   # node_tree
+   node_tree = None
+   if 'key' in node_tree_cache :
+      (cache_table, cache_length) = node_tree_cache['key']
+      if cache_table is node_table and cache_length == len(node_table) :
+         node_tree = node_tree_cache['node_tree']
+   if node_tree is None :
+      node_tree = node_tree_class(node_table)
+      node_tree_cache['key']       = (node_table, len(node_table))
+      node_tree_cache['node_tree'] = node_tree
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(node_tree) == node_tree_class
+   return node_tree
+   # END RETURN
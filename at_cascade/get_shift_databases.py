@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin get_shift_databases}
+
+Get Shift Databases Argument For Child Jobs
+###########################################
+
+Prototype
+*********
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+all_node_database
+*****************
+is a python string specifying the location of the
+:ref:`all_node_db-name`
+relative to the current working directory.
+
+node_table
+**********
+is a ``list`` of ``dict`` containing the node table for this cascade.
+
+job_table
+*********
+This is a :ref:`create_job_table@job_table` for this cascade.
+
+fit_job_id
+**********
+This is the :ref:`create_job_table@job_table@job_id`
+for the job that creates the input databases for its child jobs.
+
+shift_job_id_list
+*****************
+This is a ``list`` of ``int`` .
+Each element is the job_id for a child of *fit_job_id* .
+
+shift_databases
+***************
+The return value is a ``dict`` with one element for each
+job in *shift_job_id_list* that can be used as the
+:ref:`create_shift_db@shift_databases` argument to create_shift_db
+when the fit_node_database corresponds to *fit_job_id* .
+The directory corresponding to each of the shift databases
+is created if it does not already exist.
+
+{xrst_end get_shift_databases}
+'''
+import os
+import at_cascade
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.get_shift_databases
+def get_shift_databases(
+   all_node_database  ,
+   node_table         ,
+   job_table          ,
+   fit_job_id         ,
+   shift_job_id_list  ,
+# )
+) :
+   assert type(all_node_database) == str
+   assert type(node_table) == list
+   assert type(job_table) == list
+   assert type(fit_job_id) == int
+   assert type(shift_job_id_list) == list
+   # END DEF
+   #
+   # all_node_info, option_all_dict
+   all_node_info   = at_cascade.get_all_node_info(all_node_database)
+   option_all_dict = all_node_info['option_all_dict']
+   #
+   # refit_split
+   refit_split = all_node_info['refit_split']
+   #
+   # result_dir
+   result_dir = option_all_dict['result_dir']
+   #
+   # root_node_id
+   name         = option_all_dict['root_node_name']
+   root_node_id = at_cascade.table_name2id(node_table, 'node', name)
+   #
+   # fit_split_reference_id
+   fit_split_reference_id = job_table[fit_job_id]['split_reference_id']
+   #
+   # shift_databases
+   shift_databases = dict()
+   for job_id in shift_job_id_list :
+      assert job_table[job_id]['parent_job_id'] == fit_job_id
+      #
+      # shift_node_id
+      shift_node_id = job_table[job_id]['fit_node_id']
+      #
+      # shift_split_reference_id
+      shift_split_reference_id = job_table[job_id]['split_reference_id']
+      #
+      # shift_database_dir
+      database_dir = at_cascade.get_database_dir(
+         node_table              = node_table,
+         split_reference_table   = all_node_info['split_reference'],
+         node_split_set          = all_node_info['node_split_set'],
+         root_node_id            = root_node_id,
+         root_split_reference_id = all_node_info['root_split_reference_id'],
+         fit_node_id             = shift_node_id ,
+         fit_split_reference_id  = shift_split_reference_id,
+      )
+      shift_database_dir = f'{result_dir}/{database_dir}'
+      if not os.path.exists(shift_database_dir) :
+         os.makedirs(shift_database_dir)
+      #
+      # shift_node_database
+      shift_node_database = f'{shift_database_dir}/dismod.db'
+      #
+      # skip_refit
+      if refit_split :
+         skip_refit = False
+      else :
+         skip_refit = fit_split_reference_id != shift_split_reference_id
+      #
+      # shift_name
+      dir_list = shift_database_dir.split('/')
+      if skip_refit :
+         shift_name = dir_list[-2] + '/' + dir_list[-1]
+      else :
+         shift_name = dir_list[-1]
+      #
+      # shfit_databases
+      shift_databases[shift_name] = shift_node_database
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(shift_databases) == dict
+   return shift_databases
+   # END RETURN
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin get_smooth_grid_index}
+
+Group the Rows of a Smooth Grid Table by Smoothing
+##################################################
+
+Syntax
+******
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+smooth_grid_table
+*****************
+This is a ``list`` of ``dict`` containing the dismod_at smooth_grid table.
+The primary key is not included because it is the row index.
+
+smooth_grid_index
+*****************
+The return value is a ``dict`` .
+If *smooth_id* is the smooth_id column value for any row in
+*smooth_grid_table* ,
+*smooth_grid_index* [ *smooth_id* ] is the ``list`` of
+smooth_grid_id values for the rows with that smooth_id.
+These smooth_grid_id values are in increasing order; i.e.,
+the same order as in *smooth_grid_table* .
+A smoothing that has no rows in *smooth_grid_table* is not a key in
+*smooth_grid_index* .
+
+Method
+******
+The index is created with one pass through the smooth_grid table.
+Looping over the grid points for one smoothing, using this index,
+is proportional to the number of grid points in that smoothing
+(instead of the number of rows in the smooth_grid table).
+
+{xrst_end get_smooth_grid_index}
+'''
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.get_smooth_grid_index
+def get_smooth_grid_index(smooth_grid_table) :
+   assert type(smooth_grid_table) == list
+   # END DEF
+   #
+   # smooth_grid_index
+   smooth_grid_index = dict()
+   for (smooth_grid_id, row) in enumerate(smooth_grid_table) :
+      smooth_id = row['smooth_id']
+      if smooth_id not in smooth_grid_index :
+         smooth_grid_index[smooth_id] = list()
+      smooth_grid_index[smooth_id].append(smooth_grid_id)
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(smooth_grid_index) == dict
+   return smooth_grid_index
+   # END RETURN
@@ -53,9 +53,22 @@ other arguments matter:
    mulcov_meas_value,     "age_id, time_id, mulcov_id, group_id, subgroup_id"
    mulcov_meas_noise,     "age_id, time_id, mulcov_id, group_id"
 
+Index
+*****
+This routine uses a :ref:`var_index_class-name` index for the var table.
+The index for the most recent *var_table* is cached (by each process);
+i.e., if *var_table* is the same object (and has the same length) as in the
+previous call, the index is not rebuilt.
+Use var_index_class directly to look up many variables at once.
 
 {xrst_end get_var_id}
 '''
+import at_cascade
+#
+# var_index_cache
+# var_index_cache['key'] is the (var_table, len(var_table)) that
+# var_index_cache['var_index'] corresponds to.
+var_index_cache = dict()
 # BEGIN DEF
 # at_cascade.get_var_id
 def get_var_id(
@@ -75,77 +88,30 @@ def get_var_id(
    assert type(var_table) == list
    assert type(var_type)  == str
    # END DEF
-   # var_id
-   var_id       = None
    #
-   # double_match
-   double_match = False
+   # var_index
+   var_index = None
+   if 'key' in var_index_cache :
+      (cache_table, cache_length) = var_index_cache['key']
+      if cache_table is var_table and cache_length == len(var_table) :
+         var_index = var_index_cache['var_index']
+   if var_index is None :
+      var_index = at_cascade.var_index_class(var_table)
+      var_index_cache['key']       = (var_table, len(var_table))
+      var_index_cache['var_index'] = var_index
    #
-   # mulstd_value, mulstd_dage, mulstd_dtime
-   if var_type in [ 'mulstd_value', 'mulstd_dage', 'mulstd_dtime' ] :
-      for (row_id, row) in enumerate(var_table) :
-         match = True
-         match = match and row['var_type']  == var_type
-         match = match and row['smooth_id'] == smooth_id
-         if match :
-            # double_match
-            if not var_id is None :
-               double_match = True
-            # var_id
-            var_id = row_id
-   # rate
-   elif var_type == 'rate' :
-      for (row_id, row) in enumerate(var_table) :
-         match = True
-         match = match and row['var_type']  == var_type
-         match = match and row['age_id']    == age_id
-         match = match and row['time_id']   == time_id
-         match = match and row['node_id']   == node_id
-         match = match and row['rate_id']   == rate_id
-         if match :
-            # double_match
-            if not var_id is None :
-               double_match = True
-            # var_id
-            var_id = row_id
-   # mulcov_rate_value, mulcov_meas_value
-   elif var_type in [ 'mulcov_rate_value', 'mulcov_meas_value' ] :
-      for (row_id, row) in enumerate(var_table) :
-         match = True
-         match = match and row['var_type']    == var_type
-         match = match and row['age_id']      == age_id
-         match = match and row['time_id']     == time_id
-         match = match and row['mulcov_id']   == mulcov_id
-         match = match and row['group_id']    == group_id
-         match = match and row['subgroup_id'] == subgroup_id
-         if match :
-            # double_match
-            if not var_id is None :
-               double_match = True
-            # var_id
-            var_id = row_id
-   # mulcov_meas_noise
-   else :
-      assert var_type == 'mulcov_meas_noise'
-      for (row_id, row) in enumerate(var_table) :
-         match = True
-         match = match and row['var_type']    == var_type
-         match = match and row['age_id']      == age_id
-         match = match and row['time_id']     == time_id
-         match = match and row['mulcov_id']   == mulcov_id
-         match = match and row['group_id']    == group_id
-         if match :
-            # double_match
-            if not var_id is None :
-               double_match = True
-            # var_id
-            var_id = row_id
-   # double_match
-   if double_match :
-      for row in var_table :
-         print(row)
-      msg  = 'get_var_id: Something is wrong with this var_table'
-      assert False, msg
+   # var_id
+   var_id = var_index.var_id(
+      var_type     = var_type,
+      smooth_id    = smooth_id,
+      age_id       = age_id,
+      time_id      = time_id,
+      node_id      = node_id,
+      rate_id      = rate_id,
+      mulcov_id    = mulcov_id,
+      group_id     = group_id,
+      subgroup_id  = subgroup_id,
+   )
    #
    # BEGIN RETURN
    # ...
@@ -158,6 +158,9 @@ def write_all_node_database(result_dir, root_node_database) :
       ('omega_all_id', 'integer'),
    ]
    write_table(connection, omega_index_table, tbl_name, col_list)
+   command  = 'CREATE INDEX omega_index_index '
+   command += 'ON omega_index(node_id, split_reference_id)'
+   dismod_at.sql_command(connection, command)
    #
    # omega_all_table
    omega_all_table   = at_cascade.csv.read_table(omega_all_table_file)
@@ -184,4 +187,9 @@ def write_all_node_database(result_dir, root_node_database) :
    # connection
    connection.close()
    #
+   # cov_reference table
+   at_cascade.create_cov_reference_table(
+      all_node_database, root_node_database
+   )
+   #
    print( f'End: creating {all_node_database}' )
@@ -0,0 +1,370 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin job_history_class}
+{xrst_spell
+   sqlite
+}
+
+Run Time History for Cascade Jobs
+#################################
+
+job_history_class
+*****************
+{xrst_code py}
+job_history = job_history_class(job_history_database)
+{xrst_code}
+
+job_history_database
+====================
+This ``str`` is the name of an sqlite database that holds the
+job_history table.
+If this file, or the job_history table, does not exist, it is created.
+This database is separate from the :ref:`all_node_db-name` so that it
+is not removed when a cascade is re-run; see
+:ref:`option_all_table@job_history_database` .
+
+job_history Table
+*****************
+There is one row in this table for every job that has been run
+by :ref:`run_parallel-name` using this *job_history_database* .
+
+job_history_id
+==============
+is an ``integer`` primary key for this table.
+
+job_name
+========
+is the ``text`` :ref:`create_job_table@job_table@job_name`
+for this job.
+
+fit_type
+========
+is the ``text`` fit type, ``both`` or ``fixed`` , for the last fit attempted
+for this job; see :ref:`run_parallel@fit_type_list` .
+
+job_done
+========
+is the ``integer`` one (zero) if the job succeeded (failed).
+
+wall_seconds
+============
+is the ``real`` wall clock time, in seconds, for all the fits
+attempted for this job.
+
+n_data
+======
+is the ``integer`` number of rows in the data_subset table of the
+fit_node_database for this job
+(zero if the database or the table does not exist).
+
+n_var
+=====
+is the ``integer`` number of rows in the var table of the
+fit_node_database for this job
+(zero if the database or the table does not exist).
+
+unix_time
+=========
+is the ``integer`` unix time when this row was added to the table.
+
+max_rss_mb
+==========
+is the ``real`` maximum resident set size, in megabytes,
+for the dismod_at commands run by this job
+(null if it was not measured).
+
+add_row
+*******
+{xrst_code py}
+job_history.add_row(
+   job_name, fit_type, job_done, wall_seconds, fit_node_database, max_rss_mb,
+   count
+)
+{xrst_code}
+Adds a row to the job_history table.
+The arguments *job_name* , *fit_type* , *job_done* , and *wall_seconds*
+are the values for the new row and have type
+``str`` , ``str`` , ``bool`` , and ``float`` respectively.
+The ``str`` *fit_node_database* is the
+:ref:`glossary@fit_node_database` for the job
+and is used to determine *n_data* and *n_var* .
+The argument *max_rss_mb* is optional, is a ``float`` or None,
+and is the value for the new row (None corresponds to null).
+The argument *count* is optional.
+If it is not None, it is the return value of
+:ref:`job_history_class@fit_count` for *fit_node_database*
+and *fit_node_database* is not opened by add_row.
+
+fit_count
+*********
+{xrst_code py}
+count = job_history_class.fit_count(fit_node_database)
+{xrst_code}
+The return value is a ``dict`` with keys ``'data_subset'`` and ``'var'``
+and the corresponding values are the number of rows in those tables
+of *fit_node_database* (zero if the database or the table does not exist).
+This function does not use the job_history database, so it can be
+called before acquiring the lock that serializes writes to that database;
+see :ref:`run_parallel-name` .
+
+job_cost
+********
+{xrst_code py}
+job_cost = job_history.job_cost(job_table, static_cost)
+{xrst_code}
+This is the cost model; i.e., the predicted wall clock time
+for each job.
+
+job_table
+=========
+is the :ref:`create_job_table@job_table` for the jobs.
+
+static_cost
+===========
+is a ``list`` with the same length as *job_table* ; see
+:ref:`static_job_cost-name` .
+
+job_cost
+========
+The return value *job_cost* is a ``list`` of ``float`` with the same
+length as *job_table* .
+
+#. If there are successful runs of a job in the history table
+   (with the same job_name), *job_cost* [ *job_id* ] is the average of
+   *wall_seconds* for the most recent three successful runs.
+#. Otherwise, if there are any successful runs in the history table,
+   *job_cost* [ *job_id* ] is *static_cost* [ *job_id* ] times the
+   sum of *wall_seconds* divided by the sum of *n_data* + *n_var*
+   for all the successful runs.
+#. Otherwise, *job_cost* [ *job_id* ] is *static_cost* [ *job_id* ] .
+
+job_memory
+**********
+{xrst_code py}
+job_memory = job_history.job_memory(job_table, static_cost)
+{xrst_code}
+This is the memory model; i.e., the predicted maximum resident set size,
+in megabytes, for each job.
+The arguments *job_table* and *static_cost* are the same as for
+:ref:`job_history_class@job_cost` .
+The return value *job_memory* is a ``list`` of ``float`` with the same
+length as *job_table* .
+
+#. If there are runs of a job in the history table
+   (with the same job_name) that have *max_rss_mb* not null,
+   *job_memory* [ *job_id* ] is the maximum of *max_rss_mb*
+   for the most recent three of these runs.
+#. Otherwise, if there are any runs in the history table
+   with *max_rss_mb* not null,
+   *job_memory* [ *job_id* ] is *base_rss* plus
+   *static_cost* [ *job_id* ] times *rss_per_size* .
+   Here *rss_per_size* is the least squares slope of *max_rss_mb*
+   as a function of *n_data* + *n_var* for these runs
+   (if the slope is negative, it is replaced by zero).
+   If all these runs have the same *n_data* + *n_var* ,
+   the slope cannot be estimated and one kilobyte is used for
+   *rss_per_size* .
+   The value *base_rss* is the maximum, for these runs, of
+   *max_rss_mb* minus *rss_per_size* times ( *n_data* + *n_var* );
+   i.e., the line with slope *rss_per_size* is moved up until
+   it is above all the measurements.
+#. Otherwise, *job_memory* [ *job_id* ] is
+   100 plus *static_cost* [ *job_id* ] / 1000 .
+   This corresponds to 100 megabytes for the dismod_at program
+   plus one kilobyte for each data row and variable.
+
+close
+*****
+{xrst_code py}
+job_history.close()
+{xrst_code}
+This closes the database connection held by a job_history.
+
+Example
+*******
+:ref:`plan_parallel-name` and :ref:`job_priority-name` use
+the *job_cost* to estimate the total run time
+and to choose the next job to run.
+
+{xrst_end job_history_class}
+'''
+import os
+import time
+import dismod_at
+import at_cascade
+#
+class job_history_class :
+   #
+   # __init__
+   def __init__(self, job_history_database) :
+      assert type(job_history_database) == str
+      #
+      self.connection = dismod_at.create_connection(
+         job_history_database, new = False, readonly = False
+      )
+      cmd  = 'create table if not exists job_history('
+      cmd += 'job_history_id integer primary key,'
+      cmd += 'job_name       text,'
+      cmd += 'fit_type       text,'
+      cmd += 'job_done       integer,'
+      cmd += 'wall_seconds   real,'
+      cmd += 'n_data         integer,'
+      cmd += 'n_var          integer,'
+      cmd += 'unix_time      integer,'
+      cmd += 'max_rss_mb     real)'
+      dismod_at.sql_command(self.connection, cmd)
+   #
+   # add_row
+   def add_row(
+      self, job_name, fit_type, job_done, wall_seconds, fit_node_database,
+      max_rss_mb = None, count = None
+   ) :
+      assert type(job_name) == str
+      assert fit_type in [ 'both', 'fixed' ]
+      assert type(job_done) == bool
+      assert type(wall_seconds) == float
+      assert type(fit_node_database) == str
+      assert max_rss_mb is None or type(max_rss_mb) == float
+      assert count is None or type(count) == dict
+      #
+      # count
+      if count is None :
+         count = job_history_class.fit_count(fit_node_database)
+      #
+      # cmd
+      cmd  = 'insert into job_history'
+      cmd += ' (job_name,fit_type,job_done,wall_seconds,'
+      cmd += 'n_data,n_var,unix_time,max_rss_mb)'
+      cmd += ' values (?, ?, ?, ?, ?, ?, ?, ?)'
+      row  = (
+         job_name,
+         fit_type,
+         int(job_done),
+         wall_seconds,
+         count['data_subset'],  # n_data
+         count['var'],          # n_var
+         int( time.time() ),    # unix_time
+         max_rss_mb,            # None corresponds to null
+      )
+      self.connection.execute(cmd, row)
+      self.connection.commit()
+   #
+   # fit_count
+   @staticmethod
+   def fit_count(fit_node_database) :
+      assert type(fit_node_database) == str
+      #
+      count = { 'data_subset' : 0, 'var' : 0 }
+      if os.path.isfile(fit_node_database) :
+         connection = dismod_at.create_connection(
+            fit_node_database, new = False, readonly = True
+         )
+         for table_name in count :
+            if at_cascade.table_exists(connection, table_name) :
+               cmd    = f'select count(*) from {table_name}'
+               result = dismod_at.sql_command(connection, cmd)
+               count[table_name] = result[0][0]
+         connection.close()
+      return count
+   #
+   # job_cost
+   def job_cost(self, job_table, static_cost) :
+      assert type(job_table) == list
+      assert type(static_cost) == list
+      assert len(job_table) == len(static_cost)
+      #
+      # recent_seconds
+      # the wall_seconds for the most recent successful runs of each job
+      cmd  = 'select job_name, wall_seconds, n_data, n_var from job_history'
+      cmd += ' where job_done == 1 order by job_history_id desc'
+      recent_seconds = dict()
+      sum_seconds    = 0.0
+      sum_size       = 0
+      for (job_name, wall_seconds, n_data, n_var) in \
+            dismod_at.sql_command(self.connection, cmd) :
+         if job_name not in recent_seconds :
+            recent_seconds[job_name] = list()
+         if len( recent_seconds[job_name] ) < 3 :
+            recent_seconds[job_name].append( wall_seconds )
+         sum_seconds += wall_seconds
+         sum_size    += n_data + n_var
+      #
+      # seconds_per_size
+      if sum_size == 0 :
+         seconds_per_size = 1.0
+      else :
+         seconds_per_size = sum_seconds / sum_size
+      #
+      # job_cost
+      job_cost = list()
+      for (job_id, row) in enumerate(job_table) :
+         job_name = row['job_name']
+         if job_name in recent_seconds :
+            seconds_list = recent_seconds[job_name]
+            cost = sum(seconds_list) / len(seconds_list)
+         else :
+            cost = static_cost[job_id] * seconds_per_size
+         job_cost.append( float(cost) )
+      return job_cost
+   #
+   # job_memory
+   def job_memory(self, job_table, static_cost) :
+      assert type(job_table) == list
+      assert type(static_cost) == list
+      assert len(job_table) == len(static_cost)
+      #
+      # recent_rss, size_list, rss_list
+      # the max_rss_mb for the most recent measured runs of each job
+      cmd  = 'select job_name, max_rss_mb, n_data, n_var from job_history'
+      cmd += ' where max_rss_mb is not null order by job_history_id desc'
+      recent_rss = dict()
+      size_list  = list()
+      rss_list   = list()
+      for (job_name, max_rss_mb, n_data, n_var) in \
+            dismod_at.sql_command(self.connection, cmd) :
+         if job_name not in recent_rss :
+            recent_rss[job_name] = list()
+         if len( recent_rss[job_name] ) < 3 :
+            recent_rss[job_name].append( max_rss_mb )
+         size_list.append( n_data + n_var )
+         rss_list.append( max_rss_mb )
+      #
+      # base_rss, rss_per_size
+      if len(rss_list) == 0 :
+         base_rss     = 100.0
+         rss_per_size = 1.0 / 1000.0
+      else :
+         n_run     = len(rss_list)
+         mean_size = sum(size_list) / n_run
+         mean_rss  = sum(rss_list) / n_run
+         sum_xx    = 0.0
+         sum_xy    = 0.0
+         for (size, rss) in zip(size_list, rss_list) :
+            sum_xx += (size - mean_size) * (size - mean_size)
+            sum_xy += (size - mean_size) * (rss - mean_rss)
+         if sum_xx == 0.0 :
+            rss_per_size = 1.0 / 1000.0
+         else :
+            rss_per_size = max(0.0, sum_xy / sum_xx)
+         base_rss = max(
+            rss - rss_per_size * size
+            for (size, rss) in zip(size_list, rss_list)
+         )
+      #
+      # job_memory
+      job_memory = list()
+      for (job_id, row) in enumerate(job_table) :
+         job_name = row['job_name']
+         if job_name in recent_rss :
+            memory = max( recent_rss[job_name] )
+         else :
+            memory = base_rss + static_cost[job_id] * rss_per_size
+         job_memory.append( float(memory) )
+      return job_memory
+   #
+   # close
+   def close(self) :
+      self.connection.close()
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin job_journal_class}
+{xrst_spell
+   sqlite
+}
+
+Durable Record of Job Status For a Cascade
+##########################################
+
+job_journal_class
+*****************
+{xrst_code py}
+job_journal = job_journal_class(job_journal_database)
+{xrst_code}
+
+job_journal_database
+====================
+This ``str`` is the name of an sqlite database that holds the
+job_journal table.
+If this file, or the job_journal table, does not exist, it is created.
+:ref:`run_parallel-name` uses the file
+
+   *result_dir*\\ ``/job_journal.db``
+
+where *result_dir* is the :ref:`option_all_table@result_dir` .
+Each status change is committed before the corresponding member function
+returns, so a status change that has been recorded survives a crash of the
+process that recorded it.
+The default sqlite journal mode is used, so *result_dir* can be on a
+network file system.
+
+job_journal Table
+*****************
+There is at most one row in this table for each job.
+
+job_journal_id
+==============
+is an ``integer`` primary key for this table.
+
+job_name
+========
+is the ``text`` :ref:`create_job_table@job_table@job_name`
+for this job.
+
+job_status
+==========
+is the ``text`` status for the most recent run of this job and is
+``run`` , ``done`` , or ``error`` .
+A job that has status ``run`` after the cascade has terminated
+was running when the cascade terminated abnormally.
+
+unix_time
+=========
+is the ``integer`` unix time when *job_status* was recorded.
+
+set_status
+**********
+{xrst_code py}
+job_journal.set_status(job_name, job_status)
+{xrst_code}
+Record the ``str`` *job_status* for the ``str`` *job_name* .
+
+get_status
+**********
+{xrst_code py}
+status_dict = job_journal.get_status()
+{xrst_code}
+The return value *status_dict* is a ``dict`` with a key for every
+*job_name* in the job_journal table and *status_dict* [ *job_name* ]
+is the corresponding *job_status* .
+
+remove
+******
+{xrst_code py}
+job_journal.remove(job_name_list)
+{xrst_code}
+Remove the rows, if any, for the job names in the ``list``
+*job_name_list* .
+
+close
+*****
+{xrst_code py}
+job_journal.close()
+{xrst_code}
+This closes the database connection held by a job_journal.
+
+{xrst_end job_journal_class}
+'''
+import time
+import dismod_at
+#
+class job_journal_class :
+   #
+   # __init__
+   def __init__(self, job_journal_database) :
+      assert type(job_journal_database) == str
+      #
+      self.connection = dismod_at.create_connection(
+         job_journal_database, new = False, readonly = False
+      )
+      cmd  = 'create table if not exists job_journal('
+      cmd += 'job_journal_id integer primary key,'
+      cmd += 'job_name       text unique,'
+      cmd += 'job_status     text,'
+      cmd += 'unix_time      integer)'
+      dismod_at.sql_command(self.connection, cmd)
+   #
+   # set_status
+   def set_status(self, job_name, job_status) :
+      assert type(job_name) == str
+      assert job_status in [ 'run', 'done', 'error' ]
+      #
+      cmd  = 'insert or replace into job_journal'
+      cmd += ' (job_name,job_status,unix_time) values (?, ?, ?)'
+      self.connection.execute(
+         cmd, ( job_name, job_status, int( time.time() ) )
+      )
+      self.connection.commit()
+   #
+   # get_status
+   def get_status(self) :
+      cmd         = 'select job_name, job_status from job_journal'
+      status_dict = dict()
+      for (job_name, job_status) in \
+            dismod_at.sql_command(self.connection, cmd) :
+         status_dict[job_name] = job_status
+      return status_dict
+   #
+   # remove
+   def remove(self, job_name_list) :
+      assert type(job_name_list) == list
+      #
+      cmd = 'delete from job_journal where job_name == ?'
+      self.connection.executemany(
+         cmd, [ (job_name,) for job_name in job_name_list ]
+      )
+      self.connection.commit()
+   #
+   # close
+   def close(self) :
+      self.connection.close()
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin job_priority}
+
+Priority Used to Choose the Next Job to Run
+###########################################
+
+Prototype
+*********
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+job_table
+*********
+This is a :ref:`create_job_table@job_table` containing the jobs
+that will be run.
+
+all_node_database
+*****************
+is the name of the :ref:`all_node_db-name` for this cascade.
+
+node_table
+**********
+is the list of dict corresponding to the node table
+for this cascade.
+
+priority_policy
+***************
+This specifies the policy used to compute the priorities
+and is one of the following:
+
+job_id
+======
+All the jobs have the same priority.
+Hence the ready jobs are run in job_id order.
+
+subtree
+=======
+Largest remaining subtree first.
+The priority for a job is the sum of the
+:ref:`static_job_cost-name`
+for the job and all of its descendants in the job table.
+Starting the job with the most work below it first tends to shorten
+the total run time when the node tree is deep and unbalanced.
+
+history
+=======
+This is the same as the subtree policy except that the
+:ref:`job_history_class@job_cost` , in milliseconds,
+is used in place of the static job cost.
+In this case :ref:`option_all_table@job_history_database`
+must appear in the option_all table.
+
+priority_list
+*************
+The return value *priority_list* has length equal to the length of
+*job_table* and *priority_list* [ *job_id* ] is a non-negative ``int``
+priority for the corresponding job.
+Among the jobs that are ready to run,
+those with larger priority are run first;
+jobs with the same priority are run in job_id order.
+
+Other Policies
+**************
+The *priority_list* argument to :ref:`run_parallel-name`
+can be used to run jobs in an order that is not supported by this routine.
+
+{xrst_end job_priority}
+'''
+# ----------------------------------------------------------------------------
+import at_cascade
+# ----------------------------------------------------------------------------
+# priority_list = subtree_priority(job_table, job_cost)
+# Sum of job_cost over each job and its descendants. This uses the fact that
+# the child jobs have larger job_id than their parent job.
+def subtree_priority(job_table, job_cost) :
+   assert type(job_table) == list
+   assert type(job_cost) == list
+   assert len(job_table) == len(job_cost)
+   #
+   priority_list = list( job_cost )
+   for job_id in reversed( range( len(job_table) ) ) :
+      row         = job_table[job_id]
+      child_range = range( row['start_child_job_id'], row['end_child_job_id'] )
+      for child_job_id in child_range :
+         priority_list[job_id] += priority_list[child_job_id]
+   return priority_list
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.job_priority
+def job_priority(
+   job_table         ,
+   all_node_database ,
+   node_table        ,
+   priority_policy   ,
+# )
+) :
+   assert type(job_table)         == list
+   assert type(all_node_database) == str
+   assert type(node_table)        == list
+   assert type(priority_policy)   == str
+   # END DEF
+   #
+   # job_id
+   if priority_policy == 'job_id' :
+      priority_list = len(job_table) * [ 0 ]
+   else :
+      assert priority_policy in [ 'subtree', 'history' ], \
+         f'job_priority: priority_policy = {priority_policy} is not valid'
+      #
+      # job_cost
+      job_cost = at_cascade.static_job_cost(
+         job_table         = job_table,
+         all_node_database = all_node_database,
+         node_table        = node_table,
+      )
+      #
+      # job_cost
+      if priority_policy == 'history' :
+         all_node_info        = at_cascade.get_all_node_info(all_node_database)
+         option_all_dict      = all_node_info['option_all_dict']
+         job_history_database = option_all_dict.get('job_history_database')
+         msg  = 'job_priority: priority_policy is history and '
+         msg += 'job_history_database is not in option_all table'
+         assert job_history_database is not None, msg
+         job_history = at_cascade.job_history_class(job_history_database)
+         job_cost    = job_history.job_cost(job_table, job_cost)
+         job_history.close()
+         job_cost    = [ int( 1000.0 * cost ) for cost in job_cost ]
+      #
+      # priority_list
+      priority_list = subtree_priority(job_table, job_cost)
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(priority_list) == list
+   assert len(priority_list) == len(job_table)
+   return priority_list
+   # END RETURN
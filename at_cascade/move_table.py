@@ -48,9 +48,15 @@ to table *dst_name*.
 5. *seconds* is the integer unit time
 6. *message* is the text message
 
+Transaction
+***********
+If *connection* is in a transaction when this routine is called,
+the changes are part of that transaction and are not committed
+by this routine; see :ref:`add_log_entry@Transaction` .
+Otherwise the changes are committed before this routine returns.
+
 {xrst_end   move_table}
 '''
-import dismod_at
 import at_cascade
 # ----------------------------------------------------------------------------
 # BEGIN syntax
@@ -61,16 +67,22 @@ def move_table(
    assert type(dst_name) == str
    # END syntax
    #
+   # in_transaction
+   in_transaction = connection.in_transaction
+   #
    command     = 'DROP TABLE IF EXISTS ' + dst_name
-   dismod_at.sql_command(connection, command)
+   connection.execute(command)
    #
    command     = 'ALTER TABLE ' + src_name + ' RENAME COLUMN '
    command    += src_name + '_id TO ' + dst_name + '_id'
-   dismod_at.sql_command(connection, command)
+   connection.execute(command)
    #
    command     = 'ALTER TABLE ' + src_name + ' RENAME TO ' + dst_name
-   dismod_at.sql_command(connection, command)
+   connection.execute(command)
    #
    # log table
    message      = f'move table {src_name} to {dst_name}'
    at_cascade.add_log_entry(connection, message)
+   #
+   if not in_transaction :
+      connection.commit()
@@ -73,6 +73,18 @@ Other Tables
 ============
 None of the other tables in the database are modified.
 
+Method
+******
+Only the omega values for the parent node (or its nearest ancestor with
+omega data) and for its children are read from the
+:ref:`omega_all@omega_all Table` .
+The rows in the :ref:`omega_all@omega_index Table` for these nodes are
+found using the omega_index_index index (on node_id and split_reference_id),
+and the corresponding omega values are a range of primary key values
+in the omega_all table.
+Hence the time to build the constraints does not depend on the
+size of the omega_all table.
+
 {xrst_end omega_constraint}
 '''
 # ----------------------------------------------------------------------------
@@ -81,13 +93,6 @@ import dismod_at
 import at_cascade
 from math import log
 # ----------------------------------------------------------------------------
-def child_node_id_list(node_table, parent_node_id) :
-   result = list()
-   for (node_id, row) in enumerate(node_table) :
-      if row['parent'] == parent_node_id :
-         result.append(node_id)
-   return result
-# ----------------------------------------------------------------------------
 # BEGIN DEF
 # at_cascade.omega_constraint
 def omega_constraint(
@@ -101,26 +106,26 @@ def omega_constraint(
    # END DEF
    #
    # all_tables
-   connection        = dismod_at.create_connection(
+   all_node_info     = at_cascade.get_all_node_info(all_node_database)
+   all_connection    = dismod_at.create_connection(
       all_node_database, new = False, readonly = True
    )
    all_tables = dict()
    for name in [
-      'option_all',
-      'omega_all',
-      'omega_index',
       'omega_age_grid',
       'omega_time_grid',
-      'split_reference',
    ] :
-      all_tables[name] = dismod_at.get_table_dict(connection, name)
-   connection.close()
+      all_tables[name] = dismod_at.get_table_dict(all_connection, name)
+   for name in [ 'option_all', 'split_reference' ] :
+      all_tables[name] = all_node_info[name]
    #
    # case where omega constrained to zero
    if len( all_tables['omega_time_grid']) == 0 :
-      assert len( all_tables['omega_all'] ) == 0
-      assert len( all_tables['omega_index'] ) == 0
+      for name in [ 'omega_all', 'omega_index' ] :
+         command = f'SELECT {name}_id FROM {name} LIMIT 1'
+         assert len( dismod_at.sql_command(all_connection, command) ) == 0
       assert len( all_tables['omega_age_grid'] ) == 0
+      all_connection.close()
       return
    #
    # n_omega_age, n_omega_time
@@ -128,11 +133,14 @@ def omega_constraint(
    n_omega_time = len( all_tables['omega_time_grid'] )
    #
    # root_node_database
-   root_node_database = None
-   for row in all_tables['option_all'] :
-      if row['option_name'] == 'root_node_database' :
-         root_node_database = row['option_value']
-   assert root_node_database != None
+   option_all_dict    = all_node_info['option_all_dict']
+   assert 'root_node_database' in option_all_dict
+   root_node_database = option_all_dict['root_node_database']
+   #
+   # sqlite_profile
+   sqlite_profile = 'default'
+   if 'sqlite_profile' in option_all_dict :
+      sqlite_profile = option_all_dict['sqlite_profile']
    #
    # fit_tables
    fit_or_root = at_cascade.fit_or_root_class(
@@ -197,41 +205,75 @@ def omega_constraint(
       if row['option_name'] == 'parent_node_name' :
          parent_node_name = row['option_value']
    assert parent_node_name is not None
-   parent_node_id = at_cascade.table_name2id(
-      fit_tables['node'], 'node', parent_node_name
-   )
+   #
+   # node_tree, parent_node_id
+   node_tree      = at_cascade.get_node_tree( fit_tables['node'] )
+   parent_node_id = node_tree.name2id(parent_node_name)
    #
    # node_id2omega_all_id
+   # node_id2omega_all_id[node_id] is the omega_all_id where the omega values
+   # for node_id and split_reference_id begin. It is only computed for the
+   # nodes that are needed (by get_omega_all_id).
    node_id2omega_all_id = dict()
-   for row in all_tables['omega_index'] :
-      omega_all_id = row['omega_all_id']
-      if omega_all_id % (n_omega_age * n_omega_time) != 0 :
-         msg  = 'omega_index table: Expect omega_all_id to be a multipler '
-         msg += 'of n_omega_age * n_omega_time\n'
-         msg += f'omega_all_id = {omega_all_id} '
-         msg += f'n_omega_age = {n_omega_age} '
-         msg += f'n_omega_time = {n_omega_time} '
+   if split_reference_id is None :
+      split_reference_sql = 'null'
+   else :
+      split_reference_sql = str( int(split_reference_id) )
+   def get_omega_all_id(node_id_list) :
+      node_id_list = [ node_id for node_id in node_id_list
+         if node_id not in node_id2omega_all_id
+      ]
+      if len(node_id_list) == 0 :
+         return
+      for node_id in node_id_list :
+         node_id2omega_all_id[node_id] = None
+      node_id_sql = ','.join( str( int(node_id) ) for node_id in node_id_list )
+      command  = 'SELECT node_id, omega_all_id FROM omega_index '
+      command += f'WHERE node_id IN ({node_id_sql}) '
+      command += f'AND split_reference_id IS {split_reference_sql}'
+      result   = dismod_at.sql_command(all_connection, command)
+      for (node_id, omega_all_id) in result :
+         if omega_all_id % (n_omega_age * n_omega_time) != 0 :
+            msg  = 'omega_index table: Expect omega_all_id to be a multipler '
+            msg += 'of n_omega_age * n_omega_time\n'
+            msg += f'omega_all_id = {omega_all_id} '
+            msg += f'n_omega_age = {n_omega_age} '
+            msg += f'n_omega_time = {n_omega_time} '
+            assert False, msg
+         node_id2omega_all_id[node_id] = omega_all_id
+   #
+   # get_omega
+   # the omega values starting at omega_all_id
+   def get_omega(omega_all_id) :
+      n_omega  = n_omega_age * n_omega_time
+      command  = 'SELECT omega_all_value FROM omega_all '
+      command += f'WHERE omega_all_id >= {omega_all_id} '
+      command += f'AND omega_all_id < {omega_all_id + n_omega} '
+      command += 'ORDER BY omega_all_id'
+      result   = dismod_at.sql_command(all_connection, command)
+      omega    = [ row[0] for row in result ]
+      if len(omega) != n_omega :
+         msg  = 'omega_all table: Expect omega_all_id = '
+         msg += f'{omega_all_id + len(omega)} to be in the table'
          assert False, msg
-      if row['split_reference_id'] == split_reference_id :
-         node_id2omega_all_id[ row['node_id'] ] = omega_all_id
+      return omega
    #
    # omega_ancestor_node_id
    node_id = parent_node_id
-   while not node_id in node_id2omega_all_id :
-      node_id = fit_tables['node'][node_id]['parent']
+   get_omega_all_id( [ node_id ] )
+   while node_id2omega_all_id[node_id] is None :
+      node_id = node_tree.parent(node_id)
       if node_id is None :
          msg  = 'omega_constraint: no ancestor of ' + parent_node_name
          msg += ' has omega data'
          assert False, msg
+      get_omega_all_id( [ node_id ] )
    omega_ancestor_node_id = node_id
    assert not omega_ancestor_node_id is None
    #
    # parent_omega
    omega_all_id = node_id2omega_all_id[omega_ancestor_node_id]
-   parent_omega   = list()
-   for ij in range( n_omega_age * n_omega_time ) :
-      row  = all_tables['omega_all'][omega_all_id + ij ]
-      parent_omega.append( row['omega_all_value'] )
+   parent_omega = get_omega(omega_all_id)
    #
    # parent_smooth_id
    parent_smooth_id  = len(fit_tables['smooth'])
@@ -257,7 +299,8 @@ def omega_constraint(
          fit_tables['smooth_grid'].append( row )
    #
    # child_node_list
-   child_node_list = child_node_id_list(fit_tables['node'], parent_node_id)
+   child_node_list = node_tree.children(parent_node_id)
+   get_omega_all_id(child_node_list)
    #
    # nslist_id
    nslist_id = len( fit_tables['nslist'] )
@@ -266,14 +309,11 @@ def omega_constraint(
    for child_node_id in child_node_list :
       #
       # child_omega
-      if not child_node_id in node_id2omega_all_id :
+      omega_all_id = node_id2omega_all_id[child_node_id]
+      if omega_all_id is None :
          child_omega = parent_omega
       else :
-         omega_all_id = node_id2omega_all_id[child_node_id]
-         child_omega  = list()
-         for ij in range( n_omega_age * n_omega_time ) :
-               row  = all_tables['omega_all'][omega_all_id + ij ]
-               child_omega.append( row['omega_all_value'] )
+         child_omega  = get_omega(omega_all_id)
       #
       # random_effect
       random_effect = list()
@@ -287,7 +327,7 @@ def omega_constraint(
          if child_omega[ij] <= 0 :
             msg  = 'child_omega <= 0'
             msg += f', child_node_id = {child_node_id}'
-            if child_node_id in node_id2omega_all_id :
+            if node_id2omega_all_id[child_node_id] is not None :
                msg += f'\nomega_ancestor_node_id = {child_node_id}'
             else :
                msg += '\nomega_ancestor_node_id = '
@@ -335,10 +375,14 @@ def omega_constraint(
          row['parent_smooth_id'] = parent_smooth_id
          row['child_nslist_id']  = nslist_id
    #
+   # all_connection
+   all_connection.close()
+   #
    # replace these fit tables
    connection    = dismod_at.create_connection(
       fit_node_database, new = False, readonly = False
    )
+   at_cascade.set_sqlite_profile(connection, sqlite_profile)
    #
    for name in [
       'nslist',
@@ -0,0 +1,153 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin plan_parallel}
+
+Predict the Run Time for run_parallel Without Running Any Jobs
+##############################################################
+
+Prototype
+*********
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+job_table
+*********
+This is a :ref:`create_job_table@job_table` containing all the jobs
+necessary to fit the :ref:`glossary@fit_goal_set` .
+
+start_job_id
+************
+This is the :ref:`create_job_table@job_table@job_id`
+for the starting job; see :ref:`run_parallel@start_job_id` .
+
+skip_start_job
+**************
+see :ref:`run_parallel@skip_start_job` .
+
+max_number_cpu
+**************
+This is the maximum number of jobs that are run at the same time;
+see :ref:`run_parallel@max_number_cpu` .
+
+job_cost
+********
+This is a list with the same length as *job_table* and
+*job_cost* [ *job_id* ] is the predicted wall clock time for the
+corresponding job; see :ref:`job_history_class@job_cost` .
+
+priority_list
+*************
+This is a list with the same length as *job_table* that specifies the
+order in which the ready jobs are run; see
+:ref:`run_parallel@priority_list` .
+If it is None, all the jobs have the same priority.
+
+total_time
+**********
+is a ``float`` equal to the predicted wall clock time for running
+*start_job_id* and its descendants (not counting the time for the
+start job when *skip_start_job* is true).
+
+job_schedule
+************
+is a ``list`` of ``dict`` with one element for each job that is run
+(in the order the jobs are started). Each element has the following keys:
+
+.. csv-table::
+   :header-rows: 1
+
+   Key,         Type,   Meaning
+   job_id,      int,    job_id for this job
+   start_time,  float,  predicted time at which this job starts
+   end_time,    float,  predicted time at which this job ends
+
+Method
+******
+This simulates the scheduling in :ref:`run_parallel-name` ; i.e.,
+when a job finishes its child jobs become ready,
+and whenever a cpu is available the ready job with the
+largest priority (smallest job_id for ties) is started.
+Scheduling overhead is not included.
+
+{xrst_end plan_parallel}
+'''
+# ----------------------------------------------------------------------------
+import heapq
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.plan_parallel
+def plan_parallel(
+   job_table            ,
+   start_job_id         ,
+   skip_start_job       ,
+   max_number_cpu       ,
+   job_cost             ,
+   priority_list = None ,
+# )
+) :
+   assert type(job_table)      == list
+   assert type(start_job_id)   == int
+   assert type(skip_start_job) == bool
+   assert type(max_number_cpu) == int
+   assert type(job_cost)       == list
+   assert priority_list is None or type(priority_list) == list
+   assert max_number_cpu > 0
+   assert len(job_cost) == len(job_table)
+   # END DEF
+   #
+   # priority_list
+   if priority_list is None :
+      priority_list = len(job_table) * [ 0 ]
+   assert len(priority_list) == len(job_table)
+   #
+   # ready_queue
+   # heap of ( - priority, job_id ) for the jobs that are ready to run
+   ready_queue = list()
+   def push_children(job_id) :
+      row         = job_table[job_id]
+      child_range = range( row['start_child_job_id'], row['end_child_job_id'] )
+      for child_job_id in child_range :
+         key = ( - priority_list[child_job_id], child_job_id )
+         heapq.heappush(ready_queue, key)
+   if skip_start_job :
+      push_children(start_job_id)
+   else :
+      key = ( - priority_list[start_job_id], start_job_id )
+      heapq.heappush(ready_queue, key)
+   #
+   # running
+   # heap of ( end_time, job_id ) for the jobs that are running
+   running = list()
+   #
+   # job_schedule, now
+   job_schedule = list()
+   now          = 0.0
+   while len(ready_queue) + len(running) > 0 :
+      #
+      # start as many ready jobs as possible
+      while len(running) < max_number_cpu and len(ready_queue) > 0 :
+         (priority, job_id) = heapq.heappop(ready_queue)
+         end_time = now + float( job_cost[job_id] )
+         job_schedule.append(
+            { 'job_id' : job_id, 'start_time' : now, 'end_time' : end_time }
+         )
+         heapq.heappush(running, (end_time, job_id) )
+      #
+      # wait for the next job to finish
+      (now, job_id) = heapq.heappop(running)
+      push_children(job_id)
+   #
+   # total_time
+   total_time = now
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(total_time) == float
+   assert type(job_schedule) == list
+   return total_time, job_schedule
+   # END RETURN
@@ -0,0 +1,460 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin predict_parent_grid}
+{xrst_spell
+   avgint
+   eff
+   meas
+   mtexcess
+   numpy
+   pini
+   subgroup
+}
+
+Predict the Parent Grid avgint Table Without Running dismod_at
+##############################################################
+
+Syntax
+******
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+Purpose
+*******
+The :ref:`avgint_parent_grid-name` avgint table only contains
+rates and covariate multipliers evaluated at single age, time points.
+These predictions can be computed directly from the variables
+(instead of running the dismod_at predict command).
+This routine computes them with numpy for the fit values and
+for all the samples at once; see
+:ref:`option_all_table@shift_predict` .
+
+fit_node_database
+*****************
+is a python string containing the name of the
+:ref:`glossary@fit_node_database` .
+It must contain the avgint table created by avgint_parent_grid,
+the var, fit_var, and sample tables.
+
+root_node_database
+******************
+is a python string containing the name of the
+:ref:`glossary@root_node_database` .
+
+predict_value
+*************
+If the model, or the avgint table, uses a feature that is not
+supported by this routine (see below), *predict_value* is ``None`` .
+Otherwise it is a ``dict`` with the following keys:
+
+fit_var
+=======
+*predict_value*\ [``'fit_var'``] is a numpy array with length equal to
+the number of rows in the avgint table.
+Its *avgint_id* element is the prediction for the corresponding row of the
+avgint table using the fit_var table.
+
+sample
+======
+*predict_value*\ [``'sample'``] is a numpy array with shape
+( *n_sample* , *n_avgint* ) .
+Its ( *sample_index* , *avgint_id* ) element is the prediction
+for the corresponding row of the avgint table using the sample table.
+
+Model
+*****
+Let *q* be the parent value for a rate,
+*u* the random effect for the avgint node (zero for the parent node),
+*alpha* and *x* the rate value covariate multipliers and
+covariate differences (covariate value minus reference),
+*beta* and *z* the measurement value covariate multipliers and
+covariate differences for the integrand.
+Each of these variables is interpolated from its smoothing grid
+(bilinear in age and time, constant outside the grid).
+The value for a rate integrand is
+
+   exp( *u* + *alpha* * *x* + *beta* * *z* ) * *q*
+
+The integrands Sincidence, remission, mtexcess correspond to the rates
+iota, rho, chi. Prevalence is only supported at the minimum age
+where it is equal to the rate pini.
+The value for a mulcov_\ *k* integrand is the covariate multiplier
+with mulcov_id *k* .
+
+Not Supported
+*************
+*predict_value* is ``None`` if any of the following hold:
+an avgint row is not for a single age and time;
+its integrand is not one of the integrands above;
+its node is not the parent node or a child of the parent node;
+one of its covariates is excluded by the covariate max_difference;
+the rate_eff_cov table is not empty;
+a covariate multiplier has a subgroup smoothing.
+
+{xrst_end predict_parent_grid}
+'''
+# ----------------------------------------------------------------------------
+import numpy
+import dismod_at
+import at_cascade
+#
+# integrand2rate
+integrand2rate = {
+   'prevalence' : 'pini',
+   'Sincidence' : 'iota',
+   'remission'  : 'rho',
+   'mtexcess'   : 'chi',
+}
+# ----------------------------------------------------------------------------
+# grid_interpolate(grid, age, time)
+#
+# grid:
+# is a tuple (age_id_list, age_array, time_id_list, time_array) for a
+# smoothing where the arrays are the corresponding ages and times in
+# increasing order.
+#
+# return:
+# is a list of (age_id, time_id, weight) such that the bilinear interpolation
+# of a function on the grid at (age, time) is the sum of the weights times
+# the function value at the corresponding grid points.
+def grid_interpolate(grid, age, time) :
+   (age_id_list, age_array, time_id_list, time_array) = grid
+   #
+   # age_weight, time_weight
+   weight_list = list()
+   for (id_list, array, value) in [
+      (age_id_list, age_array, age), (time_id_list, time_array, time)
+   ] :
+      n_point = len(array)
+      i       = int( numpy.searchsorted(array, value, side = 'right') ) - 1
+      if i < 0 :
+         weight_list.append( [ (id_list[0], 1.0) ] )
+      elif i >= n_point - 1 :
+         weight_list.append( [ (id_list[n_point - 1], 1.0) ] )
+      else :
+         w = (value - array[i]) / (array[i+1] - array[i])
+         weight_list.append(
+            [ (id_list[i], 1.0 - w), (id_list[i+1], w) ]
+         )
+   #
+   # result
+   result = list()
+   for (age_id, age_weight) in weight_list[0] :
+      for (time_id, time_weight) in weight_list[1] :
+         weight = age_weight * time_weight
+         if weight != 0.0 :
+            result.append( (age_id, time_id, weight) )
+   return result
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.predict_parent_grid
+def predict_parent_grid(fit_node_database, root_node_database) :
+   assert type(fit_node_database) == str
+   assert type(root_node_database) == str
+   # END DEF
+   #
+   # fit_table
+   fit_or_root = at_cascade.fit_or_root_class(
+      fit_node_database, root_node_database
+   )
+   fit_table = dict()
+   for name in [
+      'age',
+      'avgint',
+      'covariate',
+      'fit_var',
+      'integrand',
+      'mulcov',
+      'node',
+      'nslist_pair',
+      'option',
+      'rate',
+      'smooth_grid',
+      'subgroup',
+      'time',
+      'var',
+   ] :
+      fit_table[name] = fit_or_root.get_table(name)
+   fit_or_root.close()
+   #
+   # rate_eff_cov_empty
+   connection = dismod_at.create_connection(
+      root_node_database, new = False, readonly = True
+   )
+   rate_eff_cov_empty = True
+   if at_cascade.table_exists(connection, 'rate_eff_cov') :
+      command = 'SELECT rate_eff_cov_id FROM rate_eff_cov LIMIT 1'
+      result  = dismod_at.sql_command(connection, command)
+      rate_eff_cov_empty = len(result) == 0
+   connection.close()
+   #
+   # sample_index, sample_var_id, sample_var_value
+   connection = dismod_at.create_connection(
+      fit_node_database, new = False, readonly = True
+   )
+   command = 'SELECT sample_index, var_id, var_value FROM sample'
+   result  = dismod_at.sql_command(connection, command)
+   connection.close()
+   n_row            = len(result)
+   sample_index     = numpy.fromiter(
+      (row[0] for row in result), dtype = int, count = n_row
+   )
+   sample_var_id    = numpy.fromiter(
+      (row[1] for row in result), dtype = int, count = n_row
+   )
+   sample_var_value = numpy.fromiter(
+      (row[2] for row in result), dtype = float, count = n_row
+   )
+   del result
+   #
+   # predict_value
+   predict_value = None
+   #
+   # check for features that are not supported
+   supported = rate_eff_cov_empty
+   for row in fit_table['mulcov'] :
+      supported = supported and row['subgroup_smooth_id'] is None
+   if not supported :
+      return predict_value
+   #
+   # parent_node_id
+   parent_node_name = None
+   for row in fit_table['option'] :
+      if row['option_name'] == 'parent_node_name' :
+         parent_node_name = row['option_value']
+   assert parent_node_name is not None
+   node_tree      = at_cascade.get_node_tree( fit_table['node'] )
+   parent_node_id = node_tree.name2id(parent_node_name)
+   #
+   # minimum_age
+   minimum_age = min( row['age'] for row in fit_table['age'] )
+   #
+   # var_index
+   var_index = at_cascade.var_index_class( fit_table['var'] )
+   #
+   # smooth_grid_index
+   smooth_grid_index = at_cascade.get_smooth_grid_index(
+      fit_table['smooth_grid']
+   )
+   #
+   # get_grid
+   grid_cache = dict()
+   def get_grid(smooth_id) :
+      if smooth_id not in grid_cache :
+         age_id_set  = set()
+         time_id_set = set()
+         for smooth_grid_id in smooth_grid_index[smooth_id] :
+            row = fit_table['smooth_grid'][smooth_grid_id]
+            age_id_set.add( row['age_id'] )
+            time_id_set.add( row['time_id'] )
+         age_id_list  = sorted( age_id_set,
+            key = lambda age_id : fit_table['age'][age_id]['age']
+         )
+         time_id_list = sorted( time_id_set,
+            key = lambda time_id : fit_table['time'][time_id]['time']
+         )
+         age_array  = numpy.array(
+            [ fit_table['age'][age_id]['age'] for age_id in age_id_list ]
+         )
+         time_array = numpy.array(
+            [ fit_table['time'][time_id]['time'] for time_id in time_id_list ]
+         )
+         grid_cache[smooth_id] = \
+            (age_id_list, age_array, time_id_list, time_array)
+      return grid_cache[smooth_id]
+   #
+   # child_smooth_id
+   # child_smooth_id[rate_id][node_id] is the random effect smoothing for
+   # this rate and child node (None if there is no random effect).
+   child_smooth_id = list()
+   for rate_row in fit_table['rate'] :
+      smooth_dict = dict()
+      if rate_row['child_nslist_id'] is not None :
+         for row in fit_table['nslist_pair'] :
+            if row['nslist_id'] == rate_row['child_nslist_id'] :
+               smooth_dict[ row['node_id'] ] = row['smooth_id']
+      elif rate_row['child_smooth_id'] is not None :
+         for node_id in node_tree.children(parent_node_id) :
+            smooth_dict[node_id] = rate_row['child_smooth_id']
+      child_smooth_id.append( smooth_dict )
+   #
+   # rate_name2id
+   rate_name2id = dict()
+   for (rate_id, row) in enumerate( fit_table['rate'] ) :
+      rate_name2id[ row['rate_name'] ] = rate_id
+   #
+   # group_id
+   # group for the subgroup used by the avgint table
+   subgroup_group_id = [ row['group_id'] for row in fit_table['subgroup'] ]
+   #
+   # lin_row, lin_var_id, lin_weight
+   # The linear factor for avgint_id is the sum of lin_weight times the
+   # variable lin_var_id for the entries with lin_row equal to avgint_id.
+   lin_row    = list()
+   lin_var_id = list()
+   lin_weight = list()
+   #
+   # exp_row, exp_var_id, exp_weight
+   # The exponent for avgint_id is the sum of exp_weight times the
+   # variable exp_var_id for the entries with exp_row equal to avgint_id.
+   exp_row    = list()
+   exp_var_id = list()
+   exp_weight = list()
+   #
+   # add_term
+   def add_term(row_list, var_id_list, weight_list,
+      avgint_id, smooth_id, age, time, factor, var_type, **column
+   ) :
+      grid = get_grid(smooth_id)
+      for (age_id, time_id, weight) in grid_interpolate(grid, age, time) :
+         var_id = var_index.var_id(
+            var_type, age_id = age_id, time_id = time_id, **column
+         )
+         row_list.append( avgint_id )
+         var_id_list.append( var_id )
+         weight_list.append( factor * weight )
+   #
+   # avgint_id
+   n_covariate = len( fit_table['covariate'] )
+   for (avgint_id, avgint_row) in enumerate( fit_table['avgint'] ) :
+      #
+      # age, time
+      age  = avgint_row['age_lower']
+      time = avgint_row['time_lower']
+      if age != avgint_row['age_upper'] or time != avgint_row['time_upper'] :
+         return predict_value
+      #
+      # integrand_name
+      integrand_id   = avgint_row['integrand_id']
+      integrand_name = fit_table['integrand'][integrand_id]['integrand_name']
+      #
+      # group_id
+      subgroup_id = avgint_row['subgroup_id']
+      group_id    = subgroup_group_id[subgroup_id]
+      #
+      # covariate_difference
+      # dismod_at predict skips rows that violate a max_difference
+      covariate_difference = list()
+      for covariate_id in range(n_covariate) :
+         value = avgint_row[f'x_{covariate_id}']
+         if value is None :
+            covariate_difference.append(0.0)
+         else :
+            covariate_row  = fit_table['covariate'][covariate_id]
+            difference     = value - covariate_row['reference']
+            max_difference = covariate_row['max_difference']
+            if max_difference is not None :
+               if abs(difference) > max_difference :
+                  return predict_value
+            covariate_difference.append(difference)
+      #
+      if integrand_name.startswith('mulcov_') :
+         #
+         # covariate multiplier
+         mulcov_id  = int( integrand_name[len('mulcov_') :] )
+         mulcov_row = fit_table['mulcov'][mulcov_id]
+         add_term(lin_row, lin_var_id, lin_weight,
+            avgint_id, mulcov_row['group_smooth_id'], age, time, 1.0,
+            'mulcov_' + mulcov_row['mulcov_type'],
+            mulcov_id = mulcov_id, group_id = mulcov_row['group_id'],
+         )
+         continue
+      #
+      # rate_id
+      if integrand_name not in integrand2rate :
+         return predict_value
+      if integrand_name == 'prevalence' and age != minimum_age :
+         return predict_value
+      rate_id = rate_name2id[ integrand2rate[integrand_name] ]
+      #
+      # parent rate
+      smooth_id = fit_table['rate'][rate_id]['parent_smooth_id']
+      if smooth_id is None :
+         return predict_value
+      add_term(lin_row, lin_var_id, lin_weight,
+         avgint_id, smooth_id, age, time, 1.0,
+         'rate', node_id = parent_node_id, rate_id = rate_id,
+      )
+      #
+      # child random effect
+      node_id = avgint_row['node_id']
+      if node_id != parent_node_id :
+         if node_tree.parent(node_id) != parent_node_id :
+            return predict_value
+         smooth_id = child_smooth_id[rate_id].get(node_id, None)
+         if smooth_id is not None :
+            add_term(exp_row, exp_var_id, exp_weight,
+               avgint_id, smooth_id, age, time, 1.0,
+               'rate', node_id = node_id, rate_id = rate_id,
+            )
+      #
+      # covariate effects
+      for (mulcov_id, mulcov_row) in enumerate( fit_table['mulcov'] ) :
+         mulcov_type = mulcov_row['mulcov_type']
+         if mulcov_type == 'rate_value' :
+            match = mulcov_row['rate_id'] == rate_id
+         elif mulcov_type == 'meas_value' :
+            match = mulcov_row['integrand_id'] == integrand_id
+         else :
+            match = False
+         match = match and mulcov_row['group_id'] == group_id
+         match = match and mulcov_row['group_smooth_id'] is not None
+         if match :
+            difference = covariate_difference[ mulcov_row['covariate_id'] ]
+            if difference != 0.0 :
+               add_term(exp_row, exp_var_id, exp_weight,
+                  avgint_id, mulcov_row['group_smooth_id'], age, time,
+                  difference, 'mulcov_' + mulcov_type,
+                  mulcov_id = mulcov_id, group_id = group_id,
+               )
+   #
+   # fit_var_value
+   n_var         = len( fit_table['var'] )
+   fit_var_value = numpy.array(
+      [ row['fit_var_value'] for row in fit_table['fit_var'] ]
+   )
+   assert len(fit_var_value) == n_var
+   #
+   # sample_var_value
+   n_sample = 0
+   if n_row > 0 :
+      n_sample = int( sample_index.max() ) + 1
+   assert n_row == n_sample * n_var
+   sample_value = numpy.zeros( (n_var, n_sample) )
+   sample_value[sample_var_id, sample_index] = sample_var_value
+   #
+   # linear, exponent
+   # columns are fit_var followed by the samples
+   n_avgint   = len( fit_table['avgint'] )
+   var_value  = numpy.column_stack( (fit_var_value, sample_value) )
+   linear     = numpy.zeros( (n_avgint, n_sample + 1) )
+   exponent   = numpy.zeros( (n_avgint, n_sample + 1) )
+   for (row_list, var_id_list, weight_list, total) in [
+      (lin_row, lin_var_id, lin_weight, linear),
+      (exp_row, exp_var_id, exp_weight, exponent),
+   ] :
+      row_array    = numpy.array(row_list, dtype = int)
+      var_id_array = numpy.array(var_id_list, dtype = int)
+      weight_array = numpy.array(weight_list, dtype = float)
+      numpy.add.at(
+         total,
+         row_array,
+         weight_array[:, numpy.newaxis] * var_value[var_id_array, :]
+      )
+   value = linear * numpy.exp(exponent)
+   #
+   # predict_value
+   predict_value = {
+      'fit_var' : value[:, 0] ,
+      'sample'  : value[:, 1 :].transpose() ,
+   }
+   # BEGIN RETURN
+   # ...
+   assert predict_value is None or type(predict_value) == dict
+   return predict_value
+   # END RETURN
@@ -22,7 +22,7 @@ Syntax
 
 Default Value
 *************
-The only argument that can be None is *trace_file_obj*.
+The only arguments that can be None are *trace_file_obj* and *job_usage* .
 
 job_table
 *********
@@ -67,6 +67,17 @@ If this argument is not None, it is a ``io.TextIOBase`` object
 corresponding to a file that is opened for writing the tracing output
 for this job.
 
+job_usage
+*********
+If this argument is not None, it is a ``dict`` .
+Upon return, *job_usage* [ ``'max_rss_mb'`` ] is the maximum of its
+value on input (if it is present) and the maximum resident set size,
+in megabytes, for the dismod_at commands run by this routine.
+The operating system reports this size in kilobytes
+(in bytes on Apple systems) and it is converted to megabytes.
+This is used by :ref:`run_parallel-name` to measure the memory
+used by a job; see :ref:`option_all_table@max_memory_mb` .
+
 fit_node_database
 *****************
 The :ref:`glossary@fit_node_database` for this fit is
@@ -96,17 +107,125 @@ If *fit_type* is 'both', the previous contents of the log are removed.
 Upon return,
 a summary of the operations preformed on dismod.db is added to the log table.
 
+max_job_seconds
+***************
+If :ref:`option_all_table@max_job_seconds` appears in the option_all table,
+the dismod_at commands run by this routine are terminated (their process
+group is killed) when the wall clock time since this routine started
+exceeds *max_job_seconds* .
+In this case a ``TimeoutError`` exception is raised.
+
+scratch_dir
+***********
+If :ref:`option_all_table@scratch_dir` appears in the option_all table,
+*fit_node_database* is copied to a temporary directory below *scratch_dir*
+and all the dismod_at commands for this job are run on the copy.
+The other_database option in the copy is set to the absolute path of the
+root_node_database, or to its copy in *scratch_dir* if
+:ref:`option_all_table@scratch_root` is true.
+The copy is moved back to *fit_node_database* as follows:
+the copy is written to a temporary file next to *fit_node_database*,
+the other_database option in that file is restored,
+and that file is renamed to *fit_node_database* .
+This is done when the job completes, and also after the
+omega constraints are applied during the first fit.
+Thus, if a fit fails, the next *fit_type* for this job starts with the
+omega constraints, as it does when *scratch_dir* is not used.
+The temporary directory is removed when this routine returns or raises.
+The shift databases for the child jobs are written directly to their
+final location (see :ref:`create_shift_db@Template` ).
+
+shift_predict
+*************
+The predictions on the parent grid, used to create the priors for the
+child jobs, are computed by dismod_at predict or by
+:ref:`predict_parent_grid-name` depending on the value of
+:ref:`option_all_table@shift_predict` .
+
 {xrst_end run_one_job}
 '''
 # ----------------------------------------------------------------------------
 import io
+import sys
 import os
 import time
+import shutil
+import signal
+import hashlib
+import subprocess
+import tempfile
+import numpy
 import dismod_at
 import at_cascade
 # -----------------------------------------------------------------------------
-def system_command(command, file_stdout) :
-   if file_stdout is None :
+# system_command(command, file_stdout, deadline, job_usage)
+# If deadline is not None, it is the time.time() value at which the command
+# is terminated. In this case the command is run in its own process group,
+# the group is killed at the deadline, and TimeoutError is raised.
+# If job_usage is not None, it is a dict and job_usage['max_rss_mb'] is
+# set to the maximum of its previous value and the maximum resident set size,
+# in megabytes, for the command.
+def system_command(command, file_stdout, deadline = None, job_usage = None) :
+   if deadline is not None or job_usage is not None :
+      #
+      # print or write the command
+      command_str = ' '.join(command)
+      if file_stdout is None :
+         print(command_str)
+      else :
+         file_stdout.write(command_str + '\n')
+         file_stdout.flush()
+      #
+      # process
+      # os.wait4 is used (instead of process.wait) to get the resource usage
+      # for this command.
+      stderr_file = tempfile.TemporaryFile(mode = 'w+', encoding = 'utf-8')
+      process     = subprocess.Popen(
+         command,
+         stdout            = file_stdout,
+         stderr            = stderr_file,
+         encoding          = 'utf-8',
+         start_new_session = True,
+      )
+      #
+      # status, rusage
+      poll_seconds = 0.001
+      while True :
+         (pid, status, rusage) = os.wait4(process.pid, os.WNOHANG)
+         if pid != 0 :
+            break
+         if deadline is not None and deadline <= time.time() :
+            os.killpg(process.pid, signal.SIGKILL)
+            os.wait4(process.pid, 0)
+            process.returncode = -signal.SIGKILL
+            stderr_file.close()
+            msg  = 'run_one_job: timeout during following command:\n'
+            msg += command_str
+            raise TimeoutError(msg)
+         time.sleep(poll_seconds)
+         poll_seconds = min(0.1, 2.0 * poll_seconds)
+      process.returncode = os.waitstatus_to_exitcode(status)
+      #
+      # job_usage
+      # ru_maxrss is in bytes on macOS and in kilobytes on other systems.
+      if job_usage is not None :
+         if sys.platform == 'darwin' :
+            max_rss_mb = rusage.ru_maxrss / (1024.0 * 1024.0)
+         else :
+            max_rss_mb = rusage.ru_maxrss / 1024.0
+         if 'max_rss_mb' in job_usage :
+            max_rss_mb = max(max_rss_mb, job_usage['max_rss_mb'])
+         job_usage['max_rss_mb'] = max_rss_mb
+      #
+      # stderr
+      stderr_file.seek(0)
+      stderr = stderr_file.read()
+      stderr_file.close()
+      if process.returncode != 0 :
+         msg  = f'run_one_job: following command failed:\n{command_str}\n'
+         msg += stderr
+         assert False, msg
+   elif file_stdout is None :
       dismod_at.system_command_prc(
          command,
          print_command = True,
@@ -127,6 +246,148 @@ def system_command(command, file_stdout) :
          write_command = True,
       )
 # ----------------------------------------------------------------------------
+# previous = set_other_database(database, other_database)
+# Set the value of the other_database option in the option table for
+# database and return its previous value. If the option table does not
+# have a non-null other_database value, it is not changed and None is returned.
+def set_other_database(database, other_database) :
+   connection   = dismod_at.create_connection(
+      database, new = False, readonly = False
+   )
+   option_table = dismod_at.get_table_dict(connection, 'option')
+   previous     = None
+   for row in option_table :
+      if row['option_name'] == 'other_database' :
+         previous            = row['option_value']
+         row['option_value'] = other_database
+   if previous is not None :
+      dismod_at.replace_table(connection, 'option', option_table)
+   connection.close()
+   return previous
+# -----------------------------------------------------------------------------
+# copy_to_result(scratch_database, result_database, other_database)
+# Copy the committed contents of scratch_database to result_database.
+# If other_database is not None, it is the other_database option value in
+# the copy. The copy is written to a temporary file next to result_database
+# and then renamed, so result_database is always a complete database.
+def copy_to_result(scratch_database, result_database, other_database) :
+   temporary_database = f'{result_database}.{os.getpid()}.tmp'
+   source      = dismod_at.create_connection(
+      scratch_database, new = False, readonly = True
+   )
+   destination = dismod_at.create_connection(
+      temporary_database, new = True, readonly = False
+   )
+   source.backup(destination)
+   destination.close()
+   source.close()
+   if other_database is not None :
+      set_other_database(temporary_database, other_database)
+   os.replace(temporary_database, result_database)
+# -----------------------------------------------------------------------------
+# scratch_root_database = get_scratch_root(root_node_database, scratch_dir)
+# Return the name of a copy of root_node_database in scratch_dir.
+# The copy is made if it does not exist or if its size or modification time
+# is different from root_node_database. The copy is written to a temporary
+# file and then renamed, so jobs running at the same time on this host can
+# share the copy.
+def get_scratch_root(root_node_database, scratch_dir) :
+   #
+   # scratch_root_database
+   abspath = os.path.abspath(root_node_database)
+   digest  = hashlib.md5( abspath.encode() ).hexdigest()[0 : 16]
+   scratch_root_database = f'{scratch_dir}/root_node_{digest}.db'
+   #
+   # update
+   stat   = os.stat(root_node_database)
+   update = True
+   if os.path.isfile(scratch_root_database) :
+      scratch_stat = os.stat(scratch_root_database)
+      update = (stat.st_size, stat.st_mtime_ns) != \
+         (scratch_stat.st_size, scratch_stat.st_mtime_ns)
+   if update :
+      (file_descriptor, temporary_database) = tempfile.mkstemp(
+         dir = scratch_dir, suffix = '.tmp'
+      )
+      os.close(file_descriptor)
+      shutil.copyfile(root_node_database, temporary_database)
+      os.utime(temporary_database, ns = (stat.st_atime_ns, stat.st_mtime_ns) )
+      os.replace(temporary_database, scratch_root_database)
+   return scratch_root_database
+# -----------------------------------------------------------------------------
+# shift_predict_tolerance
+# is the maximum relative difference between predict_parent_grid and
+# dismod_at predict when option_all shift_predict is validate.
+shift_predict_tolerance = 1e-8
+# -----------------------------------------------------------------------------
+# write_shift_predict(connection, predict_value)
+# Create the c_shift_predict_fit_var and c_shift_predict_sample tables,
+# in the same format as the dismod_at predict table, using the return value
+# of predict_parent_grid. The changes are not committed.
+def write_shift_predict(connection, predict_value) :
+   fit_var_value = predict_value['fit_var']
+   sample_value  = predict_value['sample']
+   (n_sample, n_avgint) = sample_value.shape
+   #
+   # row_dict
+   row_dict = dict()
+   row_dict['c_shift_predict_fit_var'] = (
+      (avgint_id, None, avgint_id, float( fit_var_value[avgint_id] ) )
+      for avgint_id in range(n_avgint)
+   )
+   row_dict['c_shift_predict_sample'] = (
+      (
+         sample_index * n_avgint + avgint_id,
+         sample_index,
+         avgint_id,
+         float( sample_value[sample_index, avgint_id] ),
+      )
+      for sample_index in range(n_sample) for avgint_id in range(n_avgint)
+   )
+   #
+   # tbl_name
+   for tbl_name in row_dict :
+      command  = f'DROP TABLE IF EXISTS {tbl_name}'
+      connection.execute(command)
+      command  = f'CREATE TABLE {tbl_name} ('
+      command += f'{tbl_name}_id integer primary key, '
+      command += 'sample_index integer, avgint_id integer, avg_integrand real)'
+      connection.execute(command)
+      command  = f'INSERT INTO {tbl_name} VALUES (?, ?, ?, ?)'
+      connection.executemany(command, row_dict[tbl_name])
+# -----------------------------------------------------------------------------
+# max_rel_diff = check_shift_predict(connection, predict_value)
+# Return the maximum relative difference between the c_shift_predict_fit_var,
+# c_shift_predict_sample tables and the return value of predict_parent_grid.
+# The tables must have a row for every avgint_id (and every sample_index).
+def check_shift_predict(connection, predict_value) :
+   fit_var_value = predict_value['fit_var']
+   sample_value  = predict_value['sample']
+   (n_sample, n_avgint) = sample_value.shape
+   #
+   # max_rel_diff
+   max_rel_diff = 0.0
+   for (tbl_name, expected) in [
+      ('c_shift_predict_fit_var', fit_var_value.reshape(1, n_avgint)),
+      ('c_shift_predict_sample', sample_value),
+   ] :
+      command  = 'SELECT sample_index, avgint_id, avg_integrand '
+      command += f'FROM {tbl_name}'
+      result   = dismod_at.sql_command(connection, command)
+      found    = numpy.full(expected.shape, False)
+      for (sample_index, avgint_id, avg_integrand) in result :
+         if sample_index is None :
+            sample_index = 0
+         found[sample_index, avgint_id] = True
+         value = expected[sample_index, avgint_id]
+         scale = max( abs(value), abs(avg_integrand) )
+         if scale > 0.0 :
+            rel_diff     = abs(value - avg_integrand) / scale
+            max_rel_diff = max(max_rel_diff, rel_diff)
+      if not numpy.all(found) :
+         max_rel_diff = numpy.inf
+   return float(max_rel_diff)
+# ----------------------------------------------------------------------------
 # BEGIN syntax
 # at_cascade.run_one_job
 def run_one_job(
@@ -138,6 +399,7 @@ def run_one_job(
    fit_type                ,
    first_fit               ,
    trace_file_obj    = None,
+   job_usage         = None,
 # )
 ) :
    assert type(job_table) == list
@@ -147,6 +409,7 @@ def run_one_job(
    assert type(fit_integrand) == set
    assert fit_type in [ 'both', 'fixed' ]
    assert type(first_fit) == bool
+   assert job_usage is None or type(job_usage) == dict
    # END syntax
    #
    # file_stdout
@@ -154,6 +417,9 @@ def run_one_job(
       assert isinstance(trace_file_obj, io.TextIOBase)
    file_stdout = trace_file_obj
    #
+   # start_time
+   start_time = time.time()
+   #
    # fit_node_id
    fit_node_id = job_table[run_job_id]['fit_node_id']
    #
@@ -166,31 +432,18 @@ def run_one_job(
    # end_child_job_id
    end_child_job_id = job_table[run_job_id]['end_child_job_id']
    #
-   # all_table
-   connection  = dismod_at.create_connection(
-      all_node_database, new = False, readonly = True
-   )
-   all_table = dict()
-   for tbl_name in [
-      'option_all',
-      'split_reference',
-      'node_split',
-      'mulcov_freeze',
-   ] :
-      all_table[tbl_name] = dismod_at.get_table_dict(connection, tbl_name)
-   connection.close()
+   # all_node_info
+   all_node_info = at_cascade.get_all_node_info(all_node_database)
    #
    # double_max_fit
    double_max_fit = False
-   for row in all_table['mulcov_freeze'] :
+   for row in all_node_info['mulcov_freeze'] :
       if fit_node_id == row['fit_node_id'] :
          if fit_split_reference_id == row['split_reference_id'] :
             double_max_fit = True
    #
    # option_all_dict
-   option_all_dict = dict()
-   for row in all_table['option_all'] :
-      option_all_dict[ row['option_name']  ] = row['option_value']
+   option_all_dict = all_node_info['option_all_dict']
    #
    # sample_method
    if 'sample_method' in option_all_dict :
@@ -201,13 +454,52 @@ def run_one_job(
    else :
       sample_method = 'asymptotic'
    #
+   # shift_predict
+   if 'shift_predict' in option_all_dict :
+      shift_predict = option_all_dict['shift_predict']
+      if shift_predict not in [ 'dismod_at', 'numpy', 'validate' ] :
+         msg  = 'option_all table: shift_predict is not '
+         msg += 'dismod_at, numpy, or validate'
+         assert False, msg
+   else :
+      shift_predict = 'dismod_at'
+   #
+   # sqlite_profile
+   if 'sqlite_profile' in option_all_dict :
+      sqlite_profile = option_all_dict['sqlite_profile']
+   else :
+      sqlite_profile = 'default'
+   #
+   # scratch_dir
+   scratch_dir = None
+   if 'scratch_dir' in option_all_dict :
+      scratch_dir = option_all_dict['scratch_dir']
+      if not os.path.isdir(scratch_dir) :
+         msg  = f'option_all table: scratch_dir = {scratch_dir} '
+         msg += 'is not a directory'
+         assert False, msg
+   #
+   # scratch_root
+   scratch_root = False
+   if 'scratch_root' in option_all_dict :
+      scratch_root = option_all_dict['scratch_root']
+      if scratch_root not in [ 'true', 'false' ] :
+         msg = 'option_all table: scratch_root is not true or false'
+         assert False, msg
+      scratch_root = scratch_root == 'true'
+   #
    # refit_split
-   if 'refit_split' in option_all_dict :
-      refit_split = option_all_dict['refit_split']
-      assert refit_split in [ 'true', 'false' ]
-      refit_split = refit_split == 'true'
+   refit_split = all_node_info['refit_split']
+   #
+   # deadline
+   if 'max_job_seconds' in option_all_dict :
+      max_job_seconds = float( option_all_dict['max_job_seconds'] )
+      if max_job_seconds <= 0.0 :
+         msg = 'option_all table: max_job_seconds is not greater than zero'
+         assert False, msg
+      deadline = start_time + max_job_seconds
    else :
-      refit_split = False
+      deadline = None
    #
    # result_dir
    result_dir = option_all_dict['result_dir']
@@ -217,14 +509,9 @@ def run_one_job(
    root_node_id = at_cascade.table_name2id(node_table, 'node', name)
    #
    # root_split_reference_id
-   if 'root_split_reference_name' not in option_all_dict :
-      root_split_reference_id = None
+   root_split_reference_id = all_node_info['root_split_reference_id']
+   if root_split_reference_id is None :
       assert refit_split == False
-   else :
-      name = option_all_dict['root_split_reference_name']
-      root_split_reference_id   = at_cascade.table_name2id(
-         all_table['split_reference'], 'split_reference', name
-      )
    #
    # balance_fit
    if 'balance_fit' not in option_all_dict :
@@ -255,16 +542,11 @@ def run_one_job(
          if float(sigma) > 0.0 :
             perturb_optimization[key] = sigma
    #
-   # node_split_set
-   node_split_set = set()
-   for row in all_table['node_split'] :
-      node_split_set.add( row['node_id'] )
-   #
    # fit_node_database
    database_dir = at_cascade.get_database_dir(
       node_table              = node_table,
-      split_reference_table   = all_table['split_reference'],
-      node_split_set          = node_split_set,
+      split_reference_table   = all_node_info['split_reference'],
+      node_split_set          = all_node_info['node_split_set'],
       root_node_id            = root_node_id,
       root_split_reference_id = root_split_reference_id,
       fit_node_id             = fit_node_id ,
@@ -276,173 +558,222 @@ def run_one_job(
    parent_node_name = at_cascade.get_parent_node(fit_node_database)
    assert parent_node_name == node_table[fit_node_id]['node_name']
    #
-   # connection
-   connection = dismod_at.create_connection(
-      fit_node_database, new = False, readonly = False
-   )
-   #
-   # integrand_table
+   # root_node_database
    root_node_database = option_all_dict['root_node_database']
-   fit_or_root        = at_cascade.fit_or_root_class(
-      fit_node_database, root_node_database
-   )
-   integrand_table = fit_or_root.get_table('integrand')
-   fit_or_root.close()
    #
-   # log table
-   if first_fit :
-      cmd = 'drop table if exists log'
-      dismod_at.sql_command(connection, cmd)
+   # result_database, scratch, fit_node_database, root_node_database
+   # If scratch_dir is not None, the rest of this job uses a copy of
+   # result_database in the directory scratch.name.
+   # The directory is removed when this routine returns or raises.
+   result_database = fit_node_database
+   scratch         = None
+   if scratch_dir is not None :
+      scratch = tempfile.TemporaryDirectory(dir = scratch_dir, prefix = 'job_')
+   try :
+      if scratch is not None :
+         fit_node_database = f'{scratch.name}/dismod.db'
+         shutil.copyfile(result_database, fit_node_database)
+         #
+         if scratch_root :
+            root_node_database = get_scratch_root(
+               root_node_database, scratch_dir
+            )
+         #
+         # result_other_database
+         # the other database is the root_node_database (or its scratch copy)
+         result_other_database = set_other_database(
+            fit_node_database, os.path.abspath(root_node_database)
+         )
       #
-      # omega_constraint
-      at_cascade.omega_constraint(all_node_database, fit_node_database)
-      at_cascade.add_log_entry(connection, 'omega_constraint')
-   #
-   # init
-   command = [ 'dismod_at', fit_node_database, 'init' ]
-   system_command(command, file_stdout)
-   #
-   # max_fit
-   if 'max_fit' in option_all_dict :
-      max_fit = option_all_dict['max_fit']
-      if double_max_fit :
-         max_fit = str( 2 * int(max_fit) )
-      for integrand_id in fit_integrand :
-         integrand_name = integrand_table[integrand_id]['integrand_name']
+      # connection
+      connection = dismod_at.create_connection(
+         fit_node_database, new = False, readonly = False
+      )
+      at_cascade.set_sqlite_profile(connection, sqlite_profile)
+      #
+      # integrand_table
+      fit_or_root        = at_cascade.fit_or_root_class(
+         fit_node_database, root_node_database
+      )
+      integrand_table = fit_or_root.get_table('integrand')
+      fit_or_root.close()
+      #
+      # log table
+      if first_fit :
+         cmd = 'drop table if exists log'
+         dismod_at.sql_command(connection, cmd)
+         #
+         # omega_constraint
+         at_cascade.omega_constraint(all_node_database, fit_node_database)
+         at_cascade.add_log_entry(connection, 'omega_constraint')
+         #
+         # result_database
+         # The next fit_type for this job, if this fit fails, starts from
+         # result_database, so it must have the omega constraints and new log.
+         if scratch is not None :
+            copy_to_result(
+               fit_node_database, result_database, result_other_database
+            )
+      #
+      # init
+      command = [ 'dismod_at', fit_node_database, 'init' ]
+      system_command(command, file_stdout, deadline, job_usage)
+      #
+      # max_fit
+      if 'max_fit' in option_all_dict :
+         max_fit = option_all_dict['max_fit']
+         if double_max_fit :
+            max_fit = str( 2 * int(max_fit) )
+         for integrand_id in fit_integrand :
+            integrand_name = integrand_table[integrand_id]['integrand_name']
+            command = [
+               'dismod_at', fit_node_database,
+               'hold_out', integrand_name, max_fit
+            ]
+            if balance_fit is not None :
+               command += balance_fit
+            system_command(command, file_stdout, deadline, job_usage)
+      #
+      # max_abs_effect
+      if 'max_abs_effect' in option_all_dict:
+         max_abs_effect = option_all_dict['max_abs_effect']
+         command =[
+            'dismod_at', fit_node_database, 'bnd_mulcov', max_abs_effect
+         ]
+         system_command(command, file_stdout, deadline, job_usage)
+      #
+      # perturb_optimization
+      for key in perturb_optimization :
+         sigma = perturb_optimization[key]
+         table = f'{key}_var'
          command = [
-            'dismod_at', fit_node_database,
-            'hold_out', integrand_name, max_fit
+            'dismodat.py', fit_node_database, 'perturb', table, sigma
          ]
-         if balance_fit is not None :
-            command += balance_fit
-         system_command(command, file_stdout)
-   #
-   # max_abs_effect
-   if 'max_abs_effect' in option_all_dict:
-      max_abs_effect = option_all_dict['max_abs_effect']
-      command =[
-         'dismod_at', fit_node_database, 'bnd_mulcov', max_abs_effect
-      ]
-      system_command(command, file_stdout)
-   #
-   # perturb_optimization
-   for key in perturb_optimization :
-      sigma = perturb_optimization[key]
-      table = f'{key}_var'
-      command = [
-         'dismodat.py', fit_node_database, 'perturb', table, sigma
-      ]
-      system_command(command, file_stdout)
-   #
-   # fit
-   command = [ 'dismod_at', fit_node_database, 'fit', fit_type ]
-   system_command(command, file_stdout)
-   #
-   # number_simulate
-   if 'number_sample' not in option_all_dict :
-      number_simulate = '20'
-   else :
-      number_simulate = option_all_dict['number_sample']
-   #
-   # sample
-   if sample_method == 'simulate' :
-      if int( number_simulate ) > 20 :
-         msg  = 'option_all table: number_sample > 20 and '
-         msg += 'sample_method is simulate.'
-         assert False, msg
-      command = [
-         'dismod_at', fit_node_database, 'set', 'truth_var', 'fit_var'
-      ]
-      system_command(command, file_stdout)
+         system_command(command, file_stdout, deadline, job_usage)
+      #
+      # fit
+      command = [ 'dismod_at', fit_node_database, 'fit', fit_type ]
+      system_command(command, file_stdout, deadline, job_usage)
+      #
+      # number_simulate
+      if 'number_sample' not in option_all_dict :
+         number_simulate = '20'
+      else :
+         number_simulate = option_all_dict['number_sample']
+      #
+      # sample
+      if sample_method == 'simulate' :
+         if int( number_simulate ) > 20 :
+            msg  = 'option_all table: number_sample > 20 and '
+            msg += 'sample_method is simulate.'
+            assert False, msg
+         command = [
+            'dismod_at', fit_node_database, 'set', 'truth_var', 'fit_var'
+         ]
+         system_command(command, file_stdout, deadline, job_usage)
+         command = [
+            'dismod_at', fit_node_database, 'simulate', number_simulate
+         ]
+         system_command(command, file_stdout, deadline, job_usage)
       command = [
-         'dismod_at', fit_node_database, 'simulate', number_simulate
+         'dismod_at',
+         fit_node_database,
+         'sample',
+         sample_method,
+         fit_type,
+         number_simulate
       ]
-      system_command(command, file_stdout)
-   command = [
-      'dismod_at',
-      fit_node_database,
-      'sample',
-      sample_method,
-      fit_type,
-      number_simulate
-   ]
-   system_command(command, file_stdout)
-   #
-   # avgint_parent_grid
-   at_cascade.avgint_parent_grid(
-      all_node_database = all_node_database ,
-      fit_node_database = fit_node_database ,
-      job_table         = job_table         ,
-      fit_job_id        = run_job_id        ,
-   )
-   at_cascade.add_log_entry(connection, 'avgint_parent_grid')
-   #
-   # c_shift_predict_fit_var
-   command = [ 'dismod_at', fit_node_database, 'predict', 'fit_var' ]
-   system_command(command, file_stdout)
-   at_cascade.move_table(connection, 'predict', 'c_shift_predict_fit_var')
-   #
-   # c_shift_predict_sample
-   command = [ 'dismod_at', fit_node_database, 'predict', 'sample' ]
-   system_command(command, file_stdout)
-   at_cascade.move_table(connection, 'predict', 'c_shift_predict_sample')
-   #
-   # c_shift_avgint
-   # is the table created by avgint_parent_grid
-   at_cascade.move_table(connection, 'avgint', 'c_shift_avgint')
-   #
-   # shift_databases
-   shift_databases = dict()
-   for job_id in range(start_child_job_id, end_child_job_id) :
+      system_command(command, file_stdout, deadline, job_usage)
+      #
+      # avgint_parent_grid
+      at_cascade.avgint_parent_grid(
+         all_node_database = all_node_database ,
+         fit_node_database = fit_node_database ,
+         job_table         = job_table         ,
+         fit_job_id        = run_job_id        ,
+      )
+      at_cascade.add_log_entry(connection, 'avgint_parent_grid')
+      #
+      # predict_value
+      if shift_predict == 'dismod_at' :
+         predict_value = None
+      else :
+         predict_value = at_cascade.predict_parent_grid(
+            fit_node_database, root_node_database
+         )
+         if predict_value is None :
+            message = 'predict_parent_grid: not supported, using dismod_at'
+            at_cascade.add_log_entry(connection, message)
+      #
+      if shift_predict == 'numpy' and predict_value is not None :
+         #
+         # c_shift_predict_fit_var, c_shift_predict_sample
+         connection.execute('BEGIN')
+         write_shift_predict(connection, predict_value)
+         at_cascade.add_log_entry(connection, 'predict_parent_grid')
+      else :
+         #
+         # c_shift_predict_fit_var
+         command = [ 'dismod_at', fit_node_database, 'predict', 'fit_var' ]
+         system_command(command, file_stdout, deadline, job_usage)
+         at_cascade.move_table(
+            connection, 'predict', 'c_shift_predict_fit_var'
+         )
+         #
+         # c_shift_predict_sample
+         command = [ 'dismod_at', fit_node_database, 'predict', 'sample' ]
+         system_command(command, file_stdout, deadline, job_usage)
+         connection.execute('BEGIN')
+         at_cascade.move_table(connection, 'predict', 'c_shift_predict_sample')
       #
-      # shift_node_id
-      shift_node_id = job_table[job_id]['fit_node_id']
+      # c_shift_avgint
+      # is the table created by avgint_parent_grid
+      at_cascade.move_table(connection, 'avgint', 'c_shift_avgint')
       #
-      # shift_split_reference_id
-      shift_split_reference_id = job_table[job_id]['split_reference_id']
+      # commit the changes since the last dismod_at command as one transaction
+      connection.commit()
       #
-      # shift_database_dir
-      database_dir = at_cascade.get_database_dir(
-         node_table              = node_table,
-         split_reference_table   = all_table['split_reference'],
-         node_split_set          = node_split_set,
-         root_node_id            = root_node_id,
-         root_split_reference_id = root_split_reference_id,
-         fit_node_id             = shift_node_id ,
-         fit_split_reference_id  = shift_split_reference_id,
+      # validate
+      if shift_predict == 'validate' and predict_value is not None :
+         max_rel_diff = check_shift_predict(connection, predict_value)
+         message  = 'predict_parent_grid: max relative difference = '
+         message += f'{max_rel_diff:.2e}'
+         at_cascade.add_log_entry(connection, message)
+         if max_rel_diff > shift_predict_tolerance :
+            msg  = f'run_one_job: {message}\n'
+            msg += f'fit_node_database = {fit_node_database}\n'
+            msg += 'predict_parent_grid does not agree with dismod_at predict'
+            assert False, msg
+      #
+      # shift_databases
+      shift_databases = at_cascade.get_shift_databases(
+         all_node_database = all_node_database,
+         node_table        = node_table,
+         job_table         = job_table,
+         fit_job_id        = run_job_id,
+         shift_job_id_list = list(
+            range(start_child_job_id, end_child_job_id)
+         ),
       )
-      shift_database_dir = f'{result_dir}/{database_dir}'
-      if not os.path.exists(shift_database_dir) :
-         os.makedirs(shift_database_dir)
       #
-      # shift_node_database
-      shift_node_database = f'{shift_database_dir}/dismod.db'
+      # create shifted databases
+      at_cascade.create_shift_db(
+         all_node_database,
+         fit_node_database,
+         shift_databases,
+      )
       #
-      # skip_refit
-      if refit_split :
-         skip_refit = False
-      else :
-         skip_refit = fit_split_reference_id != shift_split_reference_id
+      # empty_avgint_table
+      at_cascade.empty_avgint_table(connection)
       #
-      # shift_name
-      dir_list = shift_database_dir.split('/')
-      if skip_refit :
-         shift_name = dir_list[-2] + '/' + dir_list[-1]
-      else :
-         shift_name = dir_list[-1]
+      # connection
+      connection.close()
       #
-      # shfit_databases
-      shift_databases[shift_name] = shift_node_database
-   #
-   # create shifted databases
-   at_cascade.create_shift_db(
-      all_node_database,
-      fit_node_database,
-      shift_databases,
-   )
-   #
-   # empty_avgint_table
-   at_cascade.empty_avgint_table(connection)
-   #
-   # connection
-   connection.close()
+      # move fit_node_database back to result_database
+      if scratch is not None :
+         copy_to_result(
+            fit_node_database, result_database, result_other_database
+         )
+   finally :
+      if scratch is not None :
+         scratch.cleanup()
@@ -65,6 +65,18 @@ This is the maximum number of cpus (processes) to use.
 This must be greater than zero.
 If it is one, the jobs are run sequentially; i.e., not in parallel.
 
+Worker Pool
+===========
+If :ref:`option_all_table@worker_pool` is true and *max_number_cpu*
+is greater than one,
+*max_number_cpu* worker processes are started once and
+the master process sends them the job_id for each job that is ready to run.
+The worker processes exit when there are no more jobs to run.
+Otherwise, a new process is started each time a job is ready to run
+and there is a cpu available to run it.
+The job status values, and the meaning of the
+:ref:`run_parallel@Shared Memory` , are the same in both cases.
+
 fit_type_list
 *************
 This is a list with one or two elements
@@ -73,28 +85,126 @@ For each job, the first type of fit is attempted.
 If it fails, and there is a second type of fit, it is attempted.
 If it also fails, the corresponding job fails.
 
+Timeout
+=======
+If :ref:`option_all_table@max_job_seconds` appears in the option_all table
+and a fit takes longer than *max_job_seconds* ,
+the dismod_at command that is running is killed
+and the fit fails; see :ref:`run_one_job@max_job_seconds` .
+In this case the message ``timeout: fit`` *fit_type* is added to the
+log table for the job and the next type of fit (if any) is attempted.
+
+priority_list
+*************
+If this argument is None,
+the priority for each job is computed by :ref:`job_priority-name`
+using :ref:`option_all_table@priority_policy` .
+Otherwise, it is a list of non-negative ``int`` with the same length
+as *job_table* and *priority_list* [ *job_id* ] is the priority for
+the corresponding job.
+Among the jobs that are ready to run, those with larger priority
+are run first; jobs with the same priority are run in job_id order.
+
+resume
+******
+If this argument is true, the :ref:`run_parallel@Job Journal` from a
+previous run of this cascade is used to continue the cascade
+(this is useful if the previous run terminated abnormally; e.g.,
+the system crashed).
+In this case:
+
+#. If the journal status for the start job is ``done`` ,
+   *skip_start_job* is set to true.
+#. If the start job is skipped, the descendants of the start job
+   that have journal status ``done`` , and whose parent job is done,
+   are not run again.
+#. The other child jobs of the jobs that are done are run.
+   If such a child job has a journal status (was run before),
+   its input database is re-created using its parent job's
+   fit_node_database.
+
+If *resume* is false, the journal entries for the start job
+and its descendants are removed before any jobs are run.
+
 trace.out
 *********
 If the *max_number_cpu* is one, standard output is not redirected.
 Otherwise, standard output for each job is written to a file called
 ``trace.out`` in the same directory as the database for the job.
 
+Job Journal
+***********
+The status of each job, when it starts running and when it finishes,
+is recorded in the :ref:`job_journal_class@job_journal Table` in the file
+
+   *result_dir*\ ``/job_journal.db``
+
+where *result_dir* is the :ref:`option_all_table@result_dir` .
+If *skip_start_job* is true, the start job is recorded as done.
+
+Job History
+***********
+If :ref:`option_all_table@job_history_database` appears in the
+option_all table, a row is added to the
+:ref:`job_history_class@job_history Table` for every job that is run.
+This includes the maximum resident set size for the dismod_at commands
+run by the job; see :ref:`run_one_job@job_usage` .
+
 Shared Memory
 *************
-All of these jobs us the following two python multiprocessing
+All of these jobs us the following python multiprocessing
 shared memory names:
 
-|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_number_cpu_in_use``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_number_cpu_inuse``
 |  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_job_status``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_job_count``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_ready_queue``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_job_priority``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_job_memory``
+|  *shared_memory_prefix*\ ``_``\ *job_name*\ ``_memory``
 
 where *job_name* is *job_table* [ *start_job_id* ] [ ``"job_name"`` ]
 and :ref:`option_all_table@shared_memory_prefix` is specified
 in the option all table.
 
+job_count
+=========
+This is the number of jobs that have each of the possible job status values.
+It is updated every time the status of a job changes so that
+choosing the next job to run does not require a scan of the job table.
+
+ready_queue
+===========
+This is a binary heap containing the job_id for the jobs that are ready
+to run. The job with the largest priority is at the front of the queue
+and ties are broken by choosing the smallest job_id.
+When a job finishes, only its child jobs are added to the queue.
+
+job_priority
+============
+This is the priority for each job; see
+:ref:`run_parallel@priority_list` .
+
+job_memory
+==========
+This is the memory estimate, in megabytes, for each job; see
+:ref:`option_all_table@max_memory_mb` .
+
+memory
+======
+The first element is the memory budget, in megabytes,
+(zero if there is no budget) and the second element is the sum of
+the memory estimates for the jobs that are running.
+A ready job is only started if its memory estimate fits in the
+rest of the budget, or if no other job is running.
+
 {xrst_end run_parallel}
 '''
 # ----------------------------------------------------------------------------
 import datetime
+import gc
+import math
+import time
 import multiprocessing
 from multiprocessing import shared_memory
 import numpy
@@ -109,70 +219,221 @@ job_status_error = 4 # job had an exception
 job_status_abort = 5 # job is a descendant of a job that had an exception
 job_status_name  = [ 'wait', 'ready', 'run', 'done', 'error', 'abort' ]
 # ----------------------------------------------------------------------------
-def get_shared_memory_prefix(all_node_database) :
-   connection           = dismod_at.create_connection(
-      all_node_database, new = False, readonly = True
-   )
-   option_all_table     = dismod_at.get_table_dict(connection, 'option_all')
-   connection.close()
-   shared_memory_prefix = ""
-   for row in option_all_table :
-      if row['option_name'] == 'shared_memory_prefix' :
-         shared_memory_prefix = row['option_value']
-   return shared_memory_prefix
+def get_option_all_dict(all_node_database) :
+   all_node_info = at_cascade.get_all_node_info(all_node_database)
+   return all_node_info['option_all_dict']
 # ----------------------------------------------------------------------------
 def get_result_database_dir(
    all_node_database, node_table, fit_node_id, fit_split_reference_id
 ) :
    #
-   # option_all, node_split_table, split_reference_table
-   connection       = dismod_at.create_connection(
-      all_node_database, new = False, readonly = True
-   )
-   option_all_table = dismod_at.get_table_dict(connection, 'option_all')
-   node_split_table = dismod_at.get_table_dict(connection, 'node_split')
-   split_reference_table = \
-      dismod_at.get_table_dict(connection, 'split_reference')
-   connection.close()
-   #
-   # result_dir, root_node_name
-   result_dir              = None
-   root_node_id            = None
-   root_split_reference_id = None
-   for row in option_all_table :
-      if row['option_name'] == 'result_dir' :
-         result_dir = row['option_value']
-      if row['option_name'] == 'root_node_name' :
-         root_node_name = row['option_value']
-         root_node_id   = \
-            at_cascade.table_name2id(node_table, 'node', root_node_name)
-      if row['option_name'] == 'root_split_reference_name' :
-         root_split_reference_name = row['option_value']
-         root_split_reference_id = at_cascade.table_name2id(
-            split_reference_table,
-            'split_reference',
-            root_split_reference_name
-         )
-   assert result_dir is not None
-   assert root_node_id is not None
+   # all_node_info
+   all_node_info   = at_cascade.get_all_node_info(all_node_database)
+   option_all_dict = all_node_info['option_all_dict']
    #
-   # node_split_set
-   node_split_set = set()
-   for row in node_split_table :
-      node_split_set.add( row['node_id'] )
+   # result_dir, root_node_id
+   result_dir     = option_all_dict['result_dir']
+   name           = option_all_dict['root_node_name']
+   root_node_id   = at_cascade.table_name2id(node_table, 'node', name)
    #
    database_dir = at_cascade.get_database_dir(
       node_table              = node_table,
-      split_reference_table   = split_reference_table,
-      node_split_set          = node_split_set,
+      split_reference_table   = all_node_info['split_reference'],
+      node_split_set          = all_node_info['node_split_set'],
       root_node_id            = root_node_id,
-      root_split_reference_id = root_split_reference_id,
+      root_split_reference_id = all_node_info['root_split_reference_id'],
       fit_node_id             = fit_node_id,
       fit_split_reference_id  = fit_split_reference_id,
    )
    return f'{result_dir}/{database_dir}'
 # )
 # ----------------------------------------------------------------------------
+# shm_list, shared_array = get_shared_array(
+#  shared_memory_prefix_plus, n_job, create
+# )
+# If create is true (false) the shared memory is created (attached to).
+# shared_array['number_cpu_inuse'][0] is the number of cpus in use.
+# shared_array['job_status'][job_id] is the status for job_id.
+# shared_array['job_count'][job_status] is the number of jobs with job_status.
+# shared_array['ready_queue'][0] is the number of elements in the ready queue
+# and shared_array['ready_queue'][1:] is the corresponding binary heap.
+# shared_array['job_priority'][job_id] is the priority for job_id.
+# shared_array['job_memory'][job_id] is the memory estimate for job_id.
+# shared_array['memory'][0] is the memory budget (zero for no budget)
+# and shared_array['memory'][1] is the memory estimate for the running jobs.
+def get_shared_array(shared_memory_prefix_plus, n_job, create) :
+   assert type(shared_memory_prefix_plus) == str
+   assert type(n_job) == int
+   assert type(create) == bool
+   #
+   # shared_size
+   shared_size = {
+      'number_cpu_inuse' : 1,
+      'job_status'       : n_job,
+      'job_count'        : len(job_status_name),
+      'ready_queue'      : n_job + 1,
+      'job_priority'     : n_job,
+      'job_memory'       : n_job,
+      'memory'           : 2,
+   }
+   #
+   # shm_list, shared_array
+   shm_list     = list()
+   shared_array = dict()
+   for key in shared_size :
+      tmp  = numpy.empty(shared_size[key], dtype = int )
+      name = shared_memory_prefix_plus + '_' + key
+      if create :
+         shm = shared_memory.SharedMemory(
+            create = True, size = tmp.nbytes, name = name
+         )
+      else :
+         shm = shared_memory.SharedMemory(create = False, name = name)
+      shm_list.append(shm)
+      shared_array[key] = numpy.ndarray(
+         tmp.shape, dtype = tmp.dtype, buffer = shm.buf
+      )
+   return shm_list, shared_array
+# ----------------------------------------------------------------------------
+# before = ready_queue_before(job_priority, job_a, job_b)
+# True if job_a comes before job_b in the ready queue; i.e., job_a has
+# larger priority, or the same priority and a smaller job_id.
+def ready_queue_before(job_priority, job_a, job_b) :
+   if job_priority[job_a] != job_priority[job_b] :
+      return job_priority[job_a] > job_priority[job_b]
+   return job_a < job_b
+# ----------------------------------------------------------------------------
+# push_ready_queue(shared_array, job_id)
+# Add job_id to the ready queue heap. The lock must be acquired.
+def push_ready_queue(shared_array, job_id) :
+   ready_queue     = shared_array['ready_queue']
+   job_priority    = shared_array['job_priority']
+   n_queue         = int( ready_queue[0] )
+   ready_queue[0]  = n_queue + 1
+   #
+   # sift up, heap element k is stored at ready_queue[k+1]
+   k = n_queue
+   while k > 0 :
+      parent = (k - 1) // 2
+      if not ready_queue_before(job_priority, job_id, ready_queue[parent+1]) :
+         break
+      ready_queue[k + 1] = ready_queue[parent + 1]
+      k = parent
+   ready_queue[k + 1] = job_id
+# ----------------------------------------------------------------------------
+# job_id = pop_ready_queue(shared_array)
+# Remove the front of the ready queue heap and return it.
+# The lock must be acquired and the queue must not be empty.
+def pop_ready_queue(shared_array) :
+   ready_queue     = shared_array['ready_queue']
+   job_priority    = shared_array['job_priority']
+   n_queue         = int( ready_queue[0] ) - 1
+   assert n_queue >= 0
+   ready_queue[0]  = n_queue
+   #
+   # job_id, last
+   job_id  = int( ready_queue[1] )
+   last    = ready_queue[n_queue + 1]
+   #
+   # sift down, heap element k is stored at ready_queue[k+1]
+   k = 0
+   while True :
+      child = 2 * k + 1
+      if child >= n_queue :
+         break
+      if child + 1 < n_queue :
+         right = ready_queue[child + 2]
+         if ready_queue_before(job_priority, right, ready_queue[child + 1]) :
+            child += 1
+      if not ready_queue_before(job_priority, ready_queue[child + 1], last) :
+         break
+      ready_queue[k + 1] = ready_queue[child + 1]
+      k = child
+   if n_queue > 0 :
+      ready_queue[k + 1] = last
+   return job_id
+# ----------------------------------------------------------------------------
+# set_job_status(shared_array, job_id, job_status)
+# Set the status for one job and keep job_count, ready_queue, and the
+# memory in use up to date. The lock must be acquired.
+def set_job_status(shared_array, job_id, job_status) :
+   shared_job_status = shared_array['job_status']
+   shared_job_count  = shared_array['job_count']
+   shared_memory     = shared_array['memory']
+   #
+   # shared_job_count
+   shared_job_count[ shared_job_status[job_id] ] -= 1
+   shared_job_count[ job_status ]                += 1
+   #
+   # shared_memory
+   if shared_job_status[job_id] == job_status_run :
+      shared_memory[1] -= shared_array['job_memory'][job_id]
+   if job_status == job_status_run :
+      shared_memory[1] += shared_array['job_memory'][job_id]
+   #
+   # shared_job_status
+   shared_job_status[job_id] = job_status
+   #
+   # ready_queue
+   if job_status == job_status_ready :
+      push_ready_queue(shared_array, job_id)
+# ----------------------------------------------------------------------------
+# job_id = start_ready_job(shared_array)
+# Remove the next ready job from the ready queue and set its status to run.
+# A job whose status changed (to abort) after it was put in the ready queue
+# is skipped. If there is a memory budget and other jobs are running,
+# a job whose memory estimate does not fit in the rest of the budget is
+# skipped (and left in the ready queue). If there is no ready job that
+# can be started, None is returned. The lock must be acquired.
+def start_ready_job(shared_array) :
+   shared_job_status = shared_array['job_status']
+   shared_job_count  = shared_array['job_count']
+   shared_memory     = shared_array['memory']
+   shared_job_memory = shared_array['job_memory']
+   #
+   # memory_available
+   if shared_memory[0] == 0 or shared_job_count[job_status_run] == 0 :
+      memory_available = None
+   else :
+      memory_available = shared_memory[0] - shared_memory[1]
+   #
+   # job_id, skip_list
+   job_id    = None
+   skip_list = list()
+   while job_id is None and shared_array['ready_queue'][0] > 0 :
+      job_id = pop_ready_queue(shared_array)
+      if shared_job_status[job_id] != job_status_ready :
+         job_id = None
+      elif memory_available is not None :
+         if memory_available < shared_job_memory[job_id] :
+            skip_list.append(job_id)
+            job_id = None
+   #
+   # ready_queue
+   for skip_job_id in skip_list :
+      push_ready_queue(shared_array, skip_job_id)
+   #
+   if job_id is not None :
+      set_job_status(shared_array, job_id, job_status_run)
+   return job_id
+# ----------------------------------------------------------------------------
+# set_journal_status(
+#  job_journal_database, job_name, job_status, remove_name_list
+# )
+# Remove the rows for the names in remove_name_list and then record the
+# status for one job in the job journal.
+# If called by more than one process, the lock must be acquired.
+def set_journal_status(
+   job_journal_database, job_name, job_status, remove_name_list = None
+) :
+   job_journal = at_cascade.job_journal_class(job_journal_database)
+   try :
+      if remove_name_list is not None :
+         job_journal.remove(remove_name_list)
+      job_journal.set_status(job_name, job_status)
+   finally :
+      job_journal.close()
+# ----------------------------------------------------------------------------
 def try_one_job(
    job_table,
    this_job_id,
@@ -185,7 +446,7 @@ def try_one_job(
    fit_type_list,
    lock,
    event,
-   shared_job_status,
+   shared_array,
 )  :
    assert type(job_table) == list
    assert type(this_job_id) == int
@@ -196,6 +457,10 @@ def try_one_job(
    assert type(max_number_cpu) == int
    assert type(master_process) == bool
    assert type(fit_type_list) == list
+   assert type(shared_array) == dict
+   #
+   # shared_job_status
+   shared_job_status = shared_array['job_status']
    #
    # database_dir
    row = job_table[this_job_id]
@@ -211,16 +476,68 @@ def try_one_job(
    # job_name
    job_name = job_table[this_job_id]['job_name']
    #
+   # job_history_database
+   option_all_dict      = get_option_all_dict(all_node_database)
+   job_history_database = None
+   if 'job_history_database' in option_all_dict :
+      job_history_database = option_all_dict['job_history_database']
+   #
    # trace_file_obj
    trace_file_obj = None
    if max_number_cpu > 1 :
       trace_file_name = f'{result_database_dir}/trace.out'
       trace_file_obj  = open(trace_file_name, 'w')
    #
+   # descendant_list
+   # the descendants of this job are the next jobs in pre-order
+   start_preorder_id = job_table[this_job_id]['preorder_id'] + 1
+   end_preorder_id   = job_table[this_job_id]['end_preorder_id']
+   descendant_list   = list()
+   for preorder_id in range(start_preorder_id, end_preorder_id) :
+      job_id = job_table[preorder_id]['preorder_job_id']
+      descendant_list.append( job_id )
+   #
+   # job_journal_database
+   # Running this job re-creates the input databases for its child jobs,
+   # so the previous journal status for its descendants is no longer valid.
+   result_dir           = option_all_dict['result_dir']
+   job_journal_database = f'{result_dir}/job_journal.db'
+   descendant_name_list = list()
+   for job_id in descendant_list :
+      descendant_name_list.append( job_table[job_id]['job_name'] )
+   #
+   # journal_ok
+   # If the journal cannot be written, this job is not run and is treated
+   # as an error so that its stale descendants are not used by a restart.
+   journal_ok = True
+   lock.acquire()
+   try :
+      set_journal_status(
+         job_journal_database, job_name, 'run', descendant_name_list
+      )
+   except Exception as e :
+      if not catch_exceptions_and_continue :
+         raise
+      journal_ok = False
+      print( f'\njob_journal {job_name} message:\n' + str(e) )
+   finally :
+      lock.release()
+   #
+   # start_seconds
+   start_seconds = time.time()
+   #
+   # job_usage
+   # measure the memory used by this job when recording its history
+   job_usage = None
+   if job_history_database is not None :
+      job_usage = dict()
+   #
    # job_done, fit_type_index, fit_type
    job_done       = False
    fit_type_index = 0
-   while (not job_done) and ( fit_type_index < len(fit_type_list) ) :
+   fit_type       = fit_type_list[0]
+   while journal_ok and (not job_done) and \
+         ( fit_type_index < len(fit_type_list) ) :
       fit_type        = fit_type_list[fit_type_index]
       fit_type_index += 1
       #
@@ -241,6 +558,7 @@ def try_one_job(
             fit_type          = fit_type,
             first_fit         = fit_type_index == 1,
             trace_file_obj    = trace_file_obj,
+            job_usage         = job_usage,
          )
          #
          # job_done
@@ -256,6 +574,7 @@ def try_one_job(
                fit_type          = fit_type,
                first_fit         = fit_type_index == 1,
                trace_file_obj    = trace_file_obj,
+               job_usage         = job_usage,
             )
             #
             # job_done
@@ -264,6 +583,56 @@ def try_one_job(
             job_done = False
             #
             print( f'\nfit {fit_type:<5} {job_name} message:\n' + str(e) )
+            #
+            # record a timeout in the log table for this job
+            # (an error doing so is printed and the next fit_type is tried)
+            if isinstance(e, TimeoutError) :
+               try :
+                  connection = dismod_at.create_connection(
+                     f'{result_database_dir}/dismod.db',
+                     new = False, readonly = False
+                  )
+                  try :
+                     message = f'timeout: fit {fit_type}'
+                     at_cascade.add_log_entry(connection, message)
+                  finally :
+                     connection.close()
+               except Exception as log_error :
+                  print(
+                     f'\ntimeout log {job_name} message:\n' + str(log_error)
+                  )
+   #
+   # job_history
+   # The lock serializes writes to the job history database.
+   # The fit node database is read before acquiring the lock.
+   # An error writing the history is printed and does not stop the cascade.
+   if job_history_database is not None :
+      wall_seconds      = time.time() - start_seconds
+      fit_node_database = f'{result_database_dir}/dismod.db'
+      try :
+         count = at_cascade.job_history_class.fit_count(fit_node_database)
+      except Exception as e :
+         count = { 'data_subset' : 0, 'var' : 0 }
+         print( f'\njob_history {job_name} message:\n' + str(e) )
+      lock.acquire()
+      try :
+         job_history = at_cascade.job_history_class(job_history_database)
+         try :
+            job_history.add_row(
+               job_name          = job_name,
+               fit_type          = fit_type,
+               job_done          = job_done,
+               wall_seconds      = wall_seconds,
+               fit_node_database = fit_node_database,
+               max_rss_mb        = job_usage.get('max_rss_mb'),
+               count             = count,
+            )
+         finally :
+            job_history.close()
+      except Exception as e :
+         print( f'\njob_history {job_name} message:\n' + str(e) )
+      finally :
+         lock.release()
    #
    if job_done :
       #
@@ -272,7 +641,7 @@ def try_one_job(
       #
       # shared_job_status
       assert shared_job_status[this_job_id] == job_status_run
-      shared_job_status[this_job_id] = job_status_done
+      set_job_status(shared_array, this_job_id, job_status_done)
       #
       # shared_job_status[child_job_id] = job_status_ready
       start_child_job_id    = job_table[this_job_id ]['start_child_job_id']
@@ -280,7 +649,14 @@ def try_one_job(
       child_range = range(start_child_job_id, end_child_job_id)
       for child_job_id in child_range :
          assert shared_job_status[child_job_id] == job_status_wait
-         shared_job_status[child_job_id] = job_status_ready
+         set_job_status(shared_array, child_job_id, job_status_ready)
+      #
+      # job_journal_database
+      # a job that is not recorded as done is run again by a restart
+      try :
+         set_journal_status(job_journal_database, job_name, 'done')
+      except Exception as e :
+         print( f'\njob_journal {job_name} message:\n' + str(e) )
       #
       # release
       # shared memory has changed
@@ -290,15 +666,6 @@ def try_one_job(
    else :
       # if job not ok
       #
-      # descendant_set
-      descendant_set = { this_job_id }
-      n_job          = len(job_table)
-      for job_id in range(this_job_id + 1, n_job) :
-         parent_job_id = job_table[job_id]['parent_job_id']
-         if parent_job_id in descendant_set :
-            descendant_set.add( job_id )
-      descendant_set.remove( this_job_id )
-      #
       # lock
       lock.acquire()
       #
@@ -307,15 +674,21 @@ def try_one_job(
          msg  = 'try_one_job: except: shared_job_status[this_job_id] = '
          msg += job_status_name[ shared_job_status[this_job_id] ]
          print(msg)
-      shared_job_status[this_job_id] = job_status_error
+      set_job_status(shared_array, this_job_id, job_status_error)
       #
-      # shared_job_status[descendant_set]
-      for job_id in descendant_set :
+      # shared_job_status[descendant_list]
+      for job_id in descendant_list :
          if shared_job_status[job_id] != job_status_wait :
             msg  = 'try_one_job: except: shared_job_status[job_id] = '
             msg += job_status_name[ shared_job_status[job_id] ]
             print(msg)
-         shared_job_status[job_id] = job_status_abort
+         set_job_status(shared_array, job_id, job_status_abort)
+      #
+      # job_journal_database
+      try :
+         set_journal_status(job_journal_database, job_name, 'error')
+      except Exception as e :
+         print( f'\njob_journal {job_name} message:\n' + str(e) )
       #
       # release
       # shared memory has changed
@@ -343,11 +716,9 @@ def try_one_job(
       #
       # status_count
       lock.acquire()
-      n_status      = len( job_status_name )
       status_count  = dict()
-      for job_status_i in range(n_status) :
-         name               = job_status_name[job_status_i]
-         status_count[name] =  sum( shared_job_status == job_status_i )
+      for (job_status_i, name) in enumerate( job_status_name ) :
+         status_count[name] = int( shared_array['job_count'][job_status_i] )
       lock.release()
       #
       print( f'       {status_count}' )
@@ -379,36 +750,16 @@ def run_parallel_job(
    assert type(max_number_cpu)    == int
    assert type(master_process)    == bool
    assert type(fit_type_list)     == list
-   # ----------------------------------------------------------------------
-   # shared_number_cpu_inuse
-   tmp  = numpy.empty(1, dtype = int )
-   name = shared_memory_prefix_plus + '_number_cpu_inuse'
-   shm_number_cpu_inuse = shared_memory.SharedMemory(
-      create = False, name = name
-   )
-   shared_number_cpu_inuse = numpy.ndarray(
-      tmp.shape, dtype = tmp.dtype, buffer = shm_number_cpu_inuse.buf
-   )
-   # ----------------------------------------------------------------------
-   # shared_job_status
-   tmp  = numpy.empty(len(job_table), dtype = int )
-   name = shared_memory_prefix_plus + '_job_status'
-   shm_job_status = shared_memory.SharedMemory(
-      create = False, name = name
-   )
-   shared_job_status = numpy.ndarray(
-      tmp.shape, dtype = tmp.dtype, buffer = shm_job_status.buf
+   #
+   # shm_list, shared_array
+   create = False
+   shm_list, shared_array = get_shared_array(
+      shared_memory_prefix_plus, len(job_table), create
    )
-   # ----------------------------------------------------------------------
    #
-   # shm_list
-   shm_list = [
-         shm_number_cpu_inuse,
-         shm_job_status,
-   ]
-   # job_id_array
-   # job_id_array
-   job_id_array = numpy.array( range(len(job_table)), dtype = int )
+   # shared_number_cpu_inuse, shared_job_count
+   shared_number_cpu_inuse = shared_array['number_cpu_inuse']
+   shared_job_count        = shared_array['job_count']
    #
    if not skip_this_job :
       #
@@ -426,24 +777,31 @@ def run_parallel_job(
          fit_type_list,
          lock,
          event,
-         shared_job_status,
+         shared_array,
       )
    #
    while True :
       # lock
       lock.acquire()
       #
-      # job_id_ready
-      job_id_ready = job_id_array[ shared_job_status == job_status_ready ]
+      # n_cpu_available
+      n_cpu_available  = max_number_cpu - shared_number_cpu_inuse[0]
       #
-      # job_id_run
-      job_id_run  = job_id_array[ shared_job_status == job_status_run ]
+      # n_job_run
+      n_job_run = int( shared_job_count[job_status_run] )
       #
-      # n_job_ready
-      n_job_ready = job_id_ready.size
+      # job_id_list
+      # jobs for this process and the processes it spawns.
+      # The corresponding job status is set to job_status_run.
+      job_id_list = list()
+      while len(job_id_list) < n_cpu_available + 1 :
+         job_id = start_ready_job(shared_array)
+         if job_id is None :
+            break
+         job_id_list.append( job_id )
       #
-      if n_job_ready == 0 :
-         if job_id_run.size == 0 :
+      if len(job_id_list) == 0 :
+         if n_job_run == 0 :
             #
             # no jobs running or ready
             if master_process and shared_number_cpu_inuse[0] == 1:
@@ -453,6 +811,8 @@ def run_parallel_job(
                # should not need this release
                lock.release()
                #
+               for shm in shm_list :
+                  shm.close()
                return
             else :
                # return this processor
@@ -470,6 +830,7 @@ def run_parallel_job(
          else :
             #
             # jobs are running but none are ready
+            # (or none fit in the memory budget)
             if master_process :
                #
                # wait for another process to shared memory,
@@ -491,19 +852,11 @@ def run_parallel_job(
       else :
          #
          # n_cpu_spawn
-         n_cpu_available  = max_number_cpu - shared_number_cpu_inuse[0]
-         n_cpu_spawn      = min(n_cpu_available, n_job_ready - 1)
+         n_cpu_spawn = len(job_id_list) - 1
          #
          # shared_numper_cpu_inuse
          shared_number_cpu_inuse[0] += n_cpu_spawn
          #
-         # shared_job_status
-         for i in range( n_cpu_spawn + 1 ) :
-            job_id = job_id_ready[i]
-            #
-            assert shared_job_status[job_id] == job_status_ready
-            shared_job_status[job_id] = job_status_run
-         #
          # release
          # shared memory has changed
          event.set()
@@ -519,7 +872,7 @@ def run_parallel_job(
          for i in range(n_cpu_spawn) :
             #
             # job_id
-            job_id = int( job_id_ready[i] )
+            job_id = job_id_list[i]
             #
             # p
             args = (
@@ -543,7 +896,7 @@ def run_parallel_job(
             p.start()
          #
          # job_id
-         job_id = int( job_id_ready[n_cpu_spawn] )
+         job_id = job_id_list[n_cpu_spawn]
          #
          # try_one_job
          # assumes lock is not acquired during this operation
@@ -559,9 +912,162 @@ def run_parallel_job(
             fit_type_list,
             lock,
             event,
-            shared_job_status,
+            shared_array,
          )
 # ----------------------------------------------------------------------------
+def worker_pool_process(
+   shared_memory_prefix_plus,
+   job_table,
+   all_node_database,
+   node_table,
+   fit_integrand,
+   max_number_cpu,
+   fit_type_list,
+   lock,
+   event,
+   job_queue,
+) :
+   assert type(shared_memory_prefix_plus)  == str
+   assert type(job_table)         == list
+   assert type(all_node_database) == str
+   assert type(node_table)        == list
+   assert type(fit_integrand)     == set
+   assert type(max_number_cpu)    == int
+   assert type(fit_type_list)     == list
+   #
+   # shm_list, shared_array
+   # This worker attaches to the shared memory once and keeps it until
+   # the master process tells it that there are no more jobs.
+   create = False
+   shm_list, shared_array = get_shared_array(
+      shared_memory_prefix_plus, len(job_table), create
+   )
+   #
+   # skip_this_job, master_process
+   skip_this_job  = False
+   master_process = False
+   #
+   while True :
+      #
+      # job_id
+      # None is the signal that there are no more jobs
+      job_id = job_queue.get()
+      if job_id is None :
+         for shm in shm_list :
+            shm.close()
+         return
+      #
+      # try_one_job
+      # assumes lock is not acquired during this operation
+      try_one_job(
+         job_table,
+         job_id,
+         all_node_database,
+         node_table,
+         fit_integrand,
+         skip_this_job,
+         max_number_cpu,
+         master_process,
+         fit_type_list,
+         lock,
+         event,
+         shared_array,
+      )
+# ----------------------------------------------------------------------------
+def run_worker_pool(
+   shared_memory_prefix_plus,
+   job_table,
+   all_node_database,
+   node_table,
+   fit_integrand,
+   max_number_cpu,
+   fit_type_list,
+   lock,
+   event,
+   shared_array,
+) :
+   assert type(shared_memory_prefix_plus)  == str
+   assert type(job_table)         == list
+   assert type(all_node_database) == str
+   assert type(node_table)        == list
+   assert type(fit_integrand)     == set
+   assert type(max_number_cpu)    == int
+   assert type(fit_type_list)     == list
+   assert type(shared_array)      == dict
+   #
+   # shared_number_cpu_inuse, shared_job_count
+   shared_number_cpu_inuse = shared_array['number_cpu_inuse']
+   shared_job_count        = shared_array['job_count']
+   #
+   # job_queue
+   job_queue = multiprocessing.Queue()
+   #
+   # worker_list
+   # start the long lived worker processes once
+   worker_list = list()
+   for i in range(max_number_cpu) :
+      args = (
+         shared_memory_prefix_plus,
+         job_table,
+         all_node_database,
+         node_table,
+         fit_integrand,
+         max_number_cpu,
+         fit_type_list,
+         lock,
+         event,
+         job_queue,
+      )
+      target = worker_pool_process
+      p = multiprocessing.Process(target = target, args = args)
+      p.daemon = False
+      p.start()
+      worker_list.append(p)
+   #
+   while True :
+      # lock
+      lock.acquire()
+      #
+      # n_job_ready, n_job_run
+      n_job_ready = int( shared_job_count[job_status_ready] )
+      n_job_run   = int( shared_job_count[job_status_run] )
+      #
+      if n_job_ready == 0 and n_job_run == 0 :
+         lock.release()
+         break
+      #
+      # n_job_start
+      n_cpu_available  = max_number_cpu - n_job_run
+      n_job_start      = min(n_cpu_available, n_job_ready)
+      #
+      # shared_job_status, job_queue
+      # this stops early if none of the ready jobs fit in the memory budget
+      n_job_started = 0
+      while n_job_started < n_job_start :
+         job_id = start_ready_job(shared_array)
+         if job_id is None :
+            break
+         job_queue.put(job_id)
+         n_job_started += 1
+      #
+      # shared_number_cpu_inuse
+      # the master process plus the workers that are running a job
+      shared_number_cpu_inuse[0] = 1 + n_job_run + n_job_started
+      #
+      # wait for a worker to change the shared memory,
+      # then go back to the while True point above
+      event.clear()
+      lock.release()
+      event.wait()
+   #
+   # shared_number_cpu_inuse
+   shared_number_cpu_inuse[0] = 1
+   #
+   # tell the workers there are no more jobs
+   for p in worker_list :
+      job_queue.put(None)
+   for p in worker_list :
+      p.join()
 # BEGIN DEF
 # at_cascade.run_parallel
 def run_parallel(
@@ -573,6 +1079,8 @@ def run_parallel(
    skip_start_job    ,
    max_number_cpu    ,
    fit_type_list     ,
+   priority_list     = None,
+   resume            = False,
 # )
 ) :
    #
@@ -584,57 +1092,175 @@ def run_parallel(
    assert type(skip_start_job)    == bool
    assert type(max_number_cpu)    == int
    assert type(fit_type_list)     == list
+   assert priority_list is None or type(priority_list) == list
+   assert type(resume)            == bool
    # END DEF
    # ----------------------------------------------------------------------
+   # option_all_dict
+   option_all_dict = get_option_all_dict(all_node_database)
+   #
    # shared_memory_prefix
-   shared_memory_prefix = get_shared_memory_prefix(all_node_database)
+   shared_memory_prefix = ''
+   if 'shared_memory_prefix' in option_all_dict :
+      shared_memory_prefix = option_all_dict['shared_memory_prefix']
+   #
+   # worker_pool
+   worker_pool = False
+   if 'worker_pool' in option_all_dict :
+      worker_pool = option_all_dict['worker_pool']
+      assert worker_pool in [ 'true', 'false' ]
+      worker_pool = worker_pool == 'true'
+   worker_pool = worker_pool and max_number_cpu > 1
+   #
+   # priority_list
+   if priority_list is None :
+      priority_policy = 'job_id'
+      if 'priority_policy' in option_all_dict :
+         priority_policy = option_all_dict['priority_policy']
+      priority_list = at_cascade.job_priority(
+         job_table         = job_table,
+         all_node_database = all_node_database,
+         node_table        = node_table,
+         priority_policy   = priority_policy,
+      )
+   assert len(priority_list) == len(job_table)
+   #
+   # max_memory_mb, job_memory
+   max_memory_mb = 0
+   job_memory    = len(job_table) * [ 0 ]
+   if 'max_memory_mb' in option_all_dict :
+      max_memory_mb = int( option_all_dict['max_memory_mb'] )
+      if max_memory_mb <= 0 :
+         msg = 'option_all table: max_memory_mb is not greater than zero'
+         assert False, msg
+      static_cost = at_cascade.static_job_cost(
+         job_table         = job_table,
+         all_node_database = all_node_database,
+         node_table        = node_table,
+      )
+      # an empty history is used when job_history_database does not appear
+      job_history_database = ':memory:'
+      if 'job_history_database' in option_all_dict :
+         job_history_database = option_all_dict['job_history_database']
+      job_history = at_cascade.job_history_class(job_history_database)
+      job_memory  = job_history.job_memory(job_table, static_cost)
+      job_history.close()
+      job_memory  = [ math.ceil(memory) for memory in job_memory ]
+   #
+   # subtree_job_name_list
+   # names for the start job and its descendants
+   start_preorder_id     = job_table[start_job_id]['preorder_id']
+   end_preorder_id       = job_table[start_job_id]['end_preorder_id']
+   subtree_job_name_list = list()
+   for preorder_id in range(start_preorder_id, end_preorder_id) :
+      job_id = job_table[preorder_id]['preorder_job_id']
+      subtree_job_name_list.append( job_table[job_id]['job_name'] )
+   #
+   # journal_status, skip_start_job
+   result_dir           = option_all_dict['result_dir']
+   job_journal_database = f'{result_dir}/job_journal.db'
+   job_journal          = at_cascade.job_journal_class(job_journal_database)
+   start_job_name       = job_table[start_job_id]['job_name']
+   if resume :
+      journal_status = job_journal.get_status()
+      if start_job_name in journal_status :
+         if journal_status[start_job_name] == 'done' :
+            skip_start_job = True
+   else :
+      journal_status = dict()
+      job_journal.remove(subtree_job_name_list)
+   if skip_start_job :
+      job_journal.set_status(start_job_name, 'done')
+   job_journal.close()
+   #
    start_name           = job_table[start_job_id]['job_name']
    shared_memory_prefix_plus = shared_memory_prefix + f'_{start_name}'
    print(f'create: {shared_memory_prefix_plus} shared memory')
    # -------------------------------------------------------------------------
-   # shared_number_cpu_inuse
-   tmp  = numpy.empty(1, dtype = int )
-   name = shared_memory_prefix_plus + '_number_cpu_inuse'
-   shm_number_cpu_inuse = shared_memory.SharedMemory(
-      create = True, size = tmp.nbytes, name = name
-   )
-   shared_number_cpu_inuse = numpy.ndarray(
-      tmp.shape, dtype = tmp.dtype, buffer = shm_number_cpu_inuse.buf
+   # shm_list, shared_array
+   create = True
+   shm_list, shared_array = get_shared_array(
+      shared_memory_prefix_plus, len(job_table), create
    )
+   shared_number_cpu_inuse = shared_array['number_cpu_inuse']
+   shared_job_status       = shared_array['job_status']
    # -------------------------------------------------------------------------
-   # shared_job_status
-   tmp  = numpy.empty(len(job_table), dtype = int )
-   name = shared_memory_prefix_plus + '_job_status'
-   shm_job_status = shared_memory.SharedMemory(
-      create = True, size = tmp.nbytes, name = name
-   )
-   shared_job_status = numpy.ndarray(
-      tmp.shape, dtype = tmp.dtype, buffer = shm_job_status.buf
-   )
-   # -------------------------------------------------------------------------
-   #
-   # shm_list
-   shm_list = [
-         shm_number_cpu_inuse,
-         shm_job_status,
-   ]
    #
    # shared_number_cpu_inuse
    shared_number_cpu_inuse[0] = 1
    #
-   # shared_job_status
-   shared_job_status[:]  = job_status_wait
+   # shared_array['job_priority']
+   shared_array['job_priority'][:] = priority_list
+   #
+   # shared_array['memory'], shared_array['job_memory']
+   shared_array['memory'][0]     = max_memory_mb
+   shared_array['memory'][1]     = 0
+   shared_array['job_memory'][:] = job_memory
+   #
+   # shared_job_status, shared_job_count, shared_array['ready_queue']
+   shared_job_status[:]                       = job_status_wait
+   shared_array['job_count'][:]               = 0
+   shared_array['job_count'][job_status_wait] = len(job_table)
+   shared_array['ready_queue'][0]             = 0
    if skip_start_job :
-      shared_job_status[start_job_id] = job_status_done
+      set_job_status(shared_array, start_job_id, job_status_done)
       #
-      # shared_job_status[child_job_id] = job_status_ready
-      start_child_job_id    = job_table[start_job_id ]['start_child_job_id']
-      end_child_job_id      = job_table[start_job_id ]['end_child_job_id']
-      child_range = range(start_child_job_id, end_child_job_id)
-      for child_job_id in child_range :
-         shared_job_status[child_job_id] = job_status_ready
+      # shared_job_status
+      # The children of a job that is done are done (if they are done in the
+      # journal) or ready. rerun_dict[job_id] is the list of child jobs that
+      # were run before and must have their input database re-created.
+      done_list  = [ start_job_id ]
+      rerun_dict = dict()
+      while len(done_list) > 0 :
+         job_id             = done_list.pop()
+         start_child_job_id = job_table[job_id]['start_child_job_id']
+         end_child_job_id   = job_table[job_id]['end_child_job_id']
+         child_range = range(start_child_job_id, end_child_job_id)
+         for child_job_id in child_range :
+            child_job_name = job_table[child_job_id]['job_name']
+            child_status   = None
+            if child_job_name in journal_status :
+               child_status = journal_status[child_job_name]
+            if child_status == 'done' :
+               set_job_status(shared_array, child_job_id, job_status_done)
+               done_list.append( child_job_id )
+            else :
+               set_job_status(shared_array, child_job_id, job_status_ready)
+               if child_status is not None :
+                  if job_id not in rerun_dict :
+                     rerun_dict[job_id] = list()
+                  rerun_dict[job_id].append( child_job_id )
+      #
+      # re-create the input databases for jobs that are run again
+      for job_id in rerun_dict :
+         row = job_table[job_id]
+         fit_node_database = get_result_database_dir(
+            all_node_database,
+            node_table,
+            row['fit_node_id'],
+            row['split_reference_id'],
+         ) + '/dismod.db'
+         shift_databases = at_cascade.get_shift_databases(
+            all_node_database = all_node_database,
+            node_table        = node_table,
+            job_table         = job_table,
+            fit_job_id        = job_id,
+            shift_job_id_list = rerun_dict[job_id],
+         )
+         at_cascade.create_shift_db(
+            all_node_database,
+            fit_node_database,
+            shift_databases,
+         )
+      #
+      if resume :
+         n_done  = int( shared_array['job_count'][job_status_done] )
+         n_ready = int( shared_array['job_count'][job_status_ready] )
+         print( f'resume: {n_done} jobs done, {n_ready} jobs ready' )
+   elif worker_pool :
+      set_job_status(shared_array, start_job_id, job_status_ready)
    else :
-      shared_job_status[start_job_id] = job_status_run
+      set_job_status(shared_array, start_job_id, job_status_run)
    #
    # master_process
    master_process = True
@@ -647,21 +1273,71 @@ def run_parallel(
    event = multiprocessing.Event()
    event.set()
    #
-   # run_parallel_job
-   run_parallel_job(
-      shared_memory_prefix_plus,
-      job_table,
-      start_job_id,
-      all_node_database,
-      node_table,
-      fit_integrand,
-      skip_start_job,
-      max_number_cpu,
-      master_process,
-      fit_type_list,
-      lock,
-      event,
+   # constant table cache
+   # Read the constant tables that the jobs get using fit_or_root_class
+   # before creating the processes that run jobs.
+   # Processes created by forking inherit the cached tables. gc.freeze
+   # keeps the garbage collector from writing to (and hence copying) the
+   # memory pages that hold the cached tables.
+   # The data table is not included because it can be large and the jobs
+   # only use it when the all node database has no cov_reference table.
+   job_constant_table_list = [
+      'age', 'density', 'integrand', 'node', 'subgroup', 'time'
+   ]
+   root_node_database = option_all_dict['root_node_database']
+   connection         = dismod_at.create_connection(
+      root_node_database, new = False, readonly = True
    )
+   table_name_list = list()
+   for table_name in job_constant_table_list :
+      assert table_name in at_cascade.constant_table_list
+      if at_cascade.table_exists(connection, table_name) :
+         table_name_list.append( table_name )
+   connection.close()
+   fit_or_root = at_cascade.fit_or_root_class(
+      root_node_database, root_node_database
+   )
+   for table_name in table_name_list :
+      fit_or_root.get_table(table_name)
+   fit_or_root.close()
+   gc.freeze()
+   try :
+      if worker_pool :
+         #
+         # run_worker_pool
+         run_worker_pool(
+            shared_memory_prefix_plus,
+            job_table,
+            all_node_database,
+            node_table,
+            fit_integrand,
+            max_number_cpu,
+            fit_type_list,
+            lock,
+            event,
+            shared_array,
+         )
+      else :
+         #
+         # run_parallel_job
+         run_parallel_job(
+            shared_memory_prefix_plus,
+            job_table,
+            start_job_id,
+            all_node_database,
+            node_table,
+            fit_integrand,
+            skip_start_job,
+            max_number_cpu,
+            master_process,
+            fit_type_list,
+            lock,
+            event,
+         )
+   finally :
+      #
+      # gc.unfreeze
+      gc.unfreeze()
    #
    # shared_number_cpu_inuse
    if shared_number_cpu_inuse[0] != 1 :
@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin set_sqlite_profile}
+{xrst_spell
+   fsync
+   mib
+   mmap
+   pragma
+   pragmas
+   sqlite
+   wal
+}
+
+Set the SQLite Pragmas for a Connection
+#######################################
+
+Syntax
+******
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+}
+
+connection
+**********
+is an open connection to a database that this process may write.
+
+sqlite_profile
+**************
+is a ``str`` equal to one of the profile names below;
+see :ref:`option_all_table@sqlite_profile` .
+The corresponding pragmas are executed for this connection.
+
+default
+=======
+No pragmas are executed.
+
+fast
+====
+The database file is not synced to disk (fsync) after each transaction,
+temporary tables are kept in memory, the page cache is 64 MiB, and
+reads use a 256 MiB memory map.
+The journal mode is not changed, so this profile can be used when
+the :ref:`option_all_table@result_dir` is on a network file system.
+If the operating system (not just the program) crashes,
+a database that was being written may be corrupted
+and the corresponding job will have to be run again.
+
+wal
+===
+The database uses a write ahead log, which is synced at checkpoints
+instead of after every transaction, plus the other settings in fast.
+The write ahead log mode is stored in the database file, so it is also
+used by the dismod_at commands that run on the database.
+This profile requires shared memory between the processes that access
+a database and should not be used if *result_dir* is on a
+network file system.
+
+{xrst_end set_sqlite_profile}
+'''
+# ----------------------------------------------------------------------------
+import dismod_at
+#
+# sqlite_profile_dict
+sqlite_profile_dict = {
+   'default' : [ ],
+   'fast'    : [
+      'synchronous = OFF',
+      'temp_store = MEMORY',
+      'cache_size = -65536',
+      'mmap_size = 268435456',
+   ],
+   'wal'     : [
+      'journal_mode = WAL',
+      'synchronous = NORMAL',
+      'temp_store = MEMORY',
+      'cache_size = -65536',
+      'mmap_size = 268435456',
+   ],
+}
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.set_sqlite_profile
+def set_sqlite_profile(connection, sqlite_profile) :
+   assert type(sqlite_profile) == str
+   # END DEF
+   if sqlite_profile not in sqlite_profile_dict :
+      msg  = f'option_all table: sqlite_profile = {sqlite_profile} '
+      msg += 'is not one of the following: '
+      msg += ', '.join( sqlite_profile_dict.keys() )
+      assert False, msg
+   for pragma in sqlite_profile_dict[sqlite_profile] :
+      dismod_at.sql_command(connection, f'PRAGMA {pragma}')
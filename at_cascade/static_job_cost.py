@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin static_job_cost}
+
+Cost Estimate for Each Job That Does Not Require Running It
+###########################################################
+
+Prototype
+*********
+{xrst_literal ,
+   # BEGIN DEF, # END DEF
+   # BEGIN RETURN, # END RETURN
+}
+
+job_table
+*********
+This is a :ref:`create_job_table@job_table` containing the jobs
+that will be run.
+
+all_node_database
+*****************
+is the name of the :ref:`all_node_db-name` for this cascade.
+
+node_table
+**********
+is the list of dict corresponding to the node table
+for this cascade.
+
+static_cost
+***********
+The return value *static_cost* has length equal to the length of
+*job_table* and
+
+   *static_cost* [ *job_id* ] = *n_data* + *n_var*
+
+where *n_data* is the number of rows in the data table of the
+:ref:`glossary@root_node_database` that have the fit node for the
+job, or one of its descendants, as their node.
+If the root node database has a var table, *n_var* is the number of
+rows in that table.
+Otherwise, it is the number of rows in the smooth_grid table.
+
+{xrst_end static_job_cost}
+'''
+# ----------------------------------------------------------------------------
+import numpy
+import at_cascade
+import dismod_at
+# ----------------------------------------------------------------------------
+# BEGIN DEF
+# at_cascade.static_job_cost
+def static_job_cost(
+   job_table         ,
+   all_node_database ,
+   node_table        ,
+# )
+) :
+   assert type(job_table)         == list
+   assert type(all_node_database) == str
+   assert type(node_table)        == list
+   # END DEF
+   #
+   # root_node_database
+   all_node_info      = at_cascade.get_all_node_info(all_node_database)
+   option_all_dict    = all_node_info['option_all_dict']
+   root_node_database = option_all_dict.get('root_node_database')
+   assert root_node_database is not None
+   #
+   # n_data_node, n_var
+   connection  = dismod_at.create_connection(
+      root_node_database, new = False, readonly = True
+   )
+   n_data_node = len(node_table) * [ 0 ]
+   command     = 'SELECT node_id, COUNT(*) FROM data GROUP BY node_id'
+   for (node_id, count) in dismod_at.sql_command(connection, command) :
+      n_data_node[node_id] = count
+   if at_cascade.table_exists(connection, 'var') :
+      command = 'SELECT COUNT(*) FROM var'
+   else :
+      command = 'SELECT COUNT(*) FROM smooth_grid'
+   n_var = dismod_at.sql_command(connection, command)[0][0]
+   connection.close()
+   #
+   # n_data_subtree
+   # number of data rows for each node and its descendants
+   # (a sum over the pre-order interval for the subtree below each node)
+   node_tree      = at_cascade.get_node_tree(node_table)
+   n_data_node    = numpy.array(n_data_node, dtype = int)
+   cumulative     = numpy.zeros( len(node_table) + 1, dtype = int )
+   cumulative[1:] = numpy.cumsum( n_data_node[node_tree.pre_order] )
+   n_data_subtree = cumulative[node_tree.end] - cumulative[node_tree.start]
+   n_data_subtree = n_data_subtree.tolist()
+   #
+   # static_cost
+   static_cost = list()
+   for row in job_table :
+      static_cost.append( n_data_subtree[ row['fit_node_id'] ] + n_var )
+   #
+   # BEGIN RETURN
+   # ...
+   assert type(static_cost) == list
+   assert len(static_cost) == len(job_table)
+   return static_cost
+   # END RETURN
@@ -38,8 +38,50 @@ row_id
 This is the index of the row in the table where
 *row_name* occurs. An assert will occur if there is no such row.
 
+Index
+*****
+The first time a table is used, an index that maps
+each name to its row index is built for the table.
+An assert will occur, when the index is built,
+if a name (other than None) appears more than once in the table.
+The index is cached (by each process) using the identity of the table object,
+so repeated lookups in the same table take constant time.
+If the table has changed (a name is not found or the row for the name
+no longer has that name), the index is rebuilt.
+At most *max_index_cache* indices are cached
+(the least recently built index is removed first).
+{xrst_code py} '''
+max_index_cache = 100
+'''{xrst_code}
+
 {xrst_end table_name2id}
 '''
+#
+# index_cache
+# index_cache[ (id(table), tbl_name) ] = (table, name2id)
+# where name2id[row_name] is the row index for row_name in table.
+index_cache = dict()
+# -----------------------------------------------------------------------------
+# name2id = build_index(table, tbl_name)
+def build_index(table, tbl_name) :
+   col_name = tbl_name + '_name'
+   name2id  = dict()
+   for (index, row) in enumerate(table) :
+      row_name = row[col_name]
+      if row_name in name2id and row_name is not None :
+         msg  = f'table_name2id: "{row_name}" appears more than once '
+         msg += f'in column "{col_name}" of "{tbl_name}" table.'
+         assert False, msg
+      name2id[row_name] = index
+   #
+   # index_cache
+   key = ( id(table), tbl_name )
+   if key in index_cache :
+      del index_cache[key]
+   elif len(index_cache) >= max_index_cache :
+      del index_cache[ next( iter(index_cache) ) ]
+   index_cache[key] = (table, name2id)
+   return name2id
 # -----------------------------------------------------------------------------
 # BEGIN DEF
 # at_cascade.table_name2id
@@ -51,10 +93,23 @@ def table_name2id(
    assert type(tbl_name) == str
    # END DEF
    col_name = tbl_name + '_name'
-   row_id   = None
-   for (index, row) in enumerate(table) :
-      if row[col_name] == row_name :
-         row_id = index
+   #
+   # name2id
+   key     = ( id(table), tbl_name )
+   name2id = None
+   if key in index_cache and index_cache[key][0] is table :
+      name2id = index_cache[key][1]
+   #
+   # row_id
+   row_id = None
+   if name2id is not None and row_name in name2id :
+      row_id = name2id[row_name]
+      if row_id >= len(table) or table[row_id][col_name] != row_name :
+         row_id = None
+   if row_id == None :
+      name2id = build_index(table, tbl_name)
+      if row_name in name2id :
+         row_id = name2id[row_name]
    if row_id == None :
       msg  = f'table_name2id: "{row_name}" '
       msg += f'is not presnet in column "{col_name}" of "{tbl_name}" table.'
@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+{xrst_begin var_index_class}
+{xrst_spell
+   meas
+   mulstd
+}
+
+Index For Looking Up Rows in a Var Table
+########################################
+
+var_index_class
+***************
+{xrst_code py}
+var_index = var_index_class(var_table)
+{xrst_code}
+
+var_table
+=========
+This is a ``list`` of ``dict`` representation of the
+a dismod_at var table.
+An assert will occur if two rows of the var table have the same
+value for the columns that matter; see :ref:`get_var_id@Other Arguments` .
+The var table must not be modified while *var_index* is in use.
+
+var_id
+******
+{xrst_code py}
+var_id = var_index.var_id(var_type, smooth_id, age_id, time_id,
+   node_id, rate_id, mulcov_id, group_id, subgroup_id
+)
+{xrst_code}
+The arguments and return value are the same as for
+:ref:`get_var_id-name` (with *var_table* removed).
+All of the arguments, other than *var_type* , are optional
+and have default value None.
+This lookup takes constant time.
+
+var_id_array
+************
+{xrst_code py}
+var_id_array = var_index.var_id_array(var_type, **column)
+{xrst_code}
+This is a bulk form of the var_id function.
+The ``str`` *var_type* is the same as for var_id.
+Each keyword argument is one of the other arguments to var_id
+(for example, ``age_id = age_id_array`` ).
+Its value is either an ``int`` (the same for all the lookups)
+or a ``list`` or numpy array of ``int`` (one for each lookup).
+All of the list and array values must have the same length.
+The return value *var_id_array* is a numpy ``int`` array with the
+var_id for each lookup.
+
+{xrst_end var_index_class}
+'''
+import numpy
+#
+# key_column
+# key_column[var_type] is the list of var table columns, other than var_type,
+# that determine the row of the var table for a variable of this type.
+key_column = {
+   'mulstd_value'      : [ 'smooth_id' ],
+   'mulstd_dage'       : [ 'smooth_id' ],
+   'mulstd_dtime'      : [ 'smooth_id' ],
+   'rate'              : [ 'age_id', 'time_id', 'node_id', 'rate_id' ],
+   'mulcov_rate_value' :
+      [ 'age_id', 'time_id', 'mulcov_id', 'group_id', 'subgroup_id' ],
+   'mulcov_meas_value' :
+      [ 'age_id', 'time_id', 'mulcov_id', 'group_id', 'subgroup_id' ],
+   'mulcov_meas_noise' : [ 'age_id', 'time_id', 'mulcov_id', 'group_id' ],
+}
+# ----------------------------------------------------------------------------
+class var_index_class :
+   #
+   def __init__(self, var_table) :
+      assert type(var_table) == list
+      #
+      # self.key2var_id
+      # self.key2var_id[var_type][key] is the var_id for the row with
+      # this var_type and with key equal to the tuple of values in the
+      # columns key_column[var_type].
+      self.key2var_id = dict()
+      for var_type in key_column :
+         self.key2var_id[var_type] = dict()
+      for (var_id, row) in enumerate(var_table) :
+         var_type = row['var_type']
+         key      = tuple( row[name] for name in key_column[var_type] )
+         if key in self.key2var_id[var_type] :
+            msg  = 'var_index_class: Something is wrong with this var_table\n'
+            msg += f'var_id = {var_id} has the same {var_type} '
+            msg += f'{key_column[var_type]} = {key} as a previous row'
+            assert False, msg
+         self.key2var_id[var_type][key] = var_id
+   #
+   def var_id(
+      self               ,
+      var_type           ,
+      smooth_id    = None,
+      age_id       = None,
+      time_id      = None,
+      node_id      = None,
+      rate_id      = None,
+      mulcov_id    = None,
+      group_id     = None,
+      subgroup_id  = None,
+   ) :
+      assert type(var_type) == str
+      value = {
+         'smooth_id'   : smooth_id,
+         'age_id'      : age_id,
+         'time_id'     : time_id,
+         'node_id'     : node_id,
+         'rate_id'     : rate_id,
+         'mulcov_id'   : mulcov_id,
+         'group_id'    : group_id,
+         'subgroup_id' : subgroup_id,
+      }
+      key = tuple( value[name] for name in key_column[var_type] )
+      if key not in self.key2var_id[var_type] :
+         msg  = f'var_index_class: no {var_type} variable with '
+         msg += f'{key_column[var_type]} = {key}'
+         assert False, msg
+      return self.key2var_id[var_type][key]
+   #
+   def var_id_array(self, var_type, **column) :
+      assert type(var_type) == str
+      #
+      # n_lookup
+      n_lookup = None
+      for name in column :
+         assert name in key_column[var_type]
+         if type(column[name]) != int :
+            if n_lookup is None :
+               n_lookup = len( column[name] )
+            assert len( column[name] ) == n_lookup
+      if n_lookup is None :
+         n_lookup = 1
+      #
+      # value_list
+      # value_list[j][i] is the value for column key_column[var_type][j]
+      # and lookup i.
+      value_list = list()
+      for name in key_column[var_type] :
+         if name not in column :
+            value_list.append( n_lookup * [ None ] )
+         elif type(column[name]) == int :
+            value_list.append( n_lookup * [ column[name] ] )
+         else :
+            value_list.append( [ int(value) for value in column[name] ] )
+      #
+      # var_id_array
+      key2var_id   = self.key2var_id[var_type]
+      var_id_array = numpy.empty(n_lookup, dtype = int)
+      for (i, key) in enumerate( zip(*value_list) ) :
+         if key not in key2var_id :
+            msg  = f'var_index_class: no {var_type} variable with '
+            msg += f'{key_column[var_type]} = {key}'
+            assert False, msg
+         var_id_array[i] = key2var_id[key]
+      return var_id_array
@@ -0,0 +1,211 @@
+#! /usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+Bytes written per shift database by create_shift_db
+####################################################
+
+usage:
+   bin/benchmark/create_shift_db.py n_child n_var n_sample
+
+n_child:
+   number of shift databases created for one fit (default 50).
+n_var:
+   number of rows in the var table of the fit (default 2000).
+n_sample:
+   number of samples of the fit (default 100).
+
+This creates a simulated fit_node_database with the tables that
+create_shift_db sees after a fit: small input tables and large
+var, fit_var, sample, and c_shift predict tables.
+It then compares the bytes written to create the shift databases
+by the previous method (copy the fit_node_database and drop the predict
+tables) and the create_shift_db template method.
+Only the creation of the shift databases is timed; i.e.,
+replacing the prior tables in each shift database is the same for both
+methods and is not included.
+No fits are run.
+'''
+import sys
+import os
+import time
+import shutil
+import importlib
+import dismod_at
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+# cs
+# at_cascade.create_shift_db is the function, we need the module
+cs = importlib.import_module('at_cascade.create_shift_db')
+# ----------------------------------------------------------------------------
+# bytes_written()
+# total number of bytes this process has passed to write system calls
+# (None if /proc/self/io is not available)
+def bytes_written() :
+   if not os.path.isfile('/proc/self/io') :
+      return None
+   with open('/proc/self/io') as file_io :
+      for line in file_io :
+         if line.startswith('wchar:') :
+            return int( line.split()[1] )
+   return None
+# ----------------------------------------------------------------------------
+# write_fit_node_database(fit_node_database, n_var, n_sample)
+def write_fit_node_database(fit_node_database, n_var, n_sample) :
+   connection = dismod_at.create_connection(
+      fit_node_database, new = True, readonly = False
+   )
+   def create(tbl_name, col_name, col_type, row_list) :
+      dismod_at.create_table(
+         connection, tbl_name, col_name, col_type, row_list
+      )
+   #
+   # input tables
+   create('option', ['option_name', 'option_value'], ['text', 'text'],
+      [ ['parent_node_name', 'n0'], ['other_database', '../root_node.db'] ]
+   )
+   create('covariate', ['covariate_name', 'reference', 'max_difference'],
+      ['text', 'real', 'real'], [ ['sex', 0.0, 0.6], ['bmi', 20.0, None] ]
+   )
+   create('mulcov', ['mulcov_type', 'rate_id', 'covariate_id'],
+      ['text', 'integer', 'integer'], [ ['rate_value', 1, 1] ]
+   )
+   create('rate', ['rate_name', 'parent_smooth_id'], ['text', 'integer'],
+      [ ['pini', None], ['iota', 0], ['rho', None], ['chi', 0], ['omega', 0] ]
+   )
+   create('prior', ['prior_name', 'density_id', 'mean'],
+      ['text', 'integer', 'real'],
+      [ [f'prior_{i}', 0, 0.0] for i in range(n_var) ]
+   )
+   create('smooth', ['smooth_name', 'n_age', 'n_time'],
+      ['text', 'integer', 'integer'], [ ['smooth_0', 1, 1] ]
+   )
+   create('smooth_grid', ['smooth_id', 'age_id', 'time_id', 'value_prior_id'],
+      ['integer', 'integer', 'integer', 'integer'],
+      [ [0, i, 0, i] for i in range(n_var) ]
+   )
+   create('nslist', ['nslist_name'], ['text'], [] )
+   create('nslist_pair', ['nslist_id', 'node_id', 'smooth_id'],
+      ['integer', 'integer', 'integer'], []
+   )
+   create('log', ['message_type', 'table_name', 'row_id', 'message'],
+      ['text', 'text', 'integer', 'text'],
+      [ ['command', None, None, 'init'] ]
+   )
+   #
+   # output tables
+   create('var', ['var_type', 'smooth_id', 'age_id', 'time_id'],
+      ['text', 'integer', 'integer', 'integer'],
+      [ ['rate', 0, i, 0] for i in range(n_var) ]
+   )
+   create('fit_var', ['fit_var_value', 'residual_value', 'lagrange_value'],
+      ['real', 'real', 'real'], [ [0.1, 0.0, 0.0] for i in range(n_var) ]
+   )
+   create('sample', ['sample_index', 'var_id', 'var_value'],
+      ['integer', 'integer', 'real'],
+      [ [k, i, 0.1] for k in range(n_sample) for i in range(n_var) ]
+   )
+   create('c_shift_avgint', ['integrand_id', 'node_id', 'age_lower'],
+      ['integer', 'integer', 'real'], [ [0, 0, float(i)] for i in range(n_var) ]
+   )
+   create('c_shift_predict_fit_var', ['avgint_id', 'avg_integrand'],
+      ['integer', 'real'], [ [i, 0.1] for i in range(n_var) ]
+   )
+   create('c_shift_predict_sample',
+      ['sample_index', 'avgint_id', 'avg_integrand'],
+      ['integer', 'integer', 'real'],
+      [ [k, i, 0.1] for k in range(n_sample) for i in range(n_var) ]
+   )
+   connection.close()
+# ----------------------------------------------------------------------------
+# copy_method
+# the method used by create_shift_db before the template method
+def copy_method(fit_node_database, shift_database) :
+   shutil.copyfile(fit_node_database, shift_database)
+   connection = dismod_at.create_connection(
+      shift_database, new = False, readonly = False
+   )
+   for tbl_name in [
+      'c_shift_avgint', 'c_shift_predict_fit_var', 'c_shift_predict_sample'
+   ] :
+      dismod_at.sql_command(connection, f'DROP TABLE {tbl_name}')
+   connection.close()
+# ----------------------------------------------------------------------------
+# template_method
+def template_method(template, shift_database) :
+   connection = dismod_at.create_connection(
+      shift_database, new = True, readonly = False
+   )
+   template.backup(connection)
+   connection.close()
+# ----------------------------------------------------------------------------
+def main() :
+   n_child  = 50
+   n_var    = 2000
+   n_sample = 100
+   if len(sys.argv) > 1 :
+      n_child = int( sys.argv[1] )
+   if len(sys.argv) > 2 :
+      n_var = int( sys.argv[2] )
+   if len(sys.argv) > 3 :
+      n_sample = int( sys.argv[3] )
+   #
+   # work_dir
+   work_dir = 'build/benchmark'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # fit_node_database
+   fit_node_database = 'fit_node.db'
+   write_fit_node_database(fit_node_database, n_var, n_sample)
+   fit_size = os.path.getsize(fit_node_database)
+   #
+   # result
+   result = dict()
+   for method in [ 'copy', 'template' ] :
+      #
+      # written, seconds, size
+      written = bytes_written()
+      seconds = time.time()
+      if method == 'template' :
+         empty_table_set = {
+            'covariate', 'mulcov', 'option', 'rate',
+            'prior', 'smooth', 'smooth_grid', 'nslist', 'nslist_pair',
+         }
+         template = cs.create_template(fit_node_database, empty_table_set)
+      for child in range(n_child) :
+         shift_database = f'shift_{child}.db'
+         if method == 'copy' :
+            copy_method(fit_node_database, shift_database)
+         else :
+            template_method(template, shift_database)
+      if method == 'template' :
+         template.close()
+      seconds = time.time() - seconds
+      if written is not None :
+         written = bytes_written() - written
+      size = os.path.getsize(shift_database)
+      for child in range(n_child) :
+         os.remove( f'shift_{child}.db' )
+      result[method] = (written, seconds, size)
+   #
+   print( f'n_child = {n_child}, n_var = {n_var}, n_sample = {n_sample}' )
+   print( f'fit_node_database size = {fit_size} bytes' )
+   for method in result :
+      (written, seconds, size) = result[method]
+      line = f'{method:8s}: size per job = {size:10d} bytes, '
+      if written is not None :
+         line += f'written per job = {written // n_child:10d} bytes, '
+      line += f'seconds per job = {seconds / n_child:.4f}'
+      print(line)
+   print( 'create_shift_db.py: OK' )
+#
+main()
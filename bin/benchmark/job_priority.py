@@ -0,0 +1,159 @@
+#! /usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+Makespan for the run_parallel priority policies
+###############################################
+
+usage:
+   bin/benchmark/job_priority.py n_job max_number_cpu seed
+
+n_job:
+   number of jobs in the simulated job table (default 2000).
+max_number_cpu:
+   number of jobs that can be running at the same time (default 16).
+seed:
+   seed for the random number generator (default 123).
+
+This simulates running an unbalanced job tree with run_parallel's ready
+queue and reports the total run time (makespan) for the job_id and
+subtree priority policies. The cost for each job is its simulated run time.
+No fits are run.
+'''
+import sys
+import os
+import importlib
+import heapq
+import numpy
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+# rp, jp
+# at_cascade.run_parallel and at_cascade.job_priority are the functions,
+# we need the modules
+rp = importlib.import_module('at_cascade.run_parallel')
+jp = importlib.import_module('at_cascade.job_priority')
+# ----------------------------------------------------------------------------
+# job_table, job_cost
+# The job tree is unbalanced: the number of children for each job is random,
+# except for a chain of expensive jobs that starts at the last child of the
+# root. Each job in the chain has one chain child and some cheap children.
+def simulated_job_table(n_job, rng) :
+   job_table = [ { 'parent_job_id' : None } ]
+   job_cost  = [ 100.0 ]
+   in_chain  = [ False ]
+   job_id    = 0
+   while job_id < len(job_table) :
+      row = job_table[job_id]
+      row['start_child_job_id'] = len(job_table)
+      if job_id == 0 :
+         n_child = 10
+      elif in_chain[job_id] :
+         n_child = 5
+      else :
+         n_child = int( rng.choice( [0, 0, 1, 2, 3] ) )
+      n_new = min(n_child, n_job - len(job_table) )
+      for i in range(n_new) :
+         job_table.append( { 'parent_job_id' : job_id } )
+         job_cost.append( rng.uniform(1.0, 20.0) )
+         in_chain.append( False )
+      row['end_child_job_id'] = len(job_table)
+      #
+      # chain child
+      if n_new > 0 and (job_id == 0 or in_chain[job_id]) :
+         chain_job_id = row['end_child_job_id'] - 1
+         in_chain[chain_job_id] = True
+         job_cost[chain_job_id] = 100.0
+      job_id += 1
+   return job_table, job_cost
+# ----------------------------------------------------------------------------
+# makespan = simulate(job_table, job_cost, max_number_cpu, shared_array)
+def simulate(job_table, job_cost, max_number_cpu, shared_array) :
+   n_job = len(job_table)
+   shared_array['job_status'][:]   = rp.job_status_wait
+   shared_array['job_count'][:]    = 0
+   shared_array['job_count'][rp.job_status_wait] = n_job
+   shared_array['ready_queue'][0]  = 0
+   rp.set_job_status(shared_array, 0, rp.job_status_ready)
+   job_count = shared_array['job_count']
+   #
+   # running: heap of (finish_time, job_id)
+   running = list()
+   now     = 0.0
+   while job_count[rp.job_status_ready] + job_count[rp.job_status_run] > 0 :
+      n_start = min(
+         max_number_cpu - len(running), job_count[rp.job_status_ready]
+      )
+      for i in range(n_start) :
+         job_id = rp.start_ready_job(shared_array)
+         heapq.heappush(running, (now + job_cost[job_id], job_id) )
+      now, job_id = heapq.heappop(running)
+      rp.set_job_status(shared_array, job_id, rp.job_status_done)
+      row         = job_table[job_id]
+      child_range = range(row['start_child_job_id'], row['end_child_job_id'])
+      for child_id in child_range :
+         rp.set_job_status(shared_array, child_id, rp.job_status_ready)
+   return now
+# ----------------------------------------------------------------------------
+def main() :
+   n_job          = 2000
+   max_number_cpu = 16
+   seed           = 123
+   if len(sys.argv) > 1 :
+      n_job = int( sys.argv[1] )
+   if len(sys.argv) > 2 :
+      max_number_cpu = int( sys.argv[2] )
+   if len(sys.argv) > 3 :
+      seed = int( sys.argv[3] )
+   #
+   rng = numpy.random.default_rng(seed)
+   job_table, job_cost = simulated_job_table(n_job, rng)
+   n_job = len(job_table)
+   #
+   # priority
+   subtree_cost = jp.subtree_priority(job_table, job_cost)
+   priority = {
+      'job_id'  : n_job * [ 0 ],
+      'subtree' : [ int( cost ) for cost in subtree_cost ],
+   }
+   #
+   # shm_list, shared_array
+   create = True
+   shm_list, shared_array = rp.get_shared_array(
+      'benchmark_job_priority', n_job, create
+   )
+   try :
+      makespan = dict()
+      for policy in priority :
+         shared_array['job_priority'][:] = priority[policy]
+         makespan[policy] = simulate(
+            job_table, job_cost, max_number_cpu, shared_array
+         )
+   finally :
+      for shm in shm_list :
+         shm.close()
+         shm.unlink()
+   #
+   # critical_path
+   # largest total cost for a path from the root to a leaf
+   critical_path = list( job_cost )
+   for job_id in reversed( range(n_job) ) :
+      row         = job_table[job_id]
+      child_range = range(row['start_child_job_id'], row['end_child_job_id'])
+      max_child   = max( [0.0] + [ critical_path[k] for k in child_range ] )
+      critical_path[job_id] += max_child
+   #
+   print( f'n_job = {n_job}, cpu = {max_number_cpu}, seed = {seed}' )
+   print( f'total cost / cpu: {sum(job_cost) / max_number_cpu:12.1f}' )
+   print( f'critical path:    {critical_path[0]:12.1f}' )
+   for policy in makespan :
+      print( f'{policy:16}: {makespan[policy]:12.1f} makespan' )
+   print( 'job_priority.py: OK' )
+#
+main()
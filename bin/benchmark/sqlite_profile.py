@@ -0,0 +1,240 @@
+#! /usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ----------------------------------------------------------------------------
+'''
+Per job database I/O time for the sqlite_profile option
+#######################################################
+
+usage:
+   bin/benchmark/sqlite_profile.py work_dir n_job n_child
+
+work_dir:
+   directory where the databases are written (default build/benchmark).
+   Use a directory on the file system used for result_dir.
+n_job:
+   number of simulated jobs (default 20).
+n_child:
+   number of shift databases created by each job (default 10).
+
+Each simulated job does the database writes that at_cascade does in
+run_one_job after the dismod_at sample command:
+move the predict tables and the avgint table in the fit database
+(with the corresponding log entries) and write the shift databases
+for its children. No dismod_at commands are run and the time to create the
+simulated fit database is not included.
+
+before:
+   each statement is committed separately and the shift databases are
+   written in place (the method used before sqlite_profile).
+default, fast, wal:
+   the moves after the last dismod_at command are one transaction,
+   each shift database is built in memory and written with one backup,
+   and the corresponding sqlite_profile is used.
+'''
+import sys
+import os
+import time
+import shutil
+import threading
+import importlib
+import dismod_at
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+# cs
+# at_cascade.create_shift_db is the function, we need the module
+cs = importlib.import_module('at_cascade.create_shift_db')
+#
+# shift_table_name
+shift_table_name = [
+   'covariate', 'mulcov', 'option', 'rate', 'prior', 'smooth', 'smooth_grid'
+]
+# ----------------------------------------------------------------------------
+# create_predict_table(connection, n_row)
+# simulate the predict table created by a dismod_at predict command
+def create_predict_table(connection, n_row) :
+   dismod_at.create_table( connection,
+      'predict',
+      [ 'sample_index', 'avgint_id', 'avg_integrand' ],
+      [ 'integer', 'integer', 'real' ],
+      [ [ None, i, 0.1 ] for i in range(n_row) ],
+   )
+# ----------------------------------------------------------------------------
+# write_fit_node_database(fit_node_database, n_grid)
+def write_fit_node_database(fit_node_database, n_grid) :
+   connection = dismod_at.create_connection(
+      fit_node_database, new = True, readonly = False
+   )
+   def create(tbl_name, col_name, col_type, row_list) :
+      dismod_at.create_table(
+         connection, tbl_name, col_name, col_type, row_list
+      )
+   create('option', ['option_name', 'option_value'], ['text', 'text'],
+      [ ['parent_node_name', 'n0'], ['other_database', '../root_node.db'] ]
+   )
+   create('covariate', ['covariate_name', 'reference', 'max_difference'],
+      ['text', 'real', 'real'], [ ['sex', 0.0, 0.6], ['bmi', 20.0, None] ]
+   )
+   create('mulcov', ['mulcov_type', 'rate_id', 'covariate_id'],
+      ['text', 'integer', 'integer'], [ ['rate_value', 1, 1] ]
+   )
+   create('rate', ['rate_name', 'parent_smooth_id'], ['text', 'integer'],
+      [ ['pini', None], ['iota', 0], ['rho', None], ['chi', 0], ['omega', 0] ]
+   )
+   create('prior', ['prior_name', 'density_id', 'mean'],
+      ['text', 'integer', 'real'],
+      [ [f'prior_{i}', 0, 0.0] for i in range(n_grid) ]
+   )
+   create('smooth', ['smooth_name', 'n_age', 'n_time'],
+      ['text', 'integer', 'integer'], [ ['smooth_0', n_grid, 1] ]
+   )
+   create('smooth_grid', ['smooth_id', 'age_id', 'time_id', 'value_prior_id'],
+      ['integer', 'integer', 'integer', 'integer'],
+      [ [0, i, 0, i] for i in range(n_grid) ]
+   )
+   create('covariate_x', ['x'], ['real'], [ [0.0] ] )
+   create('avgint', ['integrand_id', 'node_id', 'age_lower'],
+      ['integer', 'integer', 'real'],
+      [ [0, 0, float(i)] for i in range(n_grid) ]
+   )
+   create('log',
+      ['message_type', 'table_name', 'row_id', 'unix_time', 'message'],
+      ['text', 'text', 'integer', 'integer', 'text'],
+      [ ['command', None, None, 0, 'init'] for i in range(100) ]
+   )
+   create_predict_table(connection, n_grid)
+   connection.close()
+# ----------------------------------------------------------------------------
+# before_move_table
+# move_table with each statement committed separately
+def before_move_table(connection, src_name, dst_name) :
+   dismod_at.sql_command(connection, f'DROP TABLE IF EXISTS {dst_name}')
+   command  = f'ALTER TABLE {src_name} RENAME COLUMN '
+   command += f'{src_name}_id TO {dst_name}_id'
+   dismod_at.sql_command(connection, command)
+   command  = f'ALTER TABLE {src_name} RENAME TO {dst_name}'
+   dismod_at.sql_command(connection, command)
+   dismod_at.sql_command(connection,
+      'CREATE TABLE IF NOT EXISTS log(log_id integer primary key, '
+      'message_type text, table_name text, row_id integer, '
+      'unix_time integer, message text)'
+   )
+   n_log   = len( dismod_at.get_table_dict(connection, 'log') )
+   command  = 'INSERT INTO log VALUES('
+   command += f"{n_log}, 'at_cascade', null, null, {int(time.time())}, "
+   command += f"'move table {src_name} to {dst_name}')"
+   dismod_at.sql_command(connection, command)
+# ----------------------------------------------------------------------------
+# before_write_shift_db
+# write the shift database in place
+def before_write_shift_db(template, shift_database, shift_table) :
+   connection = dismod_at.create_connection(shift_database, new = True)
+   template.backup(connection)
+   for name in shift_table :
+      dismod_at.replace_table(connection, name, shift_table[name])
+   at_cascade.empty_avgint_table(connection)
+   connection.close()
+# ----------------------------------------------------------------------------
+# run_job(method, fit_node_database, n_grid, n_child)
+# returns the seconds for the simulated job (excluding the simulated
+# dismod_at predict command).
+def run_job(method, fit_node_database, n_grid, n_child) :
+   #
+   # connection
+   connection = dismod_at.create_connection(
+      fit_node_database, new = False, readonly = False
+   )
+   if method != 'before' :
+      at_cascade.set_sqlite_profile(connection, method)
+   #
+   # shift_table
+   shift_table = dict()
+   for name in shift_table_name :
+      shift_table[name] = dismod_at.get_table_dict(connection, name)
+   #
+   # c_shift_predict_fit_var
+   seconds = time.time()
+   if method == 'before' :
+      before_move_table(connection, 'predict', 'c_shift_predict_fit_var')
+   else :
+      at_cascade.move_table(connection, 'predict', 'c_shift_predict_fit_var')
+   seconds = time.time() - seconds
+   #
+   # simulate dismod_at predict sample
+   create_predict_table(connection, n_grid)
+   #
+   # c_shift_predict_sample, c_shift_avgint
+   start = time.time()
+   if method == 'before' :
+      before_move_table(connection, 'predict', 'c_shift_predict_sample')
+      before_move_table(connection, 'avgint', 'c_shift_avgint')
+   else :
+      connection.execute('BEGIN')
+      at_cascade.move_table(connection, 'predict', 'c_shift_predict_sample')
+      at_cascade.move_table(connection, 'avgint', 'c_shift_avgint')
+      connection.commit()
+   #
+   # shift databases
+   empty_table_set = set( shift_table_name )
+   template        = cs.create_template(fit_node_database, empty_table_set)
+   template_lock   = threading.Lock()
+   for child in range(n_child) :
+      shift_database = f'shift_{child}.db'
+      if method == 'before' :
+         before_write_shift_db(template, shift_database, shift_table)
+      else :
+         cs.write_shift_db(
+            template, template_lock, shift_database, shift_table, method
+         )
+   template.close()
+   seconds += time.time() - start
+   #
+   connection.close()
+   return seconds
+# ----------------------------------------------------------------------------
+def main() :
+   work_dir = 'build/benchmark'
+   n_job    = 20
+   n_child  = 10
+   n_grid   = 200
+   if len(sys.argv) > 1 :
+      work_dir = sys.argv[1]
+   if len(sys.argv) > 2 :
+      n_job = int( sys.argv[2] )
+   if len(sys.argv) > 3 :
+      n_child = int( sys.argv[3] )
+   #
+   # work_dir
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # original_database
+   original_database = 'original.db'
+   write_fit_node_database(original_database, n_grid)
+   #
+   # result
+   result = dict()
+   for method in [ 'before', 'default', 'fast', 'wal' ] :
+      total = 0.0
+      for job in range(n_job) :
+         fit_node_database = f'fit_{job}.db'
+         shutil.copyfile(original_database, fit_node_database)
+         total += run_job(method, fit_node_database, n_grid, n_child)
+      result[method] = total / n_job
+      for file_name in os.listdir('.') :
+         if file_name.startswith('fit_') or file_name.startswith('shift_') :
+            os.remove(file_name)
+   #
+   print( f'work_dir = {work_dir}, n_job = {n_job}, n_child = {n_child}' )
+   for method in result :
+      print( f'{method:8s}: seconds per job = {result[method]:.4f}' )
+   print( 'sqlite_profile.py: OK' )
+#
+main()
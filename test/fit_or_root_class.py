@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+import dismod_at
+#
+# write_database
+# age is a constant table and var is not
+def write_database(database, age_list) :
+   connection = dismod_at.create_connection(
+      database, new = True, readonly = False
+   )
+   col_name = [ 'age' ]
+   col_type = [ 'real' ]
+   row_list = [ [ age ] for age in age_list ]
+   dismod_at.create_table(connection, 'age', col_name, col_type, row_list)
+   col_name = [ 'var_type' ]
+   col_type = [ 'text' ]
+   row_list = [ [ 'rate' ] ]
+   dismod_at.create_table(connection, 'var', col_name, col_type, row_list)
+   connection.close()
+#
+def main() :
+   #
+   # wrok_dir
+   work_dir = 'build/test'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # fit_node_database, root_node_database
+   fit_node_database  = 'fit_node.db'
+   root_node_database = 'root_node.db'
+   write_database(fit_node_database,  [ 0.0 ] )
+   write_database(root_node_database, [ 0.0, 100.0 ] )
+   #
+   # age_table, var_table
+   fit_or_root = at_cascade.fit_or_root_class(
+      fit_node_database, root_node_database
+   )
+   age_table = fit_or_root.get_table('age')
+   var_table = fit_or_root.get_table('var')
+   fit_or_root.close()
+   assert [ row['age'] for row in age_table ] == [ 0.0, 100.0 ]
+   #
+   # the constant tables are cached and the other tables are not
+   fit_or_root = at_cascade.fit_or_root_class(
+      fit_node_database, root_node_database
+   )
+   assert fit_or_root.get_table('age') is age_table
+   assert fit_or_root.get_table('var') is not var_table
+   fit_or_root.close()
+   #
+   # a new version of the root node database is read again
+   write_database(root_node_database, [ 0.0, 50.0, 100.0 ] )
+   fit_or_root = at_cascade.fit_or_root_class(
+      fit_node_database, root_node_database
+   )
+   age_table = fit_or_root.get_table('age')
+   fit_or_root.close()
+   assert [ row['age'] for row in age_table ] == [ 0.0, 50.0, 100.0 ]
+   return
+#
+main()
+print('fit_or_root_class: OK')
+sys.exit(0)
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+import dismod_at
+#
+# write_all_node_database
+# only the tables used by get_all_node_info are included
+def write_all_node_database(all_node_database, option_all) :
+   connection = dismod_at.create_connection(
+      all_node_database, new = True, readonly = False
+   )
+   col_name = [ 'option_name', 'option_value' ]
+   col_type = [ 'text', 'text' ]
+   row_list = [ [ name, option_all[name] ] for name in option_all ]
+   dismod_at.create_table(
+      connection, 'option_all', col_name, col_type, row_list
+   )
+   col_name = [ 'split_reference_name', 'split_reference_value' ]
+   col_type = [ 'text', 'real' ]
+   row_list = [ [ 'female', -0.5 ], [ 'both', 0.0 ], [ 'male', 0.5 ] ]
+   dismod_at.create_table(
+      connection, 'split_reference', col_name, col_type, row_list
+   )
+   col_name = [ 'node_id' ]
+   col_type = [ 'integer' ]
+   row_list = [ [ 0 ], [ 2 ] ]
+   dismod_at.create_table(
+      connection, 'node_split', col_name, col_type, row_list
+   )
+   col_name = [ 'fit_node_id', 'split_reference_id', 'mulcov_id' ]
+   col_type = [ 'integer', 'integer', 'integer' ]
+   row_list = list()
+   dismod_at.create_table(
+      connection, 'mulcov_freeze', col_name, col_type, row_list
+   )
+   connection.close()
+#
+def main() :
+   #
+   # wrok_dir
+   work_dir = 'build/test'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # all_node_database
+   all_node_database = 'all_node.db'
+   option_all = {
+      'result_dir'                : '.',
+      'root_node_name'            : 'n0',
+      'root_split_reference_name' : 'both',
+   }
+   write_all_node_database(all_node_database, option_all)
+   #
+   # all_node_info
+   all_node_info = at_cascade.get_all_node_info(all_node_database)
+   assert all_node_info['option_all_dict'] == option_all
+   assert all_node_info['node_split_set'] == { 0, 2 }
+   assert all_node_info['root_split_reference_id'] == 1
+   assert all_node_info['refit_split'] == False
+   assert len( all_node_info['split_reference'] ) == 3
+   assert len( all_node_info['mulcov_freeze'] ) == 0
+   #
+   # the second call uses the cached value
+   assert at_cascade.get_all_node_info(all_node_database) is all_node_info
+   #
+   # a new version of the database is read again
+   option_all['refit_split'] = 'true'
+   option_all['result_dir']  = 'build/test'
+   write_all_node_database(all_node_database, option_all)
+   all_node_info = at_cascade.get_all_node_info(all_node_database)
+   assert all_node_info['option_all_dict'] == option_all
+   assert all_node_info['refit_split'] == True
+   return
+#
+main()
+print('get_all_node_info: OK')
+sys.exit(0)
@@ -6,6 +6,7 @@
 # ----------------------------------------------------------------------------
 import sys
 import os
+import shutil
 import dismod_at
 #
 # import at_cascade with a preference current directory version
@@ -131,8 +132,18 @@ def main() :
    dismod_at.create_table(
       connection, tbl_name, col_name, col_type, row_list
    )
+   connection.close()
    # ------------------------------------------------------------------------
    #
+   # fit_node_database
+   # The option table in this database is changed to select the parent node.
+   # The other tables are the same as in the root node database.
+   fit_node_database = 'fit_node.db'
+   shutil.copyfile(root_node_database, fit_node_database)
+   connection = dismod_at.create_connection(
+      fit_node_database, new = False, readonly = False
+   )
+   #
    # option_table
    option_table = dismod_at.get_table_dict(connection, 'option')
    assert len( option_table ) == 1
@@ -142,37 +153,60 @@ def main() :
    # bmi is the only relative covariate
    bmi_covariate_id = 2
    #
-   # node_id
-   for node_id in range(4) :
-      #
-      # option_table
-      option_table[0]['option_value'] = f'n{node_id}'
-      dismod_at.replace_table(connection, 'option', option_table)
+   # method
+   # data:  compute the references using the data table.
+   # table: use the cov_reference table in the all node database.
+   # stale: the cov_reference table has the wrong references but the
+   #        root node database has changed so the data table is used.
+   for method in [ 'data', 'table', 'stale' ] :
+      if method == 'table' :
+         at_cascade.create_cov_reference_table(
+            all_node_database, root_node_database
+         )
+      if method == 'stale' :
+         all_connection = dismod_at.create_connection(
+            all_node_database, new = False, readonly = False
+         )
+         command = 'UPDATE cov_reference SET reference = -1.0'
+         dismod_at.sql_command(all_connection, command)
+         all_connection.close()
+         stat = os.stat(root_node_database)
+         os.utime(
+            root_node_database,
+            ns = (stat.st_atime_ns, stat.st_mtime_ns + 1000000000)
+         )
       #
-      # split_reference_id
-      for split_reference_id in range(3) :
+      # node_id
+      for node_id in range(4) :
          #
-         # cov_reference_list
-         cov_reference_list = at_cascade.get_cov_reference(
-            all_node_database  = all_node_database,
-            fit_node_database  = root_node_database,
-            shift_node_id      = node_id,
-            split_reference_id = split_reference_id,
-         )
-         sex      = split_reference_list[split_reference_id]
-         bmi_list = list()
-         for row in row_list :
-            row_node_id = row[0]
-            row_sex     = row[1]
-            row_vaccine = row[2]
-            row_bmi     = row[3]
-            include     = row_node_id >= node_id
-            include     = include and abs(row_sex - sex) <= 0.6
-            if include :
-               bmi_list.append( row_bmi )
-         avg = sum( bmi_list ) / len(bmi_list)
+         # option_table
+         option_table[0]['option_value'] = f'n{node_id}'
+         dismod_at.replace_table(connection, 'option', option_table)
          #
-         assert cov_reference_list[bmi_covariate_id] == avg
+         # split_reference_id
+         for split_reference_id in range(3) :
+            #
+            # cov_reference_list
+            cov_reference_list = at_cascade.get_cov_reference(
+               all_node_database  = all_node_database,
+               fit_node_database  = fit_node_database,
+               shift_node_id      = node_id,
+               split_reference_id = split_reference_id,
+            )
+            sex      = split_reference_list[split_reference_id]
+            bmi_list = list()
+            for row in row_list :
+               row_node_id = row[0]
+               row_sex     = row[1]
+               row_vaccine = row[2]
+               row_bmi     = row[3]
+               include     = row_node_id >= node_id
+               include     = include and abs(row_sex - sex) <= 0.6
+               if include :
+                  bmi_list.append( row_bmi )
+            avg = sum( bmi_list ) / len(bmi_list)
+            #
+            assert cov_reference_list[bmi_covariate_id] == avg
    #
    # connection
    connection.close()
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+# Node Tree:
+#                n0
+#          /-----/\-----\
+#        n1              n4
+#       /  \
+#     n2    n3
+#
+# The node table is not in pre-order so that the pre-order is tested.
+def main() :
+   #
+   # node_table
+   node_table = [
+      { 'node_name' : 'n0', 'parent' : None },
+      { 'node_name' : 'n4', 'parent' : 0    },
+      { 'node_name' : 'n3', 'parent' : 3    },
+      { 'node_name' : 'n1', 'parent' : 0    },
+      { 'node_name' : 'n2', 'parent' : 3    },
+   ]
+   #
+   # node_tree
+   node_tree = at_cascade.get_node_tree(node_table)
+   assert node_tree.n_node == 5
+   #
+   # name2id
+   node_id = dict()
+   for name in [ 'n0', 'n1', 'n2', 'n3', 'n4' ] :
+      node_id[name] = node_tree.name2id(name)
+      assert node_table[ node_id[name] ]['node_name'] == name
+   #
+   # parent, children, depth
+   assert node_tree.parent( node_id['n0'] ) == None
+   assert node_tree.parent( node_id['n2'] ) == node_id['n1']
+   assert node_tree.children( node_id['n0'] ) == [ 1, 3 ]
+   assert node_tree.children( node_id['n1'] ) == [ 2, 4 ]
+   assert node_tree.children( node_id['n4'] ) == []
+   assert node_tree.depth( node_id['n0'] ) == 0
+   assert node_tree.depth( node_id['n4'] ) == 1
+   assert node_tree.depth( node_id['n2'] ) == 2
+   #
+   # is_descendant
+   assert node_tree.is_descendant( node_id['n0'], node_id['n2'] )
+   assert node_tree.is_descendant( node_id['n1'], node_id['n1'] )
+   assert node_tree.is_descendant( node_id['n1'], node_id['n3'] )
+   assert not node_tree.is_descendant( node_id['n1'], node_id['n4'] )
+   assert not node_tree.is_descendant( node_id['n2'], node_id['n1'] )
+   #
+   # pre_order, start, end
+   start    = node_tree.start[ node_id['n1'] ]
+   end      = node_tree.end[ node_id['n1'] ]
+   subtree  = node_tree.pre_order[start : end].tolist()
+   assert subtree == [ node_id['n1'], 2, 4 ]
+   assert node_tree.pre_order[0] == node_id['n0']
+   #
+   # the second call uses the cached value
+   assert at_cascade.get_node_tree(node_table) is node_tree
+   return
+#
+main()
+print('get_node_tree: OK')
+sys.exit(0)
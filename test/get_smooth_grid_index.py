@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+def main() :
+   #
+   # smooth_grid_table
+   # the rows for the smoothings are interleaved so that the grouping is
+   # tested; smooth_id 1 has no rows.
+   smooth_grid_table = list()
+   for age_id in range(3) :
+      for smooth_id in [ 0, 2 ] :
+         row = { 'smooth_id' : smooth_id, 'age_id' : age_id, 'time_id' : 0 }
+         smooth_grid_table.append( row )
+   #
+   # smooth_grid_index
+   smooth_grid_index = at_cascade.get_smooth_grid_index(smooth_grid_table)
+   assert sorted( smooth_grid_index.keys() ) == [ 0, 2 ]
+   assert smooth_grid_index[0] == [ 0, 2, 4 ]
+   assert smooth_grid_index[2] == [ 1, 3, 5 ]
+   #
+   # check against a loop over the entire table
+   for smooth_id in smooth_grid_index :
+      check = list()
+      for (smooth_grid_id, row) in enumerate(smooth_grid_table) :
+         if row['smooth_id'] == smooth_id :
+            check.append( smooth_grid_id )
+      assert smooth_grid_index[smooth_id] == check
+   return
+#
+main()
+print('get_smooth_grid_index: OK')
+sys.exit(0)
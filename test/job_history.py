@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+import dismod_at
+#
+# Job Tree:
+#                j0
+#          /-----/\-----\
+#        j1              j2
+#       /  \
+#     j3    j4
+#
+def main() :
+   #
+   # wrok_dir
+   work_dir = 'build/test'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # fit_node_database
+   # only the tables used by job_history_class are included
+   fit_node_database = 'fit_node.db'
+   connection = dismod_at.create_connection(
+      fit_node_database, new = True, readonly = False
+   )
+   col_name = [ 'data_id' ]
+   col_type = [ 'integer' ]
+   row_list = [ [0], [1], [2] ]
+   dismod_at.create_table(
+      connection, 'data_subset', col_name, col_type, row_list
+   )
+   col_name = [ 'var_type' ]
+   col_type = [ 'text' ]
+   row_list = [ ['rate'] ]
+   dismod_at.create_table(connection, 'var', col_name, col_type, row_list)
+   connection.close()
+   #
+   # job_table
+   # only the columns used by job_history_class and plan_parallel are included
+   job_table = [
+      { 'job_name' : 'j0', 'start_child_job_id' : 1, 'end_child_job_id' : 3 },
+      { 'job_name' : 'j1', 'start_child_job_id' : 3, 'end_child_job_id' : 5 },
+      { 'job_name' : 'j2', 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+      { 'job_name' : 'j3', 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+      { 'job_name' : 'j4', 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+   ]
+   #
+   # job_history
+   job_history_database = 'job_history.db'
+   if os.path.exists(job_history_database) :
+      os.remove(job_history_database)
+   job_history = at_cascade.job_history_class(job_history_database)
+   #
+   # fit_count
+   count = at_cascade.job_history_class.fit_count(fit_node_database)
+   assert count == { 'data_subset' : 3, 'var' : 1 }
+   count = at_cascade.job_history_class.fit_count('does_not_exist.db')
+   assert count == { 'data_subset' : 0, 'var' : 0 }
+   #
+   # job_cost
+   # there is no history so the static cost is returned
+   static_cost = [ 1, 2, 3, 4, 5 ]
+   job_cost    = job_history.job_cost(job_table, static_cost)
+   assert job_cost == [ 1.0, 2.0, 3.0, 4.0, 5.0 ]
+   #
+   # add_row
+   # j0 succeeded four times, j1 failed once
+   for wall_seconds in [ 100.0, 4.0, 6.0, 8.0 ] :
+      job_history.add_row(
+         job_name          = 'j0',
+         fit_type          = 'both',
+         job_done          = True,
+         wall_seconds      = wall_seconds,
+         fit_node_database = fit_node_database,
+      )
+   job_history.add_row(
+      job_name          = 'j1',
+      fit_type          = 'fixed',
+      job_done          = False,
+      wall_seconds      = 50.0,
+      fit_node_database = fit_node_database,
+   )
+   #
+   # job_cost
+   # j0 uses its three most recent successful runs.
+   # The other jobs use seconds per (n_data + n_var) for all the successful
+   # runs: (100 + 4 + 6 + 8) / (4 * 4) = 7.375.
+   job_cost = job_history.job_cost(job_table, static_cost)
+   assert job_cost[0] == 6.0
+   for job_id in range(1, 5) :
+      assert job_cost[job_id] == static_cost[job_id] * 7.375
+   #
+   # job_memory
+   # there is no measured memory so the default memory model is used
+   job_memory = job_history.job_memory(job_table, static_cost)
+   for job_id in range(5) :
+      assert job_memory[job_id] == 100.0 + static_cost[job_id] / 1000.0
+   #
+   # add_row
+   # the memory for j0 is measured twice and for j1 once.
+   # The fit_node_database for j1 does not exist so its n_data + n_var is 0.
+   for max_rss_mb in [ 120.0, 80.0 ] :
+      job_history.add_row(
+         job_name          = 'j0',
+         fit_type          = 'both',
+         job_done          = True,
+         wall_seconds      = 6.0,
+         fit_node_database = fit_node_database,
+         max_rss_mb        = max_rss_mb,
+      )
+   job_history.add_row(
+      job_name          = 'j1',
+      fit_type          = 'both',
+      job_done          = True,
+      wall_seconds      = 1.0,
+      fit_node_database = 'does_not_exist.db',
+      max_rss_mb        = 60.0,
+   )
+   #
+   # job_memory
+   # j0 and j1 use the maximum of their measurements.
+   # The least squares slope for the points (4, 120), (4, 80), (0, 60) is 10.
+   # The base is max(120 - 4 * 10, 80 - 4 * 10, 60 - 0 * 10) = 80.
+   job_memory = job_history.job_memory(job_table, static_cost)
+   assert job_memory[0] == 120.0
+   assert job_memory[1] == 60.0
+   for job_id in range(2, 5) :
+      check = 80.0 + static_cost[job_id] * 10.0
+      assert abs( job_memory[job_id] - check ) < 1e-10 * check
+   job_history.close()
+   #
+   # plan_parallel
+   job_cost = [ 10.0, 5.0, 1.0, 3.0, 2.0 ]
+   total_time, job_schedule = at_cascade.plan_parallel(
+      job_table      = job_table,
+      start_job_id   = 0,
+      skip_start_job = False,
+      max_number_cpu = 1,
+      job_cost       = job_cost,
+   )
+   assert total_time == sum(job_cost)
+   assert [ row['job_id'] for row in job_schedule ] == [ 0, 1, 2, 3, 4 ]
+   #
+   # j1 and j2 start at 10, j3 and j4 start at 15
+   total_time, job_schedule = at_cascade.plan_parallel(
+      job_table      = job_table,
+      start_job_id   = 0,
+      skip_start_job = False,
+      max_number_cpu = 2,
+      job_cost       = job_cost,
+   )
+   assert total_time == 18.0
+   check = { 'job_id' : 3, 'start_time' : 15.0, 'end_time' : 18.0 }
+   assert job_schedule[3] == check
+   #
+   # priority_list
+   # with one cpu, j2 runs last because it has the smallest priority
+   total_time, job_schedule = at_cascade.plan_parallel(
+      job_table      = job_table,
+      start_job_id   = 0,
+      skip_start_job = True,
+      max_number_cpu = 1,
+      job_cost       = job_cost,
+      priority_list  = [ 21, 10, 1, 3, 2 ],
+   )
+   assert total_time == sum(job_cost[1:])
+   assert [ row['job_id'] for row in job_schedule ] == [ 1, 3, 4, 2 ]
+   return
+#
+main()
+print('job_history: OK')
+sys.exit(0)
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+import dismod_at
+#
+def main() :
+   #
+   # wrok_dir
+   work_dir = 'build/test'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # job_journal_database
+   job_journal_database = 'job_journal.db'
+   if os.path.exists(job_journal_database) :
+      os.remove(job_journal_database)
+   #
+   # set_status
+   job_journal = at_cascade.job_journal_class(job_journal_database)
+   job_journal.set_status('n0', 'run')
+   job_journal.set_status('n1', 'run')
+   job_journal.set_status('n2', 'run')
+   job_journal.set_status('n0', 'done')
+   job_journal.set_status('n1', 'error')
+   job_journal.set_status("n3.o'neil", 'run')
+   job_journal.close()
+   #
+   # get_status
+   # the status is still there after the database is closed and re-opened
+   job_journal = at_cascade.job_journal_class(job_journal_database)
+   status_dict = job_journal.get_status()
+   assert status_dict == {
+      'n0' : 'done', 'n1' : 'error', 'n2' : 'run', "n3.o'neil" : 'run'
+   }
+   #
+   # journal_mode
+   # the default sqlite journal mode is used
+   connection = dismod_at.create_connection(
+      job_journal_database, new = False, readonly = True
+   )
+   result = dismod_at.sql_command(connection, 'pragma journal_mode')
+   assert result[0][0] == 'delete'
+   connection.close()
+   #
+   # remove
+   job_journal.remove( [ 'n1', 'n2', "n3.o'neil", 'n4' ] )
+   status_dict = job_journal.get_status()
+   assert status_dict == { 'n0' : 'done' }
+   job_journal.close()
+   return
+#
+main()
+print('job_journal: OK')
+sys.exit(0)
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+import dismod_at
+#
+# Node Tree:
+#                n0
+#          /-----/\-----\
+#        n1              n2
+#       /  \
+#     n3    n4
+#
+# Data: n0 has 1 row, n2 has 1 row, n3 has 5 rows, n4 has no rows.
+# There is no var table and the smooth_grid table has 2 rows.
+def main() :
+   #
+   # wrok_dir
+   work_dir = 'build/test'
+   if not os.path.exists(work_dir) :
+      os.makedirs(work_dir)
+   os.chdir(work_dir)
+   #
+   # root_node.db
+   root_node_database = 'root_node.db'
+   connection = dismod_at.create_connection(
+      root_node_database, new = True, readonly = False
+   )
+   col_name = [ 'node_id' ]
+   col_type = [ 'integer' ]
+   row_list = [ [0], [2], [3], [3], [3], [3], [3] ]
+   dismod_at.create_table(connection, 'data', col_name, col_type, row_list)
+   col_name = [ 'smooth_id' ]
+   col_type = [ 'integer' ]
+   row_list = [ [0], [0] ]
+   dismod_at.create_table(
+      connection, 'smooth_grid', col_name, col_type, row_list
+   )
+   connection.close()
+   #
+   # all_node.db
+   all_node_database = 'all_node.db'
+   connection = dismod_at.create_connection(
+      all_node_database, new = True, readonly = False
+   )
+   col_name = [ 'option_name', 'option_value' ]
+   col_type = [ 'text',        'text'         ]
+   row_list = [ [ 'root_node_database', root_node_database ] ]
+   dismod_at.create_table(
+      connection, 'option_all', col_name, col_type, row_list
+   )
+   connection.close()
+   #
+   # node_table
+   node_table = [
+      { 'node_name' : 'n0', 'parent' : None },
+      { 'node_name' : 'n1', 'parent' : 0    },
+      { 'node_name' : 'n2', 'parent' : 0    },
+      { 'node_name' : 'n3', 'parent' : 1    },
+      { 'node_name' : 'n4', 'parent' : 1    },
+   ]
+   #
+   # job_table
+   # only the columns used by job_priority are included
+   job_table = [
+      { 'fit_node_id' : 0, 'start_child_job_id' : 1, 'end_child_job_id' : 3 },
+      { 'fit_node_id' : 1, 'start_child_job_id' : 3, 'end_child_job_id' : 5 },
+      { 'fit_node_id' : 2, 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+      { 'fit_node_id' : 3, 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+      { 'fit_node_id' : 4, 'start_child_job_id' : 5, 'end_child_job_id' : 5 },
+   ]
+   #
+   # job_id
+   priority_list = at_cascade.job_priority(
+      job_table         = job_table,
+      all_node_database = all_node_database,
+      node_table        = node_table,
+      priority_policy   = 'job_id',
+   )
+   assert priority_list == [ 0, 0, 0, 0, 0 ]
+   #
+   # subtree
+   # job_cost = [ 7 + 2, 5 + 2, 1 + 2, 5 + 2, 0 + 2 ]
+   priority_list = at_cascade.job_priority(
+      job_table         = job_table,
+      all_node_database = all_node_database,
+      node_table        = node_table,
+      priority_policy   = 'subtree',
+   )
+   assert priority_list == [ 28, 16, 3, 7, 2 ]
+   return
+#
+main()
+print('job_priority: OK')
+sys.exit(0)
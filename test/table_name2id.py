@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+def main() :
+   #
+   # rate_table
+   rate_table = [
+      { 'rate_name' : 'pini'  },
+      { 'rate_name' : 'iota'  },
+      { 'rate_name' : 'rho'   },
+      { 'rate_name' : 'chi'   },
+      { 'rate_name' : 'omega' },
+   ]
+   for (rate_id, row) in enumerate(rate_table) :
+      name = row['rate_name']
+      assert at_cascade.table_name2id(rate_table, 'rate', name) == rate_id
+   #
+   # the index is rebuilt when the table changes
+   rate_table.append( { 'rate_name' : 'other' } )
+   assert at_cascade.table_name2id(rate_table, 'rate', 'other') == 5
+   rate_table[0]['rate_name'] = 'initial'
+   assert at_cascade.table_name2id(rate_table, 'rate', 'initial') == 0
+   #
+   # a name that is not in the table
+   try :
+      at_cascade.table_name2id(rate_table, 'rate', 'pini')
+      ok = False
+   except AssertionError as error :
+      ok = 'is not presnet' in str(error)
+   assert ok
+   #
+   # a name that appears twice
+   node_table = [ { 'node_name' : 'n0' }, { 'node_name' : 'n0' } ]
+   try :
+      at_cascade.table_name2id(node_table, 'node', 'n0')
+      ok = False
+   except AssertionError as error :
+      ok = 'more than once' in str(error)
+   assert ok
+   return
+#
+main()
+print('table_name2id: OK')
+sys.exit(0)
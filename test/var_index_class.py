@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: University of Washington <https://www.washington.edu>
+# SPDX-FileContributor: 2021-23 Bradley M. Bell
+# ---------------------------------------------------------------------------
+import os
+import sys
+#
+# import at_cascade with a preference current directory version
+current_directory = os.getcwd()
+if os.path.isfile( current_directory + '/at_cascade/__init__.py' ) :
+   sys.path.insert(0, current_directory)
+import at_cascade
+#
+def main() :
+   #
+   # var_table
+   # only the columns used by var_index_class are included
+   null_row = {
+      'var_type'    : None,
+      'smooth_id'   : None,
+      'age_id'      : None,
+      'time_id'     : None,
+      'node_id'     : None,
+      'rate_id'     : None,
+      'mulcov_id'   : None,
+      'group_id'    : None,
+      'subgroup_id' : None,
+   }
+   var_table = list()
+   for node_id in range(3) :
+      for age_id in range(2) :
+         for time_id in range(2) :
+            row = dict( null_row )
+            row['var_type'] = 'rate'
+            row['rate_id']  = 1
+            row['node_id']  = node_id
+            row['age_id']   = age_id
+            row['time_id']  = time_id
+            var_table.append( row )
+   row = dict( null_row )
+   row['var_type']    = 'mulcov_rate_value'
+   row['age_id']      = 0
+   row['time_id']     = 0
+   row['mulcov_id']   = 0
+   row['group_id']    = 0
+   var_table.append( row )
+   #
+   # var_index
+   var_index = at_cascade.var_index_class(var_table)
+   #
+   # var_id
+   for (var_id, row) in enumerate(var_table) :
+      if row['var_type'] == 'rate' :
+         check = var_index.var_id(
+            var_type = 'rate',
+            age_id   = row['age_id'],
+            time_id  = row['time_id'],
+            node_id  = row['node_id'],
+            rate_id  = row['rate_id'],
+         )
+         assert check == var_id
+         check = at_cascade.get_var_id(
+            var_table = var_table,
+            var_type  = 'rate',
+            age_id    = row['age_id'],
+            time_id   = row['time_id'],
+            node_id   = row['node_id'],
+            rate_id   = row['rate_id'],
+         )
+         assert check == var_id
+   var_id = var_index.var_id(
+      var_type    = 'mulcov_rate_value',
+      age_id      = 0,
+      time_id     = 0,
+      mulcov_id   = 0,
+      group_id    = 0,
+   )
+   assert var_id == len(var_table) - 1
+   #
+   # var_id_array
+   # the rate variables for node_id 2 in the order of the var table
+   var_id_array = var_index.var_id_array(
+      var_type = 'rate',
+      rate_id  = 1,
+      node_id  = 2,
+      age_id   = [ 0, 0, 1, 1 ],
+      time_id  = [ 0, 1, 0, 1 ],
+   )
+   assert var_id_array.tolist() == [ 8, 9, 10, 11 ]
+   #
+   # a variable that is not in the var table
+   try :
+      var_index.var_id(var_type = 'rate', age_id = 0, time_id = 0,
+         node_id = 3, rate_id = 1
+      )
+      ok = False
+   except AssertionError as error :
+      ok = 'no rate variable' in str(error)
+   assert ok
+   return
+#
+main()
+print('var_index_class: OK')
+sys.exit(0)